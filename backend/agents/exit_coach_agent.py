@@ -1,3 +1,4 @@
+from typing import Dict, Any, List
 from .base_agent import BaseAgent, AgentResponse
 
 class ExitCoachAgent(BaseAgent):
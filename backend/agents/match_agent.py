@@ -1,15 +1,34 @@
+import time
 from .base_agent import BaseAgent, AgentResponse
-from typing import List, Dict
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
+
+from config.settings import settings
+from services.audit_log import audit_log
+from services.buyer_pool import BuyerPoolSnapshot, BuyerPoolStore, buyer_pool
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Scores are kept in tenths so thresholds compare exactly
+SECTOR_POINTS = 4
+VALUATION_POINTS = 4
+LOCATION_POINTS = 2
+# Preferring a city within MATCH_LOCATION_NEARBY_KM of the business
+NEARBY_LOCATION_POINTS = 1
+# Two of the three criteria (sector + location included)
+MATCH_THRESHOLD_POINTS = 6
+MAX_MATCHES = 3
 
 class MatchAgent(BaseAgent):
-    def __init__(self):
+    def __init__(self, pool: Optional[BuyerPoolStore] = None):
         super().__init__("match_agent")
-        self.buyer_pool = self._initialize_buyer_pool()
-    
+        # Shared, memory-mapped pool; agents no longer build their own copy
+        self.buyer_pool = pool or buyer_pool
+
     async def execute(self, task: Dict[str, Any]) -> AgentResponse:
         business_profile = task.get('business_profile', {})
-        matches = self._find_matches(business_profile)
-        
+        matches = self.find_matches(business_profile)
+
         return AgentResponse(
             success=True,
             message=f"{len(matches)} investors matched this week",
@@ -20,71 +39,64 @@ class MatchAgent(BaseAgent):
             },
             next_actions=["View match details", "Initiate contact"]
         )
-    
-    def _find_matches(self, business_profile: Dict) -> List[Dict]:
-        sector = business_profile.get('sector', '')
-        valuation = business_profile.get('valuation', 0)
-        
+
+    def score_buyers(self, business_profile: Dict) -> Tuple[BuyerPoolSnapshot, "np.ndarray", "np.ndarray"]:
+        """Every buyer over the match threshold: (pool, buyer indices, points in tenths)"""
+        import numpy as np
+
+        pool = self.buyer_pool.snapshot()
+        points = self._score_points(pool, business_profile)
+        candidates = np.flatnonzero(points >= MATCH_THRESHOLD_POINTS)
+        return pool, candidates, points
+
+    def find_matches(self, business_profile: Dict) -> List[Dict]:
+        import numpy as np
+
+        started = time.perf_counter()
+        pool, candidates, points = self.score_buyers(business_profile)
+        # Stable sort keeps pool order between equal scores
+        best = candidates[np.argsort(-points[candidates], kind='stable')[:MAX_MATCHES]]
+
         matches = []
-        for buyer in self.buyer_pool:
-            score = self._calculate_match_score(buyer, business_profile)
-            if score > 0.6:  # Threshold for good matches
-                matches.append({
-                    **buyer,
-                    'match_score': round(score, 2),
-                    'anonymized_id': f"BUYER_{buyer['id'][:8]}"
-                })
-        
-        return sorted(matches, key=lambda x: x['match_score'], reverse=True)[:3]
-    
-    def _calculate_match_score(self, buyer: Dict, business: Dict) -> float:
-        score = 0.0
-        
-        # Sector match
-        if buyer['preferred_sectors'] and business.get('sector') in buyer['preferred_sectors']:
-            score += 0.4
-        
-        # Valuation range match
-        business_val = business.get('valuation', 0)
-        if buyer['min_investment'] <= business_val <= buyer['max_investment']:
-            score += 0.4
-        
-        # Location preference
-        if buyer.get('preferred_locations') and business.get('location') in buyer['preferred_locations']:
-            score += 0.2
-        
-        return min(score, 1.0)
-    
-    def _initialize_buyer_pool(self) -> List[Dict]:
-        return [
+        for index in best:
+            buyer = pool.buyer(int(index))
+            matches.append({
+                **buyer,
+                'match_score': round(int(points[index]) / 10, 2),
+                'anonymized_id': f"BUYER_{buyer['id'][:8]}"
+            })
+        audit_log.record(
+            'match', 'MatchAgent', 'points', dict(business_profile),
             {
-                'id': 'fund_001',
-                'type': 'VC Fund',
-                'name': 'Alpha Ventures',
-                'preferred_sectors': ['Technology', 'Manufacturing', 'Services'],
-                'min_investment': 5000000,
-                'max_investment': 50000000,
-                'preferred_locations': ['Bangalore', 'Mumbai', 'Delhi'],
-                'description': 'Early-stage technology focused fund'
+                'candidates': int(len(candidates)),
+                'pool_size': int(pool.count),
+                'matches': [{'id': m['id'], 'match_score': m['match_score']} for m in matches],
             },
-            {
-                'id': 'individual_001', 
-                'type': 'Entrepreneur',
-                'name': 'Raj Sharma',
-                'preferred_sectors': ['Retail', 'Services'],
-                'min_investment': 1000000,
-                'max_investment': 15000000,
-                'preferred_locations': ['Delhi', 'Chennai'],
-                'description': 'Experienced business owner looking to expand'
-            },
-            {
-                'id': 'corporate_001',
-                'type': 'Corporate Investor',
-                'name': 'Growth Corp',
-                'preferred_sectors': ['Manufacturing', 'Technology'],
-                'min_investment': 10000000,
-                'max_investment': 100000000,
-                'preferred_locations': ['All India'],
-                'description': 'Strategic acquisitions for portfolio expansion'
-            }
-        ]
\ No newline at end of file
+            (time.perf_counter() - started) * 1000
+        )
+        return matches
+
+    def _score_points(self, pool, business: Dict) -> "np.ndarray":
+        """Match score of every buyer at once, in tenths"""
+        import numpy as np
+
+        points = np.zeros(pool.count, dtype=np.int8)
+
+        # Sector match
+        points[pool.buyers_preferring('sector', business.get('sector'))] += SECTOR_POINTS
+
+        # Valuation range match
+        try:
+            business_val = float(business.get('valuation', 0))
+        except (TypeError, ValueError):
+            business_val = None
+        if business_val is not None:
+            in_range = (pool.min_investment <= business_val) & (business_val <= pool.max_investment)
+            points += in_range.astype(np.int8) * VALUATION_POINTS
+
+        # Location preference: "All India" covers Mumbai, "West" covers Pune...
+        covered, nearby = pool.location_matches(business.get('location'), settings.MATCH_LOCATION_NEARBY_KM)
+        points += covered.astype(np.int8) * LOCATION_POINTS
+        points += nearby.astype(np.int8) * NEARBY_LOCATION_POINTS
+
+        return points
@@ -1,6 +1,7 @@
-import pandas as pd
-import numpy as np
+import time
+from typing import Dict, Any
 from .base_agent import BaseAgent, AgentResponse
+from services.audit_log import audit_log
 
 class ValuationAgent(BaseAgent):
     def __init__(self):
@@ -9,8 +10,12 @@ class ValuationAgent(BaseAgent):
     async def execute(self, task: Dict[str, Any]) -> AgentResponse:
         financial_data = task.get('financial_data', {})
         
+        started = time.perf_counter()
         try:
             valuation = self._calculate_valuation(financial_data)
+            audit_log.record('valuation', 'ValuationAgent', 'ebitda_multiple', dict(financial_data),
+                             {'estimated_value': valuation, 'multiple_used': 3.0},
+                             (time.perf_counter() - started) * 1000)
             
             return AgentResponse(
                 success=True,
@@ -27,6 +32,8 @@ class ValuationAgent(BaseAgent):
                 next_actions=["Proceed to listing", "Adjust financial inputs"]
             )
         except Exception as e:
+            audit_log.record('valuation', 'ValuationAgent', 'ebitda_multiple', dict(financial_data), None,
+                             (time.perf_counter() - started) * 1000, error=str(e))
             return AgentResponse(
                 success=False,
                 message=f"Valuation failed: {str(e)}",
@@ -35,7 +42,10 @@ class ValuationAgent(BaseAgent):
     
     def _calculate_valuation(self, financial_data: Dict) -> float:
         revenue = financial_data.get('annual_revenue', 0)
-        ebitda = financial_data.get('ebitda', revenue * 0.3)  # Default 30% margin
+        # Trailing-twelve-month EBITDA from the business's history, when
+        # attached, beats the default 30% margin
+        ttm_ebitda = (financial_data.get('history') or {}).get('ttm_ebitda')
+        ebitda = financial_data.get('ebitda', ttm_ebitda if ttm_ebitda is not None else revenue * 0.3)
         assets = financial_data.get('total_assets', 0)
         
         # Simple valuation: 3x EBITDA + 70% of assets
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import FileResponse
+from typing import Optional
+
+from middleware.profiling import is_authorized, profile_store
+
+router = APIRouter()
+
+def _require_token(token: Optional[str]):
+    if not is_authorized(token):
+        raise HTTPException(status_code=403, detail="Profiling token required")
+
+@router.get("/profiles")
+async def list_profiles(limit: int = Query(50, ge=1, le=500),
+                        x_profile_token: Optional[str] = Header(None)):
+    _require_token(x_profile_token)
+    return {"profiles": profile_store.list(limit)}
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str, x_profile_token: Optional[str] = Header(None)):
+    """Collapsed stacks, ready for flamegraph.pl or speedscope"""
+    _require_token(x_profile_token)
+    path = profile_store.path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.collapsed")
@@ -0,0 +1,82 @@
+from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi.security import OAuth2PasswordRequestForm
+from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from datetime import timedelta
+from typing import Optional
+
+from config.settings import settings
+from config.security import (
+    CurrentUser, create_access_token, get_current_user,
+    get_password_hash_async, verify_password_async
+)
+from models.database import get_db
+from models.user import User
+
+router = APIRouter()
+
+# Hash checked when the email is unknown, so both paths cost one bcrypt run
+# and response timing does not reveal which emails are registered
+_DUMMY_HASH = "$2b$12$C6UzMDM.H6dfI/f/IKcEeO7pG6NcYxVz8pZ1x7ZkNQ1p0h1ZYtq2S"
+
+class RegisterRequest(BaseModel):
+    email: str
+    password: str
+    full_name: Optional[str] = None
+
+class LoginRequest(BaseModel):
+    email: str
+    password: str
+
+def _get_user_by_email(db: Session, email: str) -> Optional[User]:
+    return db.query(User).filter(User.email == email).first()
+
+def _create_user(db: Session, email: str, hashed_password: str, full_name: Optional[str]) -> User:
+    user = User(email=email, hashed_password=hashed_password, full_name=full_name)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+async def _authenticate(db: Session, email: str, password: str) -> dict:
+    user = await run_in_threadpool(_get_user_by_email, db, email)
+    valid = await verify_password_async(password, user.hashed_password if user else _DUMMY_HASH)
+    if user is None or not valid or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    access_token = create_access_token(
+        data={"sub": str(user.id), "email": user.email},
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return {"access_token": access_token, "token_type": "bearer"}
+
+@router.post("/register", status_code=201)
+async def register(request: RegisterRequest, db: Session = Depends(get_db)):
+    hashed_password = await get_password_hash_async(request.password)
+    try:
+        user = await run_in_threadpool(
+            _create_user, db, request.email, hashed_password, request.full_name
+        )
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Email is already registered")
+
+    return {"success": True, "user_id": user.id, "email": user.email}
+
+@router.post("/token")
+async def token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    # OAuth2 password flow used by the OpenAPI "Authorize" button
+    return await _authenticate(db, form_data.username, form_data.password)
+
+@router.post("/login")
+async def login(request: LoginRequest, db: Session = Depends(get_db)):
+    return await _authenticate(db, request.email, request.password)
+
+@router.get("/me")
+async def me(current_user: CurrentUser = Depends(get_current_user)):
+    return {"user_id": current_user.id, "email": current_user.email}
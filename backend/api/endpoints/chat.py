@@ -1,45 +1,148 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import List, Dict
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
+from datetime import datetime
 import json
 
-router = APIRouter()
-
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+from api.responses import json_response
+from config.security import CurrentUser, InvalidTokenError, authenticate_token, get_current_user
+from models.database import SessionLocal
+from services.connection_manager import manager
+from services.chat_bus import chat_bus, is_valid_channel
+from services.listing_service import ListingService
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+router = APIRouter()
 
-    async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
+POLICY_VIOLATION_CLOSE_CODE = 1008
 
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+@router.websocket("/ws/{client_id}")
+async def websocket_endpoint(websocket: WebSocket, client_id: str, token: Optional[str] = None,
+                             channels: Optional[str] = None, since: Optional[int] = None):
+    """Deal-room chat.
 
-manager = ConnectionManager()
+    Browsers cannot set headers on a WebSocket handshake, so the access
+    token comes in the ``token`` query parameter. Clients join channels
+    (``deal:<listing_id>`` or ``pair:<a>:<b>``) via the ``channels`` query
+    parameter or ``subscribe`` frames. Passing the last seen message id as
+    ``since`` replays what was missed while disconnected.
+    """
+    try:
+        user = authenticate_token(token or "")
+    except InvalidTokenError:
+        await websocket.close(code=POLICY_VIOLATION_CLOSE_CODE)
+        return
 
-@router.websocket("/ws/{client_id}")
-async def websocket_endpoint(websocket: WebSocket, client_id: str):
-    await manager.connect(websocket)
+    # Scoped to the user so nobody can take over another user's connection
+    client_id = f"{user.id}:{client_id}"
+    await chat_bus.start()
+    connection = await manager.connect(websocket, client_id)
+    if connection is None:
+        # Refused by admission control; the socket is already closed
+        return
     try:
+        for channel in (channels or "").split(","):
+            if not is_valid_channel(channel):
+                continue
+            if await run_in_threadpool(can_join, user, channel):
+                chat_bus.subscribe(client_id, channel)
+            else:
+                await _send_error(client_id, f"Not allowed to join {channel}")
+        if since is not None:
+            await _replay(client_id, since)
+
         while True:
             data = await websocket.receive_text()
-            message_data = json.loads(data)
-            
-            # Process message (in real app, save to database)
-            response = {
-                "type": "message",
-                "from": client_id,
-                "message": message_data.get("message", ""),
-                "timestamp": "2024-01-20T10:30:00Z"  # In real app, use actual timestamp
-            }
-            
-            await manager.send_personal_message(json.dumps(response), websocket)
+            connection.touch()
+            try:
+                message_data = json.loads(data)
+            except ValueError:
+                await _send_error(client_id, "Frames must be JSON objects")
+                continue
+            if not isinstance(message_data, dict):
+                await _send_error(client_id, "Frames must be JSON objects")
+                continue
+            message_type = message_data.get("type", "message")
+            channel = message_data.get("channel")
+
+            if message_type == "pong":
+                continue
+            elif message_type == "ping":
+                await manager.send_personal_message(json.dumps({"type": "pong"}), client_id)
+            elif message_type in ("subscribe", "unsubscribe"):
+                if not is_valid_channel(channel):
+                    await _send_error(client_id, f"Invalid channel: {channel}")
+                elif message_type == "subscribe":
+                    if await run_in_threadpool(can_join, user, channel):
+                        chat_bus.subscribe(client_id, channel)
+                    else:
+                        await _send_error(client_id, f"Not allowed to join {channel}")
+                else:
+                    chat_bus.unsubscribe(client_id, channel)
+            elif channel is not None:
+                if channel not in chat_bus.client_channels.get(client_id, ()):
+                    await _send_error(client_id, f"Not subscribed to {channel}")
+                else:
+                    await chat_bus.publish(channel, str(user.id), message_data.get("message", ""))
+            else:
+                # No channel: echo back to the sender as before
+                response = {
+                    "type": "message",
+                    "from": client_id,
+                    "message": message_data.get("message", ""),
+                    "timestamp": datetime.utcnow().isoformat() + "Z"
+                }
+                await manager.send_personal_message(json.dumps(response), client_id)
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
\ No newline at end of file
+        pass
+    finally:
+        manager.disconnect(client_id, connection)
+        if client_id not in manager.active_connections:
+            chat_bus.drop_client(client_id)
+
+def can_join(user: CurrentUser, channel: str) -> bool:
+    """Pair channels are private to their two users; deal rooms are open to
+    any signed-in user while the listing exists (listings have no owner yet)."""
+    kind, _, rest = channel.partition(":")
+    if kind == "pair":
+        return str(user.id) in rest.split(":")
+    with SessionLocal() as db:
+        return ListingService(db).get_listing_data(int(rest)) is not None
+
+async def _flush_pending():
+    # Messages still waiting for the batch writer must be visible to history.
+    # If the write fails now it is retried by the writer; serve what is stored.
+    try:
+        await chat_bus.flush()
+    except Exception:
+        pass
+
+async def _replay(client_id: str, since: int):
+    await _flush_pending()
+    for channel in chat_bus.client_channels.get(client_id, ()):
+        messages = await run_in_threadpool(chat_bus.history, channel, None, since, 500)
+        for message in messages:
+            await manager.send_personal_message(json.dumps(message), client_id)
+
+async def _send_error(client_id: str, detail: str):
+    await manager.send_personal_message(json.dumps({"type": "error", "detail": detail}), client_id)
+
+@router.get("/channels/{channel}/history")
+async def channel_history(channel: str, before: Optional[int] = None,
+                          limit: int = Query(50, ge=1, le=200),
+                          current_user: CurrentUser = Depends(get_current_user)):
+    if not is_valid_channel(channel):
+        raise HTTPException(status_code=400, detail=f"Invalid channel: {channel}")
+    if not await run_in_threadpool(can_join, current_user, channel):
+        raise HTTPException(status_code=403, detail=f"Not allowed to read {channel}")
+    await _flush_pending()
+    messages = await run_in_threadpool(chat_bus.history, channel, before, None, limit)
+    return json_response({
+        "channel": channel,
+        "messages": messages,
+        # Pass as ?before= to fetch the next (older) page
+        "next_cursor": messages[0]["id"] if len(messages) == limit else None
+    })
+
+@router.get("/stats")
+async def chat_stats():
+    return {**manager.stats(), 'persistence': chat_bus.stats()}
@@ -1,14 +1,52 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from typing import List
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Header, Query, Request
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+import time
+from typing import List, Optional
+
+from api.responses import json_response
+from config.security import CurrentUser, get_current_user
+from config.settings import settings
+from middleware.admission import admission_class
+from middleware.profiling import is_authorized
+from models.database import get_db
 from services.data_room_service import DataRoomService
+from services.document_index import add_index_job, document_index
+from services.upload_service import UploadError, UploadService
 
 router = APIRouter()
 data_room_service = DataRoomService()
 
+class DocumentInfo(BaseModel):
+    filename: str
+    uploaded_at: str
+    size: int
+    file_path: str
+
+class DocumentList(BaseModel):
+    documents: List[DocumentInfo]
+
+class UploadCreate(BaseModel):
+    business_id: str
+    filename: str
+    size: int
+    # Hex SHA-256 of the whole file; can instead be sent when completing
+    sha256: Optional[str] = None
+
+class UploadComplete(BaseModel):
+    sha256: Optional[str] = None
+
+# Chunk bodies are copied to disk in pieces of this size as they arrive
+CHUNK_WRITE_BUFFER = 1024 * 1024
+
 @router.post("/upload")
+@admission_class("upload")
 async def upload_document(
     business_id: str,
-    file: UploadFile = File(...)
+    file: UploadFile = File(...),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     try:
         content = await file.read()
@@ -16,20 +54,144 @@ async def upload_document(
             file_content=content,
             filename=file.filename,
             business_id=business_id,
-            user_id="demo_user"
+            user_id=str(current_user.id)
         )
         
         if not result['success']:
-            raise HTTPException(status_code=500, detail=result['error'])
+            raise HTTPException(status_code=result.get('status_code', 500), detail=result['error'])
         
+        # Text extraction and indexing happen in a job worker
+        add_index_job(db, business_id, result)
+        await run_in_threadpool(db.commit)
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/list/{business_id}")
+@router.get("/list/{business_id}", response_model=DocumentList)
 async def list_documents(business_id: str):
     try:
         documents = await data_room_service.list_documents(business_id)
-        return {"documents": documents}
+        return json_response({"documents": documents})
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/search/{business_id}")
+def search_documents(business_id: str, q: str = Query(..., min_length=1, max_length=500),
+                     limit: int = Query(20, ge=1, le=100),
+                     x_profile_token: Optional[str] = Header(None),
+                     current_user: CurrentUser = Depends(get_current_user)):
+    """Ranked full-text search over a data room; hits are wrapped in <mark>"""
+    # Data rooms have no access list yet, so no caller can be shown to be
+    # allowed into one; until they do, search is behind the admin token
+    if not is_authorized(x_profile_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    started = time.perf_counter()
+    try:
+        results = document_index.search(business_id, q, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_response({
+        "business_id": business_id,
+        "query": q,
+        "results": results,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2)
+    })
+
+@router.delete("/files/{business_id}/{document_id}")
+async def delete_document(business_id: str, document_id: str,
+                          current_user: CurrentUser = Depends(get_current_user)):
+    result = await data_room_service.delete_document(business_id, document_id)
+    if not result['success']:
+        raise HTTPException(status_code=404, detail=result['error'])
+    try:
+        # Drop it from search now rather than waiting for a worker
+        await run_in_threadpool(document_index.remove, business_id, document_id)
+    except ValueError:
+        pass
+    return json_response(result)
+
+# Resumable uploads for large due-diligence files: create a session, PUT
+# chunks at any offset (in any order, in parallel), GET the received ranges
+# to resume, then complete. See UploadService for the storage side.
+
+@router.post("/uploads", status_code=201)
+@admission_class("upload")
+def create_upload(request: UploadCreate, current_user: CurrentUser = Depends(get_current_user),
+                  db: Session = Depends(get_db)):
+    service = UploadService(db)
+    try:
+        session = service.create(current_user.id, request.business_id, request.filename,
+                                 request.size, request.sha256)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    return json_response(service.status(session), status_code=201)
+
+@router.put("/uploads/{upload_id}")
+async def upload_chunk(upload_id: str, request: Request, offset: int = Query(..., ge=0),
+                       current_user: CurrentUser = Depends(get_current_user),
+                       db: Session = Depends(get_db)):
+    """Write the raw request body at ``offset``; re-sending a range is harmless"""
+    service = UploadService(db)
+    declared = request.headers.get("content-length")
+    try:
+        session = await run_in_threadpool(service.get, upload_id, current_user.id)
+        service.check_chunk(session, offset, int(declared) if declared else None)
+
+        # Stream to disk instead of buffering up to UPLOAD_MAX_CHUNK_BYTES per request
+        limit = min(settings.UPLOAD_MAX_CHUNK_BYTES, session.total_size - offset)
+        received, pending = 0, bytearray()
+        async for data in request.stream():
+            received += len(data)
+            if received > limit:
+                raise UploadError("Chunk is too large or runs past the end of the file", 413)
+            pending += data
+            if len(pending) >= CHUNK_WRITE_BUFFER:
+                await run_in_threadpool(service.write, upload_id, offset + received - len(pending), bytes(pending))
+                pending.clear()
+        if pending:
+            await run_in_threadpool(service.write, upload_id, offset + received - len(pending), bytes(pending))
+
+        # Only a fully written chunk counts as received
+        await run_in_threadpool(service.record_chunk, upload_id, offset, received)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    return json_response({"upload_id": upload_id, "offset": offset, "length": received})
+
+@router.get("/uploads/{upload_id}")
+def upload_status(upload_id: str, current_user: CurrentUser = Depends(get_current_user),
+                  db: Session = Depends(get_db)):
+    """Received byte ranges ([start, end)) so a client can resume"""
+    service = UploadService(db)
+    try:
+        session = service.get(upload_id, current_user.id)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    return json_response(service.status(session))
+
+@router.post("/uploads/{upload_id}/complete")
+async def complete_upload(upload_id: str, request: Optional[UploadComplete] = None,
+                          current_user: CurrentUser = Depends(get_current_user),
+                          db: Session = Depends(get_db)):
+    service = UploadService(db)
+    try:
+        session = await run_in_threadpool(service.get, upload_id, current_user.id)
+        if session.status == "complete":
+            # Retried completion: the document already exists
+            return json_response(service.status(session))
+        expected = await run_in_threadpool(service.begin_finalize, session, request.sha256 if request else None)
+        # Hashing a multi-GB file must not block the event loop
+        await run_in_threadpool(service.finalize, session, expected)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    return json_response(service.status(session))
+
+@router.delete("/uploads/{upload_id}", status_code=204)
+def abort_upload(upload_id: str, current_user: CurrentUser = Depends(get_current_user),
+                 db: Session = Depends(get_db)):
+    service = UploadService(db)
+    try:
+        service.abort(service.get(upload_id, current_user.id))
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
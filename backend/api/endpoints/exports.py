@@ -0,0 +1,48 @@
+from datetime import date
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional
+
+from config.security import CurrentUser, get_current_user
+from middleware.admission import admission_class
+from services.export_service import MEDIA_TYPES, stream_export
+from services.valuation_engine import ValuationEngine
+
+router = APIRouter()
+
+ExportFormat = Literal['csv', 'xlsx']
+
+def _business_ids(business_ids: Optional[str]) -> Optional[List[int]]:
+    if not business_ids:
+        return None
+    try:
+        return [int(i) for i in business_ids.split(",") if i.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="business_ids must be comma-separated integers")
+
+def _export(kind: str, export_format: str, business_ids: Optional[str], method: str = 'auto') -> StreamingResponse:
+    # Rows are produced chunk by chunk on a worker thread as the client reads
+    filename = f"{kind}-{date.today().isoformat()}.{export_format}"
+    return StreamingResponse(
+        stream_export(kind, export_format, _business_ids(business_ids), method),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/valuations")
+@admission_class("heavy")
+def export_valuations(export_format: ExportFormat = Query('csv', alias="format"), method: str = 'auto',
+                      business_ids: Optional[str] = Query(None, description="Comma-separated; default all listed"),
+                      current_user: CurrentUser = Depends(get_current_user)):
+    """Valuation of every listed business (or the given ones) as CSV or XLSX"""
+    if method != 'auto' and method not in ValuationEngine().methods:
+        raise HTTPException(status_code=400, detail=f"Unknown valuation method: {method}")
+    return _export('valuations', export_format, business_ids, method)
+
+@router.get("/matches")
+@admission_class("heavy")
+def export_matches(export_format: ExportFormat = Query('csv', alias="format"),
+                   business_ids: Optional[str] = Query(None, description="Comma-separated; default all listed"),
+                   current_user: CurrentUser = Depends(get_current_user)):
+    """Top buyer matches of every listed business (or the given ones) as CSV or XLSX"""
+    return _export('matches', export_format, business_ids)
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, HTTPException, Depends, Header
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+from typing import Dict, Any, Optional
+
+from config.security import CurrentUser, get_current_user
+from models.database import get_db
+from services import job_handlers  # noqa: F401  (registers handlers)
+from services.job_queue import JobQueue, registered_kinds
+
+router = APIRouter()
+
+class JobRequest(BaseModel):
+    kind: str
+    payload: Dict[str, Any] = {}
+    priority: int = Field(0, ge=-10, le=10)
+
+@router.post("", status_code=202)
+def submit_job(request: JobRequest, idempotency_key: Optional[str] = Header(None),
+               current_user: CurrentUser = Depends(get_current_user), db: Session = Depends(get_db)):
+    if request.kind not in registered_kinds():
+        raise HTTPException(status_code=400, detail=f"Unknown job kind: {request.kind}")
+    job = JobQueue(db).enqueue(
+        request.kind,
+        request.payload,
+        priority=request.priority,
+        # Keys are scoped per user so clients cannot collide with each other
+        idempotency_key=f"user:{current_user.id}:{idempotency_key}" if idempotency_key else None,
+        user_id=current_user.id
+    )
+    return {"success": True, "data": JobQueue.to_dict(job)}
+
+@router.get("/{job_id}")
+def get_job(job_id: int, current_user: CurrentUser = Depends(get_current_user),
+            db: Session = Depends(get_db)):
+    job = JobQueue(db).get(job_id)
+    if job is None or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return {"success": True, "data": JobQueue.to_dict(job)}
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Dict, Any, List
+from fastapi import APIRouter, HTTPException, Depends, Header, Response
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.orm import Session
+from typing import Dict, Any, Generic, List, Optional, TypeVar
 
 from agents.orchestrator import AgentOrchestrator
-from services.listing_service import ListingService 
-# from models.database import get_db # Assuming this dependency exists for DB connection
+from api.responses import AgentResult, json_response, model_response
+from config.security import CurrentUser, get_current_user
+from models.database import get_db
+from services.draft_service import DraftService, DraftConflictError, DraftNotFoundError
+from services.listing_service import ListingService
 
 router = APIRouter()
 orchestrator = AgentOrchestrator()
@@ -39,6 +43,51 @@ class TransferInfo(BaseModel):
     training_required: bool
     support_period: str
 
+SectionT = TypeVar("SectionT", bound=BaseModel)
+
+class SectionSaved(BaseModel, Generic[SectionT]):
+    """Step save envelope; ``data`` is the request model, already validated"""
+    success: bool
+    message: str
+    next_step: str
+    data: SectionT
+
+# --- Partial models for draft PATCH requests ---
+# Only the fields the user changed are sent; everything is optional.
+
+class BusinessInfoPatch(BaseModel):
+    name: Optional[str] = None
+    sector: Optional[str] = None
+    location: Optional[str] = None
+    years_operation: Optional[int] = None
+    description: Optional[str] = None
+
+class FinancialInfoPatch(BaseModel):
+    annual_revenue: Optional[float] = None
+    ebitda: Optional[float] = None
+    total_assets: Optional[float] = None
+    profit_margin: Optional[float] = None
+
+class AssetInfoPatch(BaseModel):
+    equipment: Optional[List[str]] = None
+    property: Optional[List[str]] = None
+    intellectual_property: Optional[List[str]] = None
+    inventory: Optional[List[str]] = None
+
+class TransferInfoPatch(BaseModel):
+    timeline: Optional[str] = None
+    handover_type: Optional[str] = None
+    training_required: Optional[bool] = None
+    support_period: Optional[str] = None
+
+# Full models each draft section must satisfy before it can be published
+DRAFT_SECTION_MODELS = {
+    'business_info': BusinessInfo,
+    'financial_info': FinancialInfo,
+    'assets_info': AssetInfo,
+    'transfer_info': TransferInfo,
+}
+
 # --- API Endpoints ---
 
 class ListingStepRequest(BaseModel):
@@ -47,71 +96,189 @@ class ListingStepRequest(BaseModel):
 
 class PublishRequest(BaseModel):
     business_id: int
-    listing_data: Dict[str, Any]
+    listing_data: Dict[str, Any] = {}
+    # Draft version the user reviewed; publishing fails if it moved on since
+    expected_version: Optional[int] = None
 
-@router.post("/step")
-async def process_listing_step(request: ListingStepRequest):
+def _parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    if if_match is None:
+        return None
+    value = if_match.strip()
+    if value.startswith('W/'):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="If-Match must be a draft version")
+
+def _conflict(e: DraftConflictError) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail={
+            "message": "Draft was modified by another request; reload and retry",
+            "current_version": e.current_version
+        }
+    )
+
+@router.post("/step", response_model=AgentResult)
+async def process_listing_step(request: ListingStepRequest,
+                               current_user: CurrentUser = Depends(get_current_user)):
     try:
         result = await orchestrator.execute_workflow(
-            user_id="demo_user",
+            user_id=str(current_user.id),
             action="create_listing",
             data={
                 "current_step": request.current_step,
                 "user_data": request.user_data
             }
         )
-        return result
+        return json_response(result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/publish")
-async def publish_listing(request: PublishRequest):
+def publish_listing(request: PublishRequest, db: Session = Depends(get_db),
+                    current_user: CurrentUser = Depends(get_current_user)):
+    service = DraftService(db)
+    draft = service.get_draft(request.business_id)
+    if draft is None:
+        raise HTTPException(status_code=404, detail=f"No draft found for business {request.business_id}")
+
+    missing = {}
+    for section, model in DRAFT_SECTION_MODELS.items():
+        try:
+            model(**(getattr(draft, section) or {}))
+        except ValidationError as e:
+            missing[section] = [".".join(str(p) for p in err['loc']) for err in e.errors()]
+    if missing:
+        raise HTTPException(
+            status_code=422,
+            detail={"message": "Draft is incomplete", "missing_fields": missing}
+        )
+
     try:
-        # DB saving logic with ListingService goes here in a full app
+        listing = service.publish(
+            request.business_id, request.listing_data, request.expected_version
+        )
         return {
             "success": True,
             "message": "Business listing published successfully!",
-            "listing_id": "LIST_001",
-            "status": "published"
+            "listing_id": listing.id,
+            "status": listing.status
         }
+    except DraftConflictError as e:
+        raise _conflict(e)
+    except DraftNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to publish listing: {str(e)}")
 
-# --- Individual Step Saving Endpoints ---
+# --- Draft Endpoints ---
+# The wizard PATCHes only changed fields; the server keeps the merged draft.
+# The draft version is returned as the ETag and can be sent back as If-Match.
 
-@router.post("/business-info")
-async def save_business_info(info: BusinessInfo):
-    # This is the endpoint that was returning 422
+@router.get("/drafts/{business_id}")
+def get_draft(business_id: int, response: Response, db: Session = Depends(get_db),
+              current_user: CurrentUser = Depends(get_current_user)):
+    draft = DraftService(db).get_draft(business_id)
+    if draft is None:
+        raise HTTPException(status_code=404, detail=f"No draft found for business {business_id}")
+    response.headers["ETag"] = f'"{draft.version}"'
+    return {"success": True, "data": DraftService.to_dict(draft)}
+
+def _patch_draft(db: Session, response: Response, business_id: int, section: str,
+                 changes: BaseModel, if_match: Optional[str], next_step: str) -> Dict[str, Any]:
+    try:
+        draft = DraftService(db).patch_section(
+            business_id,
+            section,
+            changes.dict(exclude_unset=True),
+            expected_version=_parse_if_match(if_match)
+        )
+    except DraftConflictError as e:
+        raise _conflict(e)
+
+    response.headers["ETag"] = f'"{draft.version}"'
     return {
         "success": True,
-        "message": "Business information saved successfully",
-        "next_step": "financial_info",
-        "data": info.dict()
+        "message": "Draft saved",
+        "next_step": next_step,
+        "version": draft.version,
+        "data": getattr(draft, section)
     }
 
-@router.post("/financial-info")
+@router.patch("/drafts/{business_id}/business-info")
+def patch_business_info(business_id: int, changes: BusinessInfoPatch, response: Response,
+                        if_match: Optional[str] = Header(None), db: Session = Depends(get_db),
+                        current_user: CurrentUser = Depends(get_current_user)):
+    return _patch_draft(db, response, business_id, 'business_info', changes, if_match, "financial_info")
+
+@router.patch("/drafts/{business_id}/financial-info")
+def patch_financial_info(business_id: int, changes: FinancialInfoPatch, response: Response,
+                         if_match: Optional[str] = Header(None), db: Session = Depends(get_db),
+                         current_user: CurrentUser = Depends(get_current_user)):
+    return _patch_draft(db, response, business_id, 'financial_info', changes, if_match, "assets_info")
+
+@router.patch("/drafts/{business_id}/assets-info")
+def patch_assets_info(business_id: int, changes: AssetInfoPatch, response: Response,
+                      if_match: Optional[str] = Header(None), db: Session = Depends(get_db),
+                      current_user: CurrentUser = Depends(get_current_user)):
+    return _patch_draft(db, response, business_id, 'assets_info', changes, if_match, "transfer_info")
+
+@router.patch("/drafts/{business_id}/transfer-info")
+def patch_transfer_info(business_id: int, changes: TransferInfoPatch, response: Response,
+                        if_match: Optional[str] = Header(None), db: Session = Depends(get_db),
+                        current_user: CurrentUser = Depends(get_current_user)):
+    return _patch_draft(db, response, business_id, 'transfer_info', changes, if_match, "review")
+
+# --- Individual Step Saving Endpoints ---
+
+@router.post("/business-info", response_model=SectionSaved[BusinessInfo])
+async def save_business_info(info: BusinessInfo):
+    # This is the endpoint that was returning 422
+    return model_response(SectionSaved[BusinessInfo].model_construct(
+        success=True,
+        message="Business information saved successfully",
+        next_step="financial_info",
+        data=info
+    ))
+
+@router.post("/financial-info", response_model=SectionSaved[FinancialInfo])
 async def save_financial_info(info: FinancialInfo):
-    return {
-        "success": True, 
-        "message": "Financial information saved successfully",
-        "next_step": "assets_info",
-        "data": info.dict()
-    }
+    return model_response(SectionSaved[FinancialInfo].model_construct(
+        success=True,
+        message="Financial information saved successfully",
+        next_step="assets_info",
+        data=info
+    ))
 
-@router.post("/assets-info")
+@router.post("/assets-info", response_model=SectionSaved[AssetInfo])
 async def save_assets_info(info: AssetInfo):
-    return {
-        "success": True,
-        "message": "Assets information saved successfully", 
-        "next_step": "transfer_info",
-        "data": info.dict()
-    }
+    return model_response(SectionSaved[AssetInfo].model_construct(
+        success=True,
+        message="Assets information saved successfully",
+        next_step="transfer_info",
+        data=info
+    ))
 
-@router.post("/transfer-info")
+@router.post("/transfer-info", response_model=SectionSaved[TransferInfo])
 async def save_transfer_info(info: TransferInfo):
-    return {
-        "success": True,
-        "message": "Transfer information saved successfully",
-        "next_step": "review",
-        "data": info.dict()
-    }
\ No newline at end of file
+    return model_response(SectionSaved[TransferInfo].model_construct(
+        success=True,
+        message="Transfer information saved successfully",
+        next_step="review",
+        data=info
+    ))
+
+# --- Listing Reads (served through the listing cache) ---
+
+@router.get("/business/{business_id}")
+def get_business_listings(business_id: int, db: Session = Depends(get_db)):
+    return json_response({"listings": ListingService(db).get_business_listings_data(business_id)})
+
+@router.get("/{listing_id}")
+def get_listing(listing_id: int, db: Session = Depends(get_db)):
+    listing = ListingService(db).get_listing_data(listing_id)
+    if listing is None:
+        raise HTTPException(status_code=404, detail=f"Listing {listing_id} not found")
+    return json_response({"listing": listing})
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from typing import Dict, Any, Optional
+
+from agents.orchestrator import AgentOrchestrator
+from api.responses import AgentResult, json_response
+from config.security import CurrentUser, get_current_user
+from middleware.admission import admission_class
+from middleware.profiling import is_authorized
+from middleware.response_cache import cache_response, response_cache
+from models.database import get_db
+from services.buyer_pool import buyer_pool
+from services.match_inbox import MatchInboxService
+
+router = APIRouter()
+orchestrator = AgentOrchestrator()
+
+# Cached match results are stale once a new buyer pool snapshot is live
+buyer_pool.on_swap(lambda snapshot: response_cache.invalidate_tag("buyer_pool"))
+
+class MatchRequest(BaseModel):
+    business_profile: Dict[str, Any]
+
+@router.post("/find-buyers", response_model=AgentResult)
+# Match results only change when the buyer pool is refreshed
+@cache_response(ttl=300, vary=["authorization"], tags=["buyer_pool"])
+@admission_class("heavy")
+async def find_buyers(request: MatchRequest, current_user: CurrentUser = Depends(get_current_user)):
+    try:
+        result = await orchestrator.execute_workflow(
+            user_id=str(current_user.id),
+            action="find_buyers",
+            data={"business_profile": request.business_profile}
+        )
+        return json_response(result)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/inbox/{buyer_id}")
+def buyer_inbox(buyer_id: str, before: Optional[int] = None, limit: int = Query(50, ge=1, le=200),
+                x_profile_token: Optional[str] = Header(None),
+                current_user: CurrentUser = Depends(get_current_user), db: Session = Depends(get_db)):
+    """Listings that matched a buyer when they were published, newest first"""
+    # Users are not linked to buyer ids yet, so no caller can be shown to own
+    # an inbox; until they are, it is an operator view behind the admin token
+    if not is_authorized(x_profile_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    items = MatchInboxService(db).feed(buyer_id, before, limit)
+    return json_response({
+        "buyer_id": buyer_id,
+        "items": [MatchInboxService.to_dict(item) for item in items],
+        # Pass as ?before= to fetch the next (older) page
+        "next_cursor": items[-1].id if len(items) == limit else None
+    })
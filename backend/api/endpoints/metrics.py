@@ -0,0 +1,43 @@
+from fastapi import APIRouter
+
+from middleware.admission import admission_stats
+from middleware.compression import compression_stats
+from middleware.response_cache import response_cache
+from services.audit_log import audit_log
+from services.buyer_pool import buyer_pool
+from services.cache import listing_cache
+from utils.memory import process_memory
+
+router = APIRouter()
+
+@router.get("/cache")
+async def cache_metrics():
+    return {"listing_cache": listing_cache.stats()}
+
+@router.get("/response-cache")
+async def response_cache_metrics():
+    return response_cache.stats()
+
+
+@router.get("/compression")
+async def compression_metrics():
+    """CPU spent compressing against bytes saved, per route and encoding"""
+    return compression_stats.stats()
+
+@router.get("/admission")
+async def admission_metrics():
+    return admission_stats()
+
+@router.get("/buyer-pool")
+async def buyer_pool_metrics():
+    return buyer_pool.stats()
+
+@router.get("/audit-log")
+async def audit_log_metrics():
+    """Queue depth, blocked/dropped records and writer throughput"""
+    return audit_log.stats()
+
+@router.get("/memory")
+async def memory_metrics():
+    """Memory of the worker serving this request; see serve.py for preloading"""
+    return {"memory": process_memory()}
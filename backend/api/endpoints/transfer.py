@@ -1,6 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from agents.orchestrator import AgentOrchestrator
+from api.responses import AgentResult, json_response
+from config.security import CurrentUser, get_current_user
+from middleware.response_cache import cache_response
 
 router = APIRouter()
 orchestrator = AgentOrchestrator()
@@ -8,26 +11,27 @@ orchestrator = AgentOrchestrator()
 class TransferRequest(BaseModel):
     business_type: str
 
-@router.post("/start-transfer")
-async def start_transfer(request: TransferRequest):
+@router.post("/start-transfer", response_model=AgentResult)
+async def start_transfer(request: TransferRequest, current_user: CurrentUser = Depends(get_current_user)):
     try:
         result = await orchestrator.execute_workflow(
-            user_id="demo_user",
+            user_id=str(current_user.id),
             action="start_transfer",
             data={"business_type": request.business_type}
         )
-        return result
+        return json_response(result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/checklist/{business_type}")
-async def get_checklist(business_type: str):
+@router.get("/checklist/{business_type}", response_model=AgentResult)
+@cache_response(ttl=3600, vary=["authorization"])
+async def get_checklist(business_type: str, current_user: CurrentUser = Depends(get_current_user)):
     try:
         result = await orchestrator.execute_workflow(
-            user_id="demo_user",
+            user_id=str(current_user.id),
             action="start_transfer",
             data={"business_type": business_type}
         )
-        return result
+        return json_response(result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,91 @@
+from datetime import date
+from fastapi import APIRouter, HTTPException, Depends
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any, List, Literal, Optional
+
+from agents.orchestrator import AgentOrchestrator
+from api.responses import AgentResult, json_response
+from config.security import CurrentUser, get_current_user, get_optional_user
+from middleware.admission import admission_class
+from services.financial_history import history_store
+from services.valuation_engine import ValuationEngine
+
+router = APIRouter()
+orchestrator = AgentOrchestrator()
+valuation_engine = ValuationEngine()
+
+class ValuationRequest(BaseModel):
+    financial_data: Dict[str, Any]
+    # Attach this business's stored history (TTM EBITDA, growth, volatility)
+    business_id: Optional[int] = None
+
+class DetailedValuationRequest(BaseModel):
+    financial_data: Dict[str, Any]
+    method: str = 'auto'
+    business_id: Optional[int] = None
+
+class HistoryPeriod(BaseModel):
+    period_end: date
+    period_type: Literal['Q', 'A']
+    revenue: float
+    ebitda: float
+    total_assets: Optional[float] = None
+
+class HistoryUpload(BaseModel):
+    periods: List[HistoryPeriod]
+
+async def _with_history(financial_data: Dict[str, Any], business_id: Optional[int]) -> Dict[str, Any]:
+    if business_id is None:
+        return financial_data
+    metrics = await run_in_threadpool(history_store.metrics, [business_id])
+    if business_id not in metrics:
+        return financial_data
+    return {**financial_data, 'history': metrics[business_id]}
+
+@router.post("/calculate", response_model=AgentResult)
+@admission_class("heavy")
+async def calculate_valuation(request: ValuationRequest,
+                              current_user: CurrentUser = Depends(get_current_user)):
+    try:
+        result = await orchestrator.execute_workflow(
+            user_id=str(current_user.id),
+            action="start_valuation",
+            data={"financial_data": await _with_history(request.financial_data, request.business_id)}
+        )
+        return json_response(result)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/detailed")
+@admission_class("heavy")
+async def detailed_valuation(request: DetailedValuationRequest,
+                             current_user: Optional[CurrentUser] = Depends(get_optional_user)):
+    if request.business_id is not None and current_user is None:
+        # Stored history (TTM revenue, EBITDA) is not public
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    try:
+        financial_data = await _with_history(request.financial_data, request.business_id)
+        return json_response(valuation_engine.calculate_valuation(financial_data, request.method))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# --- Financial History ---
+
+@router.put("/history/{business_id}")
+def save_history(business_id: int, upload: HistoryUpload,
+                 current_user: CurrentUser = Depends(get_current_user)):
+    try:
+        stored = history_store.save(business_id, [p.model_dump() for p in upload.periods])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"success": True, "periods": stored, "metrics": history_store.metrics([business_id])[business_id]}
+
+@router.get("/history/{business_id}")
+def get_history_metrics(business_id: int, current_user: CurrentUser = Depends(get_current_user)):
+    metrics = history_store.metrics([business_id])
+    if business_id not in metrics:
+        raise HTTPException(status_code=404, detail=f"No financial history for business {business_id}")
+    return {"business_id": business_id, "metrics": metrics[business_id]}
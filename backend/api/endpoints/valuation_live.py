@@ -0,0 +1,154 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from typing import Any, Dict, Optional
+import asyncio
+import json
+import logging
+import math
+
+from config.security import InvalidTokenError, authenticate_token
+from config.settings import settings
+from services.valuation_engine import ValuationEngine
+
+router = APIRouter()
+valuation_engine = ValuationEngine()
+logger = logging.getLogger(__name__)
+
+POLICY_VIOLATION_CLOSE_CODE = 1008
+INTERNAL_ERROR_CLOSE_CODE = 1011
+
+class LiveValuationSession:
+    """Coalesces a stream of input changes into debounced valuation pushes.
+
+    Changes are merged into ``pending`` as they arrive; once the client has
+    been quiet for ``debounce`` seconds (or ``max_delay`` has passed since
+    the first unsent change, so a continuous slider drag still updates),
+    only the methods reading a field whose value actually changed are
+    recomputed and the full set of results is pushed.
+    """
+    def __init__(self, websocket: WebSocket, engine: ValuationEngine,
+                 debounce: float, max_delay: float):
+        self.websocket = websocket
+        self.engine = engine
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.inputs: Dict[str, float] = {}
+        self.pending: Dict[str, float] = {}
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.seq = 0
+        self._changed = asyncio.Event()
+        self._send_lock = asyncio.Lock()
+
+    def update(self, fields: Dict[str, float]):
+        self.pending.update(fields)
+        self._changed.set()
+
+    async def send(self, payload: Dict[str, Any]):
+        # The reader loop and the push loop both write to the socket
+        async with self._send_lock:
+            await self.websocket.send_text(json.dumps(payload))
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._changed.wait()
+            deadline = loop.time() + self.max_delay
+            while True:
+                self._changed.clear()
+                timeout = min(self.debounce, deadline - loop.time())
+                if timeout <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            await self.push()
+
+    async def push(self):
+        changed = [f for f, value in self.pending.items() if self.inputs.get(f) != value]
+        self.inputs.update(self.pending)
+        self.pending.clear()
+        if self.results and not changed:
+            return
+
+        methods = self.engine.affected_methods(changed) if self.results else list(self.engine.methods)
+        self.results.update(self.engine.calculate_methods(self.inputs, methods))
+        self.seq += 1
+        await self.send({
+            "type": "valuation",
+            "seq": self.seq,
+            "changed_fields": changed,
+            "recomputed": methods,
+            "recommended_method": self.engine.recommended_method(self.inputs),
+            "results": self.results,
+        })
+
+def _parse_fields(raw: Any) -> Dict[str, float]:
+    if not isinstance(raw, dict):
+        raise ValueError("'fields' must be an object")
+    fields = {}
+    for name, value in raw.items():
+        if name not in ValuationEngine.INPUT_FIELDS:
+            raise ValueError(f"Unknown field: {name}")
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f"Field {name} must be a finite number")
+        fields[name] = value
+    return fields
+
+@router.websocket("/ws")
+async def live_valuation(websocket: WebSocket, token: Optional[str] = None):
+    """Live re-valuation while the user adjusts inputs.
+
+    Connect with the access token as ``?token=``; browsers cannot set an
+    Authorization header on websockets. Send
+    ``{"type": "update", "fields": {"ebitda": 5000000}}`` frames with any
+    subset of ValuationEngine.INPUT_FIELDS and receive ``valuation`` frames
+    holding every method's result.
+    """
+    try:
+        authenticate_token(token or "")
+    except InvalidTokenError:
+        await websocket.close(code=POLICY_VIOLATION_CLOSE_CODE)
+        return
+
+    await websocket.accept()
+    session = LiveValuationSession(
+        websocket,
+        valuation_engine,
+        debounce=settings.VALUATION_LIVE_DEBOUNCE_MS / 1000,
+        max_delay=settings.VALUATION_LIVE_MAX_DELAY_MS / 1000
+    )
+    pusher = asyncio.create_task(session.run())
+    reader = asyncio.create_task(_read_frames(websocket, session))
+    try:
+        done, _ = await asyncio.wait({pusher, reader}, return_when=asyncio.FIRST_COMPLETED)
+        if pusher in done:
+            # run() only ends by raising; without pushes the socket is useless
+            logger.error("Live valuation push failed", exc_info=pusher.exception())
+            try:
+                await websocket.close(code=INTERNAL_ERROR_CLOSE_CODE)
+            except RuntimeError:
+                pass  # Already closed by the client
+        else:
+            reader.result()
+    finally:
+        pusher.cancel()
+        reader.cancel()
+
+async def _read_frames(websocket: WebSocket, session: LiveValuationSession):
+    try:
+        while True:
+            data = await websocket.receive_text()
+            try:
+                frame = json.loads(data)
+                if not isinstance(frame, dict):
+                    raise ValueError("Frames must be JSON objects")
+                if frame.get("type") == "ping":
+                    await session.send({"type": "pong"})
+                elif frame.get("type", "update") == "update":
+                    session.update(_parse_fields(frame.get("fields")))
+                else:
+                    raise ValueError(f"Unknown frame type: {frame.get('type')}")
+            except ValueError as e:
+                await session.send({"type": "error", "detail": str(e)})
+    except WebSocketDisconnect:
+        pass
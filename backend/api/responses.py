@@ -0,0 +1,26 @@
+from typing import Any, Dict, List, Mapping, Optional
+
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel
+
+# Returning one of these from an endpoint skips FastAPI's jsonable_encoder
+# walk and response_model re-validation; ``response_model`` on the route is
+# then only used for the OpenAPI schema. Payloads must already be plain
+# JSON types (dicts, lists, str, numbers, datetimes).
+
+def json_response(content: Any, status_code: int = 200,
+                  headers: Optional[Mapping[str, str]] = None) -> ORJSONResponse:
+    return ORJSONResponse(content, status_code=status_code, headers=headers)
+
+def model_response(model: BaseModel, status_code: int = 200,
+                   headers: Optional[Mapping[str, str]] = None) -> Response:
+    """Serialize an already-validated model with pydantic-core, without a dict round trip"""
+    return Response(model.model_dump_json(), status_code=status_code,
+                    headers=headers, media_type="application/json")
+
+class AgentResult(BaseModel):
+    """Envelope returned by AgentOrchestrator.execute_workflow"""
+    agent: str
+    result: str
+    data: Dict[str, Any] = {}
+    next_actions: List[str] = []
@@ -0,0 +1,97 @@
+"""Login throughput benchmark.
+
+Runs concurrent logins against the auth router in-process and reports
+logins/sec plus the worst event-loop stall seen while they ran, once with
+bcrypt on the hashing pool and once with bcrypt called inline (the old
+behaviour) for comparison.
+
+    cd backend && python -m benchmarks.bench_auth --logins 64 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+# Point the app at a throwaway database before anything imports settings
+_db_dir = tempfile.mkdtemp(prefix="bench_auth_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+
+import httpx
+from fastapi import FastAPI
+
+from api.endpoints import auth
+from config import security
+from models.database import Base, engine
+
+EMAIL = "bench@example.com"
+PASSWORD = "correct horse battery staple"
+
+async def _inline_verify(plain_password: str, hashed_password: str) -> bool:
+    return security.verify_password(plain_password, hashed_password)
+
+async def _loop_lag_monitor(stop: asyncio.Event, interval: float = 0.01) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+async def _run(client: httpx.AsyncClient, logins: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def login():
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(_loop_lag_monitor(stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    worst_lag = await monitor
+
+    latencies.sort()
+    return {
+        "logins": logins,
+        "concurrency": concurrency,
+        "logins_per_sec": round(logins / elapsed, 2),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+        "max_event_loop_stall_ms": round(worst_lag * 1000, 1),
+    }
+
+async def main(logins: int, concurrency: int) -> dict:
+    Base.metadata.create_all(bind=engine)
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/api/auth")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/api/auth/register", json={"email": EMAIL, "password": PASSWORD})
+
+        results = {"offloaded": await _run(client, logins, concurrency)}
+
+        original = auth.verify_password_async
+        auth.verify_password_async = _inline_verify
+        try:
+            results["inline"] = await _run(client, logins, concurrency)
+        finally:
+            auth.verify_password_async = original
+
+    results["hash_workers"] = security.settings.AUTH_HASH_WORKERS
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.logins, args.concurrency)), indent=2))
@@ -0,0 +1,126 @@
+"""JSON encoding throughput for the largest API payloads, before and after.
+
+For each payload this times the full body-rendering step of a response:
+
+* ``stdlib``: FastAPI's default path, ``jsonable_encoder`` + ``JSONResponse``
+* ``orjson_encoded``: ``ORJSONResponse`` as the app default, still behind
+  ``jsonable_encoder`` (routes that return plain dicts)
+* ``orjson``: ``api.responses.json_response``, no encoder pass
+* ``model_dump_json``: ``api.responses.model_response`` (step save payloads)
+
+and reports bytes/sec and ops/sec per path, plus the speedup over stdlib:
+
+    cd backend
+    python -m benchmarks.bench_json
+    python -m benchmarks.bench_json --sizes 100,10000 --output bench_json.json
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from api.endpoints.listing import BusinessInfo, SectionSaved
+from api.responses import json_response, model_response
+from benchmarks.common import write_report
+from benchmarks.micro import synthetic_buyer_pool, time_ops
+
+def match_payload(size: int) -> Dict:
+    matches = [
+        {**buyer, "match_score": 0.8, "anonymized_id": f"BUYER_{buyer['id'][:8]}"}
+        for buyer in synthetic_buyer_pool(size)
+    ]
+    return {
+        "agent": "match",
+        "result": f"{len(matches)} investors matched this week",
+        "data": {"matches": matches, "match_count": len(matches),
+                 "recommendation_reason": "Based on sector fit and investment capacity"},
+        "next_actions": ["View match details", "Initiate contact"],
+    }
+
+def document_payload(size: int) -> Dict:
+    started = datetime(2025, 1, 1)
+    return {"documents": [
+        {
+            "filename": f"statement_{i:05d}.pdf",
+            "uploaded_at": (started + timedelta(minutes=i)).isoformat(),
+            "size": 1024 * (i % 900 + 100),
+            "file_path": f"data_rooms/42/statement_{i:05d}.pdf",
+        }
+        for i in range(size)
+    ]}
+
+def chat_payload(size: int) -> Dict:
+    messages = [
+        {"id": 1 << 40 | i, "channel": "deal:42", "sender": f"user-{i % 7}",
+         "message": "Can you share the last three GST returns?", "created_at": "2025-01-01T10:00:00"}
+        for i in range(size)
+    ]
+    return {"channel": "deal:42", "messages": messages, "next_cursor": messages[0]["id"]}
+
+def build_cases(sizes: List[int]) -> Dict[str, Dict[str, Callable[[], bytes]]]:
+    cases: Dict[str, Dict[str, Callable[[], bytes]]] = {}
+    for size in sizes:
+        for name, payload in (("matches", match_payload(size)),
+                              ("documents", document_payload(size)),
+                              ("chat_history", chat_payload(size))):
+            cases[f"{name}[{size}]"] = {
+                "stdlib": lambda p=payload: JSONResponse(jsonable_encoder(p)).body,
+                "orjson_encoded": lambda p=payload: ORJSONResponse(jsonable_encoder(p)).body,
+                "orjson": lambda p=payload: json_response(p).body,
+            }
+
+    info = BusinessInfo(name="Load Test Traders", sector="Manufacturing", location="Pune",
+                        years_operation=12, description="x" * 2000)
+    envelope = {"success": True, "message": "Business information saved successfully",
+                "next_step": "financial_info"}
+    cases["business_info_step"] = {
+        "stdlib": lambda: JSONResponse(jsonable_encoder({**envelope, "data": info.dict()})).body,
+        "orjson_encoded": lambda: ORJSONResponse(jsonable_encoder({**envelope, "data": info.dict()})).body,
+        "model_dump_json": lambda: model_response(
+            SectionSaved[BusinessInfo].model_construct(**envelope, data=info)
+        ).body,
+    }
+    return cases
+
+def run(sizes: List[int], only: Optional[str], min_time: float, rounds: int) -> Dict[str, Dict]:
+    results = {}
+    for case, paths in build_cases(sizes).items():
+        if only and only not in case:
+            continue
+        results[case] = {}
+        for path, render in paths.items():
+            size = len(render())
+            ops = time_ops(render, min_time, rounds)
+            results[case][path] = {
+                "body_bytes": size,
+                "ops_per_sec": round(ops, 2),
+                "mb_per_sec": round(size * ops / 1e6, 2),
+            }
+        base = results[case]["stdlib"]["ops_per_sec"]
+        for path, metrics in results[case].items():
+            metrics["speedup"] = round(metrics["ops_per_sec"] / base, 2) if base else None
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000,10000", help="Comma-separated list lengths")
+    parser.add_argument("--only", help="Run cases whose name contains this string")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timed round")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    report = {"python": sys.version.split()[0],
+              "cases": run(sizes, args.only, args.min_time, args.rounds)}
+    print(json.dumps(report, indent=2))
+    if args.output:
+        write_report(args.output, report)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
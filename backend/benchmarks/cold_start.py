@@ -0,0 +1,103 @@
+"""Cold-start profiler for ``main:app``.
+
+Imports the app in fresh interpreters with ``-X importtime`` and reports the
+median wall time, the slowest modules (cumulative and self time), and which
+of the deliberately deferred heavy dependencies were still imported. Exits
+non-zero when the median exceeds the budget, so it can gate a deploy.
+
+    cd backend && python -m benchmarks.cold_start --runs 5 --top 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+from config.settings import settings
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependencies that should only load on the routes that use them
+DEFERRED_MODULES = ["pandas", "numpy", "pyarrow", "boto3", "botocore", "passlib", "jose", "brotli", "zstandard"]
+
+_PROBE = (
+    "import time; started = time.perf_counter(); "
+    "import {module}; "
+    "print('COLD_START_SECONDS', time.perf_counter() - started)"
+)
+
+def _run_once(module: str) -> Dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module)],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    seconds = next(
+        float(line.split()[1]) for line in proc.stdout.splitlines()
+        if line.startswith("COLD_START_SECONDS")
+    )
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return {"seconds": seconds, "modules": modules}
+
+def _median_modules(runs: List[Dict]) -> Dict[str, Dict[str, float]]:
+    names = set().union(*(run["modules"] for run in runs))
+    result = {}
+    for name in names:
+        samples = [run["modules"][name] for run in runs if name in run["modules"]]
+        result[name] = {
+            "self_ms": round(statistics.median(s[0] for s in samples) / 1000, 2),
+            "cumulative_ms": round(statistics.median(s[1] for s in samples) / 1000, 2),
+        }
+    return result
+
+def profile(module: str = "main", runs: int = 5, top: int = 15, budget_ms: float = None) -> Dict:
+    budget_ms = budget_ms if budget_ms is not None else settings.COLD_START_BUDGET_MS
+    samples = [_run_once(module) for _ in range(runs)]
+    modules = _median_modules(samples)
+    median_ms = round(statistics.median(s["seconds"] for s in samples) * 1000, 1)
+
+    by_package: Dict[str, float] = {}
+    for name, timing in modules.items():
+        package = name.split(".")[0]
+        by_package[package] = by_package.get(package, 0) + timing["self_ms"]
+
+    return {
+        "module": module,
+        "runs": runs,
+        "median_ms": median_ms,
+        "budget_ms": budget_ms,
+        "within_budget": median_ms <= budget_ms,
+        "eager_deferred_modules": [m for m in DEFERRED_MODULES if m in modules],
+        "top_cumulative": sorted(
+            ({"module": n, **t} for n, t in modules.items()),
+            key=lambda m: m["cumulative_ms"], reverse=True
+        )[:top],
+        "top_packages_self_ms": dict(
+            sorted(((p, round(ms, 2)) for p, ms in by_package.items()),
+                   key=lambda item: item[1], reverse=True)[:top]
+        ),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--output", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    report = profile(args.module, args.runs, args.top, args.budget_ms)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    sys.exit(0 if report["within_budget"] else 1)
@@ -0,0 +1,51 @@
+"""Shared helpers for the benchmark scripts"""
+import json
+import math
+from typing import Dict, List, Optional
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarize_latencies(latencies: List[float], elapsed: float, errors: int = 0) -> Dict:
+    """Throughput and latency percentiles (ms) for one endpoint or function"""
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "requests": count + errors,
+        "errors": errors,
+        "throughput_rps": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(values) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+    }
+
+def load_report(path: str) -> Optional[Dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def write_report(path: str, report: Dict) -> None:
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def compare_metric(current: float, baseline: float, higher_is_better: bool,
+                   threshold: float) -> Dict:
+    """Relative change of one metric and whether it regressed past threshold"""
+    if not baseline:
+        return {"baseline": baseline, "current": current, "change": None, "regressed": False}
+    change = (current - baseline) / baseline
+    regressed = change < -threshold if higher_is_better else change > threshold
+    return {
+        "baseline": baseline,
+        "current": current,
+        "change": round(change, 4),
+        "regressed": regressed,
+    }
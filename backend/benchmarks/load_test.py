@@ -0,0 +1,324 @@
+"""HTTP/websocket load test for ``main:app`` and the ``main-simple.py`` app.
+
+Each endpoint scenario is driven by ``--concurrency`` closed-loop clients for
+``--requests`` calls, either in-process through the ASGI interface or over
+loopback against a uvicorn server started in this process. Results are
+reported per endpoint as JSON (throughput and p50/p95/p99 latency) and can
+be compared with an earlier report to catch regressions:
+
+    cd backend
+    python -m benchmarks.load_test --target main --output load_main.json
+    python -m benchmarks.load_test --target main --compare load_main.json
+    python -m benchmarks.load_test --target simple --mode loopback
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The app writes its SQLite file and data rooms relative to the working
+# directory; keep benchmark runs out of the source tree
+_WORK_DIR = tempfile.mkdtemp(prefix="load_test_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_WORK_DIR, 'load_test.db')}")
+# Never append benchmark traffic to the real audit trail
+os.environ["AUDIT_LOG_DIR"] = os.path.join(_WORK_DIR, "audit_log")
+# One benchmark client would trip the per-client limits; measure raw capacity
+for _name in ("ADMISSION_HEAVY_RATE", "ADMISSION_HEAVY_CONCURRENCY",
+              "ADMISSION_UPLOAD_RATE", "ADMISSION_UPLOAD_CONCURRENCY"):
+    os.environ.setdefault(_name, "0")
+sys.path.insert(0, BACKEND_DIR)
+
+import httpx
+
+from benchmarks.common import compare_metric, load_report, summarize_latencies, write_report
+
+FINANCIAL_DATA = {
+    "annual_revenue": 25_000_000,
+    "ebitda": 5_000_000,
+    "total_assets": 12_000_000,
+    "profit_margin": 0.2,
+    "years_operation": 12,
+}
+BUSINESS_INFO = {
+    "name": "Load Test Traders",
+    "sector": "Manufacturing",
+    "location": "Pune",
+    "years_operation": 12,
+    "description": "Benchmark fixture",
+}
+DOCUMENT = ("statement.pdf", b"%PDF-1.4\n" + b"0" * 64 * 1024, "application/pdf")
+
+def load_app(target: str):
+    if target == "main":
+        import main
+        return main.app
+    spec = importlib.util.spec_from_file_location("main_simple", os.path.join(BACKEND_DIR, "main-simple.py"))
+    module = importlib.util.module_from_spec(spec)
+    # Registered before exec so pydantic can resolve the module's generic models
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module.app
+
+def http_scenarios() -> Dict[str, Callable[[httpx.AsyncClient], Any]]:
+    """Endpoint name -> coroutine issuing one request (same paths on both apps)"""
+    return {
+        "valuation_calculate": lambda c: c.post("/api/valuation/calculate", json={"financial_data": FINANCIAL_DATA}),
+        "listing_step": lambda c: c.post("/api/listing/step", json={"current_step": 1, "user_data": {}}),
+        "listing_business_info": lambda c: c.post("/api/listing/business-info", json=BUSINESS_INFO),
+        "matching_find_buyers": lambda c: c.post(
+            "/api/matching/find-buyers",
+            json={"business_profile": {"sector": "Technology", "location": "Mumbai"}}
+        ),
+        "transfer_checklist": lambda c: c.get("/api/transfer/checklist/private_limited"),
+        "document_upload": lambda c: c.post(
+            "/api/documents/upload", params={"business_id": "load-test"}, files={"file": DOCUMENT}
+        ),
+        "document_list": lambda c: c.get("/api/documents/list/load-test"),
+    }
+
+async def _authenticate(client: httpx.AsyncClient) -> None:
+    """Log in as a benchmark user when the app has the auth router"""
+    credentials = {"email": "loadtest@example.com", "password": "load-test-password"}
+    response = await client.post("/api/auth/register", json=credentials)
+    if response.status_code == 404:
+        return
+    response = await client.post("/api/auth/login", json=credentials)
+    response.raise_for_status()
+    client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+async def _drive(call: Callable[[], Any], requests: int, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def client_loop():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                ok = await call()
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    return summarize_latencies(latencies, time.perf_counter() - started, errors)
+
+async def _run_http(client: httpx.AsyncClient, requests: int, concurrency: int,
+                    only: Optional[List[str]]) -> Dict[str, Dict]:
+    results = {}
+    for name, scenario in http_scenarios().items():
+        if only and name not in only:
+            continue
+
+        async def call(scenario=scenario):
+            response = await scenario(client)
+            return response.status_code < 400
+
+        await call()  # warm-up
+        results[name] = await _drive(call, requests, concurrency)
+    return results
+
+class AsgiWebSocket:
+    """Minimal in-process websocket client speaking ASGI to the app"""
+    def __init__(self, app, path: str):
+        self.app = app
+        self.path, _, self.query = path.partition("?")
+        self._to_app: asyncio.Queue = asyncio.Queue()
+        self._from_app: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self):
+        scope = {
+            "type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws",
+            "path": self.path, "raw_path": self.path.encode(), "root_path": "",
+            "query_string": self.query.encode(), "headers": [], "subprotocols": [],
+            "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+        }
+        await self._to_app.put({"type": "websocket.connect"})
+        self._task = asyncio.create_task(self.app(scope, self._to_app.get, self._from_app.put))
+        message = await self._from_app.get()
+        if message["type"] != "websocket.accept":
+            raise RuntimeError(f"Websocket refused: {message}")
+        return self
+
+    async def send_text(self, text: str):
+        await self._to_app.put({"type": "websocket.receive", "text": text})
+
+    async def receive_text(self) -> str:
+        message = await self._from_app.get()
+        if message["type"] != "websocket.send":
+            raise RuntimeError(f"Websocket closed: {message}")
+        return message.get("text") or message.get("bytes", b"").decode()
+
+    async def __aexit__(self, *exc):
+        await self._to_app.put({"type": "websocket.disconnect", "code": 1000})
+        await asyncio.wait_for(self._task, timeout=5)
+
+class LoopbackWebSocket:
+    """Same interface as AsgiWebSocket on top of the 'websockets' client"""
+    def __init__(self, url: str):
+        import websockets
+        self._connect = websockets.connect(url)
+        self._ws = None
+
+    async def __aenter__(self):
+        self._ws = await self._connect.__aenter__()
+        return self
+
+    async def send_text(self, text: str):
+        await self._ws.send(text)
+
+    async def receive_text(self) -> str:
+        return await self._ws.recv()
+
+    async def __aexit__(self, *exc):
+        await self._connect.__aexit__(*exc)
+
+def _has_chat(app) -> bool:
+    return any(getattr(route, "path", "") == "/api/chat/ws/{client_id}" for route in app.routes)
+
+def _ws_token(client: httpx.AsyncClient) -> str:
+    # Websockets authenticate with ?token= rather than a header
+    return client.headers.get("Authorization", "").removeprefix("Bearer ")
+
+async def _run_chat(connect: Callable[[str], Any], token: str, requests: int, concurrency: int) -> Dict:
+    """Chat echo: each client holds one socket and does request/reply round trips"""
+    per_client = max(1, requests // concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def client_loop(index: int):
+        nonlocal errors
+        try:
+            async with connect(f"/api/chat/ws/load-{index}?token={token}") as ws:
+                for _ in range(per_client):
+                    started = time.perf_counter()
+                    await ws.send_text(json.dumps({"message": "ping from load test"}))
+                    await ws.receive_text()
+                    latencies.append(time.perf_counter() - started)
+        except Exception:
+            errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop(i) for i in range(concurrency)))
+    return summarize_latencies(latencies, time.perf_counter() - started, errors)
+
+async def run_in_process(app, requests: int, concurrency: int, only: Optional[List[str]]) -> Dict:
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await _authenticate(client)
+            results = await _run_http(client, requests, concurrency, only)
+            token = _ws_token(client)
+        if _has_chat(app) and (not only or "chat_echo" in only):
+            results["chat_echo"] = await _run_chat(lambda path: AsgiWebSocket(app, path), token,
+                                                   requests, concurrency)
+    return results
+
+async def run_loopback(app, requests: int, concurrency: int, only: Optional[List[str]]) -> Dict:
+    import uvicorn
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", lifespan="on")
+    server = uvicorn.Server(config)
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+
+    try:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits) as client:
+            await _authenticate(client)
+            results = await _run_http(client, requests, concurrency, only)
+            token = _ws_token(client)
+
+        if _has_chat(app) and (not only or "chat_echo" in only):
+            try:
+                import websockets  # noqa: F401
+            except ImportError:
+                results["chat_echo"] = {"skipped": "install 'websockets' for loopback websocket runs"}
+            else:
+                results["chat_echo"] = await _run_chat(
+                    lambda path: LoopbackWebSocket(f"ws://127.0.0.1:{port}{path}"), token, requests, concurrency
+                )
+    finally:
+        server.should_exit = True
+        await serve_task
+    return results
+
+def compare(report: Dict, baseline: Dict, threshold: float) -> Dict:
+    """Per-endpoint change in throughput and p95 against an earlier report"""
+    comparison = {}
+    for name, current in report["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous or "p95_ms" not in current or "p95_ms" not in previous:
+            continue
+        comparison[name] = {
+            "throughput_rps": compare_metric(current["throughput_rps"], previous["throughput_rps"], True, threshold),
+            "p95_ms": compare_metric(current["p95_ms"], previous["p95_ms"], False, threshold),
+        }
+    return comparison
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", choices=["main", "simple"], default="main")
+    parser.add_argument("--mode", choices=["in-process", "loopback"], default="in-process")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--only", help="Comma-separated endpoint names to run")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Earlier JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Relative regression allowed before --compare fails")
+    args = parser.parse_args(argv)
+
+    only = args.only.split(",") if args.only else None
+    # Resolve report paths before moving into the scratch directory
+    output = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.compare) if args.compare else None
+    os.chdir(_WORK_DIR)
+    app = load_app(args.target)
+    runner = run_in_process if args.mode == "in-process" else run_loopback
+    endpoints = asyncio.run(runner(app, args.requests, args.concurrency, only))
+
+    report = {
+        "target": args.target,
+        "mode": args.mode,
+        "requests_per_endpoint": args.requests,
+        "concurrency": args.concurrency,
+        "python": sys.version.split()[0],
+        "endpoints": endpoints,
+    }
+
+    exit_code = 0
+    if baseline_path:
+        baseline = load_report(baseline_path)
+        if baseline is None:
+            print(f"No baseline at {baseline_path}; nothing to compare", file=sys.stderr)
+        else:
+            report["comparison"] = compare(report, baseline, args.threshold)
+            if (baseline.get("target"), baseline.get("mode")) != (args.target, args.mode):
+                print("Baseline was recorded with a different target or mode", file=sys.stderr)
+            if any(m["regressed"] for c in report["comparison"].values() for m in c.values()):
+                exit_code = 1
+
+    print(json.dumps(report, indent=2))
+    if output:
+        write_report(output, report)
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""Function-level benchmarks for the valuation and matching hot paths.
+
+Measures ops/sec (best of several timed rounds) and memory allocated per
+call (tracemalloc, in a separate untimed pass) for:
+
+* ``ValuationEngine.calculate_valuation`` for every method and ``auto``
+* ``ValuationAgent._calculate_valuation``
+* ``MatchAgent.find_matches`` over synthetic buyer pools (10^3 .. 10^6)
+* ``BuyerPoolSnapshot.open`` of the same pools written to disk
+* ``utils.helpers.validate_financial_data``
+* ``services.financial_history.history_metrics`` over synthetic quarterly
+  histories (``--history-sizes`` businesses x 12 years)
+
+Baselines are stored as JSON; ``--check`` fails when any benchmark's
+ops/sec drops more than ``--threshold`` below its baseline.
+
+    cd backend
+    python -m benchmarks.micro --save-baseline
+    python -m benchmarks.micro --check --threshold 0.2
+    python -m benchmarks.micro --pool-sizes 1000,1000000 --only match
+"""
+import argparse
+import atexit
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+# Every valuation and match writes an audit record. Keep the cost in the
+# measurement, but write the records to a scratch directory rather than the
+# real trail.
+_AUDIT_DIR = tempfile.mkdtemp(prefix="micro_audit_")
+atexit.register(shutil.rmtree, _AUDIT_DIR, ignore_errors=True)
+os.environ["AUDIT_LOG_DIR"] = _AUDIT_DIR
+
+from agents.match_agent import MatchAgent
+from agents.valuation_agent import ValuationAgent
+from benchmarks.common import compare_metric, load_report, write_report
+from services.buyer_pool import BuyerPoolSnapshot, BuyerPoolStore, SnapshotBuilder, validate_buyer
+from services.financial_history import history_metrics
+from services.valuation_engine import ValuationEngine
+from utils.helpers import validate_financial_data
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "micro.json")
+
+SECTORS = ["Technology", "Manufacturing", "Services", "Retail", "Healthcare",
+           "Food & Beverage", "Logistics", "Education", "Textiles", "Hospitality"]
+LOCATIONS = ["Mumbai", "Delhi", "Bangalore", "Chennai", "Pune", "Hyderabad",
+             "Kolkata", "Ahmedabad", "Jaipur", "Lucknow", "All India"]
+
+FINANCIAL_DATA = {
+    "annual_revenue": 25_000_000,
+    "ebitda": 5_000_000,
+    "total_assets": 12_000_000,
+    "profit_margin": 0.32,
+    "years_operation": 12,
+}
+BUSINESS_PROFILE = {"sector": "Technology", "location": "Mumbai", "valuation": 20_000_000}
+
+def synthetic_buyer_pool(size: int, seed: int = 42) -> List[Dict]:
+    """Buyers shaped like buyer_pool.DEFAULT_BUYERS entries"""
+    rng = random.Random(seed)
+    pool = []
+    for i in range(size):
+        low = rng.choice([1, 2, 5, 10, 20]) * 1_000_000
+        pool.append({
+            "id": f"buyer_{i:07d}",
+            "type": rng.choice(["VC Fund", "Entrepreneur", "Corporate Investor"]),
+            "name": f"Synthetic Buyer {i}",
+            "preferred_sectors": rng.sample(SECTORS, rng.randint(1, 3)),
+            "min_investment": low,
+            "max_investment": low * rng.choice([3, 5, 10]),
+            "preferred_locations": rng.sample(LOCATIONS, rng.randint(1, 3)),
+            "description": "Synthetic benchmark buyer",
+        })
+    return pool
+
+def synthetic_history(businesses: int, years: int = 12, seed: int = 42):
+    """Quarterly history frame shaped like FinancialHistoryStore.load output"""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    quarters = years * 4
+    periods = pd.date_range("2013-03-31", periods=quarters, freq="Q")
+    growth = rng.normal(0.02, 0.03, size=(businesses, quarters))
+    revenue = 5_000_000 * rng.uniform(0.5, 2.0, size=(businesses, 1)) * np.cumprod(1 + growth, axis=1)
+    return pd.DataFrame({
+        'business_id': np.repeat(np.arange(businesses), quarters),
+        'period_end': np.tile(periods.values, businesses),
+        'period_type': 'Q',
+        'revenue': revenue.ravel(),
+        'ebitda': (revenue * rng.uniform(0.1, 0.3, size=(businesses, 1))).ravel(),
+        'total_assets': 10_000_000.0,
+    })
+
+def build_benchmarks(pool_sizes: List[int], history_sizes: List[int] = ()) -> Dict[str, Callable[[], object]]:
+    engine = ValuationEngine()
+    agent = ValuationAgent()
+    benchmarks: Dict[str, Callable[[], object]] = {}
+
+    for method in list(engine.methods) + ["auto"]:
+        benchmarks[f"valuation_engine.{method}"] = (
+            lambda method=method: engine.calculate_valuation(FINANCIAL_DATA, method)
+        )
+    benchmarks["valuation_agent._calculate_valuation"] = lambda: agent._calculate_valuation(FINANCIAL_DATA)
+    benchmarks["helpers.validate_financial_data"] = lambda: validate_financial_data(FINANCIAL_DATA)
+
+    snapshot_dir = tempfile.mkdtemp(prefix="buyer_pool_bench_")
+    atexit.register(shutil.rmtree, snapshot_dir, ignore_errors=True)
+    for size in pool_sizes:
+        builder = SnapshotBuilder()
+        for buyer in synthetic_buyer_pool(size):
+            builder.add(validate_buyer(buyer))
+        path = os.path.join(snapshot_dir, f"{size}.bpool")
+        builder.write(path)
+        del builder
+
+        matcher = MatchAgent(BuyerPoolStore(snapshot=BuyerPoolSnapshot.open(path)))
+        benchmarks[f"match_agent.find_matches[{size}]"] = (
+            lambda matcher=matcher: matcher.find_matches(BUSINESS_PROFILE)
+        )
+        benchmarks[f"buyer_pool.open[{size}]"] = lambda path=path: BuyerPoolSnapshot.open(path)
+
+    for size in history_sizes:
+        frame = synthetic_history(size)
+        benchmarks[f"financial_history.history_metrics[{size}]"] = lambda frame=frame: history_metrics(frame)
+    return benchmarks
+
+def time_ops(func: Callable[[], object], min_time: float, rounds: int) -> float:
+    """Best ops/sec over ``rounds``, each lasting at least ``min_time`` seconds"""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time / 5 or number >= 1 << 24:
+            break
+        number *= 4
+
+    loops = max(1, int(number * (min_time / elapsed))) if elapsed > 0 else number
+    best = 0.0
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - started
+        best = max(best, loops / elapsed if elapsed > 0 else float("inf"))
+    return best
+
+def measure_allocations(func: Callable[[], object], calls: int = 20) -> Dict[str, float]:
+    """Transient (peak) and retained memory per call, traced with tracemalloc"""
+    func()  # warm caches so one-off allocations are not counted
+    peaks, retained = [], []
+    tracemalloc.start()
+    try:
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            result = func()
+            after, peak = tracemalloc.get_traced_memory()
+            del result
+            peaks.append(peak - before)
+            retained.append(after - before)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "peak_alloc_bytes_per_call": max(peaks),
+        "retained_bytes_per_call": round(sum(retained) / calls, 1),
+    }
+
+def run(pool_sizes: List[int], history_sizes: List[int], only: Optional[str],
+        min_time: float, rounds: int) -> Dict[str, Dict]:
+    results = {}
+    for name, func in build_benchmarks(pool_sizes, history_sizes).items():
+        if only and only not in name:
+            continue
+        # Few calls for the big inputs
+        size = int(name.split("[")[1].rstrip("]")) if "[" in name else 0
+        calls = 3 if size >= 100_000 or name.startswith("financial_history") else 20
+        results[name] = {
+            "ops_per_sec": round(time_ops(func, min_time, rounds), 2),
+            **measure_allocations(func, calls),
+        }
+    return results
+
+def check(results: Dict[str, Dict], baseline: Dict, threshold: float) -> Dict[str, Dict]:
+    comparison = {}
+    for name, current in results.items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if previous:
+            comparison[name] = compare_metric(current["ops_per_sec"], previous["ops_per_sec"], True, threshold)
+    return comparison
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pool-sizes", default="1000,10000,100000",
+                        help="Comma-separated buyer pool sizes (up to 1000000)")
+    parser.add_argument("--history-sizes", default="1000,5000",
+                        help="Comma-separated business counts for history_metrics")
+    parser.add_argument("--only", help="Run benchmarks whose name contains this string")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timed round")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="Fail on regressions against the baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed relative drop in ops/sec before --check fails")
+    args = parser.parse_args(argv)
+
+    pool_sizes = [int(size) for size in args.pool_sizes.split(",") if size]
+    history_sizes = [int(size) for size in args.history_sizes.split(",") if size]
+    results = run(pool_sizes, history_sizes, args.only, args.min_time, args.rounds)
+    report = {"python": sys.version.split()[0], "benchmarks": results}
+
+    exit_code = 0
+    if args.check:
+        baseline = load_report(args.baseline)
+        if baseline is None:
+            print(f"No baseline at {args.baseline}; run with --save-baseline first", file=sys.stderr)
+            exit_code = 2
+        else:
+            report["comparison"] = check(results, baseline, args.threshold)
+            regressions = [n for n, c in report["comparison"].items() if c["regressed"]]
+            if regressions:
+                print(f"Regressed past {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+                exit_code = 1
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        previous = load_report(args.baseline) or {"benchmarks": {}}
+        previous["benchmarks"].update(results)
+        previous["python"] = report["python"]
+        write_report(args.baseline, previous)
+
+    print(json.dumps(report, indent=2))
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Per-worker memory with and without serve.py preloading.
+
+Starts ``serve.py`` once with ``--no-preload`` (every worker imports and
+builds everything itself) and once with ``--preload`` (workers forked from a
+parent that already did), sends some traffic so every worker is warm, and
+reads RSS/PSS/USS of every process in the server's tree from /proc. PSS
+summed over the tree is the real footprint; the report shows it for both
+modes and the saving. Linux only.
+
+    cd backend
+    python -m benchmarks.worker_memory --workers 4
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import write_report
+from utils.memory import child_pids, process_memory
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WARM_PATHS = ["/", "/health", "/api/metrics/memory", "/api/metrics/buyer-pool"]
+MB = 1024 * 1024
+
+def _cmdline(pid: int) -> str:
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return f.read().replace(b"\0", b" ").decode(errors="replace")
+    except OSError:
+        return ""
+
+def _wait_ready(base_url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(base_url + "/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become ready")
+
+def _summarize(memory: List[Dict[str, int]]) -> Dict[str, float]:
+    return {
+        f"{key[:-len('_bytes')]}_mb": round(sum(m[key] for m in memory) / MB, 1)
+        for key in ("rss_bytes", "pss_bytes", "uss_bytes")
+    }
+
+def measure(preload: bool, workers: int, port: int, requests: int, settle: float) -> Dict:
+    flag = "--preload" if preload else "--no-preload"
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", str(workers), "--port", str(port),
+         "--host", "127.0.0.1", "--log-level", "warning", flag],
+        cwd=BACKEND_DIR
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        _wait_ready(base_url, timeout=60)
+        # New connections each time so requests spread over the workers
+        for i in range(requests):
+            httpx.get(base_url + WARM_PATHS[i % len(WARM_PATHS)], timeout=10)
+        time.sleep(settle)
+
+        parent = process_memory(server.pid)
+        worker_pids = [pid for pid in child_pids(server.pid)
+                       if "resource_tracker" not in _cmdline(pid)]
+        helper_pids = [pid for pid in child_pids(server.pid) if pid not in worker_pids]
+        worker_memory = [m for m in (process_memory(pid) for pid in worker_pids) if m]
+        helper_memory = [m for m in (process_memory(pid) for pid in helper_pids) if m]
+        tree = [m for m in [parent, *worker_memory, *helper_memory] if m]
+        return {
+            "preload": preload,
+            "workers": [
+                {"pid": m["pid"], "rss_mb": round(m["rss_bytes"] / MB, 1),
+                 "pss_mb": round(m["pss_bytes"] / MB, 1), "uss_mb": round(m["uss_bytes"] / MB, 1)}
+                for m in worker_memory
+            ],
+            "workers_total": _summarize(worker_memory),
+            "parent": _summarize([parent]) if parent else None,
+            "tree_total": _summarize(tree),
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+def run(workers: int, port: int, requests: int, settle: float) -> Dict:
+    without = measure(False, workers, port, requests, settle)
+    with_preload = measure(True, workers, port, requests, settle)
+    before, after = without["tree_total"]["pss_mb"], with_preload["tree_total"]["pss_mb"]
+    return {
+        "workers": workers,
+        "no_preload": without,
+        "preload": with_preload,
+        "pss_saving_mb": round(before - after, 1),
+        "pss_saving_ratio": round((before - after) / before, 3) if before else None,
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--requests", type=int, default=200, help="Warm-up requests per mode")
+    parser.add_argument("--settle", type=float, default=1.0, help="Seconds to wait before measuring")
+    parser.add_argument("--output", help="Also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    if process_memory() is None:
+        print("worker_memory needs /proc/<pid>/smaps_rollup (Linux)", file=sys.stderr)
+        return 2
+    report = run(args.workers, args.port, args.requests, args.settle)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        write_report(args.output, report)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
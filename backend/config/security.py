@@ -1,25 +1,132 @@
-from passlib.context import CryptContext
-from jose import JWTError, jwt
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Dict, Any
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from config.settings import settings
+
+# passlib and jose are imported on first use rather than at startup; most
+# routes never hash a password and cached tokens never reach jose
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# bcrypt takes ~250ms of CPU per call; it runs on this bounded pool so async
+# endpoints never block the event loop and a login burst cannot spawn
+# unbounded threads
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.AUTH_HASH_WORKERS,
+    thread_name_prefix="bcrypt"
+)
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
+# For routes that are public but reveal more to authenticated callers
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token", auto_error=False)
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, get_password_hash, password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    from config.settings import settings
-    
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    
+
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
+
+class TokenCache:
+    """Small LRU of already-verified JWTs, each kept until its own ``exp``"""
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            claims = self._entries.get(token)
+            if claims is None:
+                return None
+            if claims["exp"] <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return claims
+
+    def put(self, token: str, claims: Dict[str, Any]):
+        with self._lock:
+            self._entries[token] = claims
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+_token_cache = TokenCache(settings.AUTH_TOKEN_CACHE_SIZE)
+
+class InvalidTokenError(Exception):
+    pass
+
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """Verify a JWT, skipping the signature check for recently seen tokens"""
+    claims = _token_cache.get(token)
+    if claims is None:
+        from jose import JWTError, jwt
+        try:
+            claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError as e:
+            raise InvalidTokenError(str(e))
+        if "exp" not in claims or "sub" not in claims:
+            raise InvalidTokenError("Token is missing required claims")
+        _token_cache.put(token, claims)
+    return claims
+
+@dataclass(frozen=True)
+class CurrentUser:
+    id: int
+    email: str
+
+def authenticate_token(token: str) -> CurrentUser:
+    """Resolve a bearer token to its user; raises InvalidTokenError"""
+    claims = decode_access_token(token)
+    try:
+        return CurrentUser(id=int(claims["sub"]), email=claims.get("email", ""))
+    except ValueError:
+        raise InvalidTokenError("Token subject is not a user id")
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> CurrentUser:
+    try:
+        return authenticate_token(token)
+    except InvalidTokenError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+async def get_optional_user(token: Optional[str] = Depends(optional_oauth2_scheme)) -> Optional[CurrentUser]:
+    """The caller, or None without a token; an invalid token is still a 401"""
+    if token is None:
+        return None
+    return await get_current_user(token)
@@ -14,6 +14,9 @@ class Settings:
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Threads available for bcrypt and how many verified JWTs to remember
+    AUTH_HASH_WORKERS: int = int(os.getenv("AUTH_HASH_WORKERS", "4"))
+    AUTH_TOKEN_CACHE_SIZE: int = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096"))
     
     # AWS S3 for file storage
     AWS_ACCESS_KEY: str = os.getenv("AWS_ACCESS_KEY", "")
@@ -24,5 +27,125 @@ class Settings:
     # External APIs
     SMERGERS_API_KEY: str = os.getenv("SMERGERS_API_KEY", "")
     INDIABIZ_API_KEY: str = os.getenv("INDIABIZ_API_KEY", "")
+    
+    # Caching: "memory" keeps everything in-process, "local" adds the
+    # in-process shared-backend stand-in, "redis" shares across workers
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    LISTING_CACHE_SIZE: int = int(os.getenv("LISTING_CACHE_SIZE", "1024"))
+    LISTING_CACHE_TTL: int = int(os.getenv("LISTING_CACHE_TTL", "60"))
+    RESPONSE_CACHE_MAX_BYTES: int = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    # Response compression: content-codings in server preference order (br
+    # and zstd need the brotli/zstandard packages) and the smallest body
+    # worth compressing
+    COMPRESSION_ENCODINGS: str = os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip")
+    COMPRESSION_MIN_BYTES: int = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+    
+    # Chat websockets: outbound messages buffered per connection, and what to
+    # do when a client falls behind ("drop" messages or "disconnect" it)
+    CHAT_SEND_QUEUE_SIZE: int = int(os.getenv("CHAT_SEND_QUEUE_SIZE", "256"))
+    CHAT_SLOW_CONSUMER_POLICY: str = os.getenv("CHAT_SLOW_CONSUMER_POLICY", "drop")
+    # Heartbeats and per-worker admission limits
+    CHAT_HEARTBEAT_INTERVAL: float = float(os.getenv("CHAT_HEARTBEAT_INTERVAL", "20"))
+    CHAT_IDLE_TIMEOUT: float = float(os.getenv("CHAT_IDLE_TIMEOUT", "60"))
+    CHAT_MAX_CONNECTIONS: int = int(os.getenv("CHAT_MAX_CONNECTIONS", "10000"))
+    CHAT_MAX_BUFFERED_BYTES: int = int(os.getenv("CHAT_MAX_BUFFERED_BYTES", str(64 * 1024 * 1024)))
+    # "local" delivers within this process only; "redis" fans out across workers
+    CHAT_BUS_BACKEND: str = os.getenv("CHAT_BUS_BACKEND", "local")
+    CHAT_PERSIST_BATCH_SIZE: int = int(os.getenv("CHAT_PERSIST_BATCH_SIZE", "200"))
+    CHAT_PERSIST_INTERVAL: float = float(os.getenv("CHAT_PERSIST_INTERVAL", "0.5"))
+    # Failed batch writes retried before messages are written one by one and
+    # the ones that still fail are dropped (counted in /api/chat/stats)
+    CHAT_PERSIST_MAX_RETRIES: int = int(os.getenv("CHAT_PERSIST_MAX_RETRIES", "3"))
+    # Worker bits (0-63) of chat message ids; every worker writing to the same
+    # database needs its own. serve.py numbers its workers up from this value.
+    # -1 (unset) is only accepted with the single-process "local" bus
+    CHAT_WORKER_ID: int = int(os.getenv("CHAT_WORKER_ID", "-1"))
+
+    # Admission control for expensive routes: per-client token buckets
+    # ("local" per worker, "redis" shared) and per-worker concurrency caps.
+    # Requests wait up to ADMISSION_QUEUE_TIMEOUT seconds before being shed.
+    ADMISSION_BACKEND: str = os.getenv("ADMISSION_BACKEND", "local")
+    ADMISSION_QUEUE_TIMEOUT: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "0.5"))
+    ADMISSION_MAX_CLIENTS: int = int(os.getenv("ADMISSION_MAX_CLIENTS", "100000"))
+    ADMISSION_HEAVY_RATE: float = float(os.getenv("ADMISSION_HEAVY_RATE", "2"))
+    ADMISSION_HEAVY_BURST: int = int(os.getenv("ADMISSION_HEAVY_BURST", "10"))
+    ADMISSION_HEAVY_CONCURRENCY: int = int(os.getenv("ADMISSION_HEAVY_CONCURRENCY", "8"))
+    ADMISSION_UPLOAD_RATE: float = float(os.getenv("ADMISSION_UPLOAD_RATE", "0.5"))
+    ADMISSION_UPLOAD_BURST: int = int(os.getenv("ADMISSION_UPLOAD_BURST", "5"))
+    ADMISSION_UPLOAD_CONCURRENCY: int = int(os.getenv("ADMISSION_UPLOAD_CONCURRENCY", "4"))
+
+    # Request profiling: requests sending the token in X-Profile-Token, plus a
+    # random PROFILING_SAMPLE_RATE fraction, are sampled every
+    # PROFILING_INTERVAL_MS. With neither set the middleware is not installed.
+    PROFILING_TOKEN: str = os.getenv("PROFILING_TOKEN", "")
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+    PROFILING_INTERVAL_MS: float = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+    PROFILING_DIR: str = os.getenv("PROFILING_DIR", "./profiles")
+    PROFILING_MAX_FILES: int = int(os.getenv("PROFILING_MAX_FILES", "200"))
+    PROFILING_MAX_AGE_HOURS: float = float(os.getenv("PROFILING_MAX_AGE_HOURS", "72"))
+
+    # API server (serve.py): worker processes, and whether the app and its
+    # read-only data are loaded once in the parent and shared copy-on-write
+    WEB_WORKERS: int = int(os.getenv("WEB_WORKERS", "2"))
+    WEB_PRELOAD: bool = os.getenv("WEB_PRELOAD", "true").lower() in ("1", "true", "yes")
+
+    # Background jobs (worker.py): processes to run, how often idle workers
+    # poll, retry backoff (base * 2^attempt, capped) and how long a running
+    # job may go without finishing before another worker takes it over
+    JOB_WORKER_PROCESSES: int = int(os.getenv("JOB_WORKER_PROCESSES", "2"))
+    JOB_POLL_INTERVAL: float = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_RETRY_BASE_DELAY: float = float(os.getenv("JOB_RETRY_BASE_DELAY", "5"))
+    JOB_RETRY_MAX_DELAY: float = float(os.getenv("JOB_RETRY_MAX_DELAY", "300"))
+    JOB_LEASE_SECONDS: int = int(os.getenv("JOB_LEASE_SECONDS", "600"))
+
+    # Resumable document uploads: staging directory, size limits and how
+    # long a session may sit idle before it and its staged bytes are removed
+    UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "./uploads")
+    UPLOAD_MAX_BYTES: int = int(os.getenv("UPLOAD_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+    UPLOAD_MAX_CHUNK_BYTES: int = int(os.getenv("UPLOAD_MAX_CHUNK_BYTES", str(32 * 1024 * 1024)))
+    UPLOAD_SESSION_TTL_HOURS: float = float(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24"))
+
+    # Per-business full-text indexes of data room documents, and how much
+    # extracted text is indexed per document
+    DOCUMENT_INDEX_DIR: str = os.getenv("DOCUMENT_INDEX_DIR", "./document_index")
+    DOCUMENT_INDEX_MAX_CHARS: int = int(os.getenv("DOCUMENT_INDEX_MAX_CHARS", "2000000"))
+    # Decompressed XML read from one .docx/.xlsx/.pptx, whatever its zip claims
+    DOCUMENT_INDEX_MAX_XML_BYTES: int = int(os.getenv("DOCUMENT_INDEX_MAX_XML_BYTES", str(16 * 1024 * 1024)))
+
+    # Audit trail of valuations and match sets: gzip JSONL segments written
+    # in batches by a background thread. Producers wait at most
+    # AUDIT_LOG_PUT_TIMEOUT_MS for queue space before a record is dropped.
+    AUDIT_LOG_ENABLED: bool = os.getenv("AUDIT_LOG_ENABLED", "true").lower() in ("1", "true", "yes")
+    AUDIT_LOG_DIR: str = os.getenv("AUDIT_LOG_DIR", "./audit_log")
+    AUDIT_LOG_QUEUE_SIZE: int = int(os.getenv("AUDIT_LOG_QUEUE_SIZE", "10000"))
+    AUDIT_LOG_BATCH_SIZE: int = int(os.getenv("AUDIT_LOG_BATCH_SIZE", "500"))
+    AUDIT_LOG_FLUSH_INTERVAL: float = float(os.getenv("AUDIT_LOG_FLUSH_INTERVAL", "1.0"))
+    AUDIT_LOG_SEGMENT_BYTES: int = int(os.getenv("AUDIT_LOG_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+    AUDIT_LOG_SEGMENT_SECONDS: float = float(os.getenv("AUDIT_LOG_SEGMENT_SECONDS", "3600"))
+    AUDIT_LOG_PUT_TIMEOUT_MS: float = float(os.getenv("AUDIT_LOG_PUT_TIMEOUT_MS", "5"))
+
+    # Businesses read, valued and written per step of a streaming export
+    EXPORT_CHUNK_ROWS: int = int(os.getenv("EXPORT_CHUNK_ROWS", "500"))
+
+    # Per-business financial history (Parquet files)
+    FINANCIAL_HISTORY_DIR: str = os.getenv("FINANCIAL_HISTORY_DIR", "./financial_history")
+
+    # Buyer pool snapshot written by ingest_buyers.py, and how often running
+    # processes check it for a replacement
+    BUYER_POOL_PATH: str = os.getenv("BUYER_POOL_PATH", "./buyer_pool/buyers.bpool")
+    BUYER_POOL_RELOAD_INTERVAL: float = float(os.getenv("BUYER_POOL_RELOAD_INTERVAL", "5"))
+    # Partial location credit for buyers preferring a city this close to the
+    # business (0 disables)
+    MATCH_LOCATION_NEARBY_KM: float = float(os.getenv("MATCH_LOCATION_NEARBY_KM", "0"))
+
+    # Live valuation websocket: input changes are coalesced until the client
+    # pauses for the debounce window, but pushed at least every max delay
+    VALUATION_LIVE_DEBOUNCE_MS: float = float(os.getenv("VALUATION_LIVE_DEBOUNCE_MS", "150"))
+    VALUATION_LIVE_MAX_DELAY_MS: float = float(os.getenv("VALUATION_LIVE_MAX_DELAY_MS", "500"))
+
+    # Median time to import main:app, checked by benchmarks/cold_start.py
+    COLD_START_BUDGET_MS: float = float(os.getenv("COLD_START_BUDGET_MS", "1500"))
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,32 @@
+"""Ingest a buyer file into the buyer pool snapshot.
+
+Streams a CSV (list columns separated by ";") or JSONL file, validates each
+row and writes a new snapshot that running API and job workers pick up
+within BUYER_POOL_RELOAD_INTERVAL seconds (services/buyer_pool.py):
+
+    cd backend
+    python ingest_buyers.py buyers.csv
+    python ingest_buyers.py buyers.jsonl --output /srv/buyer_pool/buyers.bpool
+"""
+import argparse
+import json
+import sys
+
+from config.settings import settings
+from services.buyer_pool import ingest
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build a buyer pool snapshot from CSV or JSONL")
+    parser.add_argument("source", help="Buyer file (.csv or .jsonl)")
+    parser.add_argument("--output", default=settings.BUYER_POOL_PATH)
+    parser.add_argument("--max-errors", type=int, default=100, help="Rejected rows to report")
+    parser.add_argument("--allow-rejects", action="store_true",
+                        help="Publish the valid rows even when some rows are invalid")
+    args = parser.parse_args()
+
+    report = ingest(args.source, args.output, args.max_errors, args.allow_rejects)
+    print(json.dumps(report, indent=2))
+    return 0 if report['published'] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
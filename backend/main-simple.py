@@ -1,9 +1,10 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
-from typing import Dict, Any, List
+from typing import Dict, Any, Generic, List, TypeVar
 
-app = FastAPI(title="Business Exit Platform", version="1.0.0")
+app = FastAPI(title="Business Exit Platform", version="1.0.0", default_response_class=ORJSONResponse)
 
 # CORS middleware
 app.add_middleware(
@@ -181,6 +182,18 @@ class TransferInfo(BaseModel):
     training_required: bool
     support_period: str
 
+SectionT = TypeVar("SectionT", bound=BaseModel)
+
+class SectionSaved(BaseModel, Generic[SectionT]):
+    success: bool
+    message: str
+    next_step: str
+    data: SectionT
+
+def _saved(model: BaseModel) -> Response:
+    # Already validated on the way in; serialize straight to JSON bytes
+    return Response(model.model_dump_json(), media_type="application/json")
+
 @app.post("/api/listing/step")
 async def listing_step(request: ListingRequest):
     steps = [
@@ -216,41 +229,29 @@ async def listing_step(request: ListingRequest):
         }
     }
 
-@app.post("/api/listing/business-info")
+@app.post("/api/listing/business-info", response_model=SectionSaved[BusinessInfo])
 async def save_business_info(info: BusinessInfo):
-    return {
-        "success": True,
-        "message": "Business information saved successfully",
-        "next_step": "financial_info",
-        "data": info.dict()
-    }
+    return _saved(SectionSaved[BusinessInfo].model_construct(
+        success=True, message="Business information saved successfully", next_step="financial_info", data=info
+    ))
 
-@app.post("/api/listing/financial-info")
+@app.post("/api/listing/financial-info", response_model=SectionSaved[FinancialInfo])
 async def save_financial_info(info: FinancialInfo):
-    return {
-        "success": True, 
-        "message": "Financial information saved successfully",
-        "next_step": "assets_info",
-        "data": info.dict()
-    }
+    return _saved(SectionSaved[FinancialInfo].model_construct(
+        success=True, message="Financial information saved successfully", next_step="assets_info", data=info
+    ))
 
-@app.post("/api/listing/assets-info")
+@app.post("/api/listing/assets-info", response_model=SectionSaved[AssetInfo])
 async def save_assets_info(info: AssetInfo):
-    return {
-        "success": True,
-        "message": "Assets information saved successfully", 
-        "next_step": "transfer_info",
-        "data": info.dict()
-    }
+    return _saved(SectionSaved[AssetInfo].model_construct(
+        success=True, message="Assets information saved successfully", next_step="transfer_info", data=info
+    ))
 
-@app.post("/api/listing/transfer-info")
+@app.post("/api/listing/transfer-info", response_model=SectionSaved[TransferInfo])
 async def save_transfer_info(info: TransferInfo):
-    return {
-        "success": True,
-        "message": "Transfer information saved successfully",
-        "next_step": "review",
-        "data": info.dict()
-    }
+    return _saved(SectionSaved[TransferInfo].model_construct(
+        success=True, message="Transfer information saved successfully", next_step="review", data=info
+    ))
 
 @app.post("/api/listing/publish")
 async def publish_listing():
@@ -1,26 +1,55 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
 
 from config.settings import settings
+from middleware.admission import AdmissionMiddleware
+from middleware.compression import CompressionMiddleware
+from middleware.response_cache import ResponseCacheMiddleware, cache_response
 from models.database import engine, Base
-from api.endpoints import valuation, listing, matching, transfer, documents, chat
+from services.audit_log import audit_log
+from services.buyer_pool import buyer_pool
+from services.chat_bus import chat_bus
+from services.connection_manager import manager as connection_manager
+from api.endpoints import auth, valuation, valuation_live, listing, matching, transfer, documents, chat, metrics, admin, jobs, exports
 
 # Create database tables
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Create tables on startup
     Base.metadata.create_all(bind=engine)
+    await chat_bus.start()
+    await buyer_pool.start()
     yield
     # Clean up on shutdown
-    pass
+    await buyer_pool.stop()
+    await chat_bus.stop()
+    await connection_manager.stop()
+    # Everything audited so far must reach disk before the worker exits
+    await run_in_threadpool(audit_log.close)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.PROJECT_VERSION,
+    # orjson for every route that returns plain dicts
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+# Admission control is innermost: cache hits are cheap and skip it, and
+# rejected requests still get CORS headers
+app.add_middleware(AdmissionMiddleware)
+
+# Response cache sits inside CORS so cached bodies never carry another
+# request's CORS headers
+app.add_middleware(ResponseCacheMiddleware)
+
+# Compression wraps the cache, which serves its own stored compressed
+# variants; everything else is compressed here
+app.add_middleware(CompressionMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -30,15 +59,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Profiling wraps everything, middleware included; when it is not configured
+# the middleware is not installed and costs nothing
+if settings.PROFILING_TOKEN or settings.PROFILING_SAMPLE_RATE > 0:
+    from middleware.profiling import ProfilingMiddleware
+    app.add_middleware(ProfilingMiddleware)
+
 # Include routers
+app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(valuation.router, prefix="/api/valuation", tags=["valuation"])
+app.include_router(valuation_live.router, prefix="/api/valuation/live", tags=["valuation"])
 app.include_router(listing.router, prefix="/api/listing", tags=["listing"])
 app.include_router(matching.router, prefix="/api/matching", tags=["matching"])
 app.include_router(transfer.router, prefix="/api/transfer", tags=["transfer"])
 app.include_router(documents.router, prefix="/api/documents", tags=["documents"])
 app.include_router(chat.router, prefix="/api/chat", tags=["chat"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
+app.include_router(exports.router, prefix="/api/exports", tags=["exports"])
+app.include_router(metrics.router, prefix="/api/metrics", tags=["metrics"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 
 @app.get("/")
+@cache_response(ttl=300)
 async def root():
     return {
         "message": "Welcome to Business Exit Platform API",
@@ -47,6 +89,7 @@ async def root():
     }
 
 @app.get("/health")
+@cache_response(ttl=5)
 async def health_check():
     return {"status": "healthy", "service": "business-exit-platform"}
 
@@ -0,0 +1,228 @@
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config.security import InvalidTokenError, decode_access_token
+from config.settings import settings
+
+ADMISSION_ATTRIBUTE = "__admission_class__"
+
+class RouteClass:
+    """Limits shared by every route tagged with the same class name.
+
+    ``rate``/``burst`` size each client's token bucket for each route;
+    ``concurrency`` caps in-flight requests of the whole class per worker.
+    A rate or concurrency of 0 disables that limit.
+    """
+    def __init__(self, name: str, rate: float, burst: int, concurrency: int):
+        self.name = name
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.concurrency = concurrency
+        self.slots = asyncio.Semaphore(concurrency) if concurrency > 0 else None
+        self.in_flight = 0
+        self.stats = {'admitted': 0, 'delayed': 0, 'rate_limited': 0, 'shed': 0}
+
+ROUTE_CLASSES: Dict[str, RouteClass] = {
+    'heavy': RouteClass('heavy', settings.ADMISSION_HEAVY_RATE,
+                        settings.ADMISSION_HEAVY_BURST, settings.ADMISSION_HEAVY_CONCURRENCY),
+    'upload': RouteClass('upload', settings.ADMISSION_UPLOAD_RATE,
+                         settings.ADMISSION_UPLOAD_BURST, settings.ADMISSION_UPLOAD_CONCURRENCY),
+}
+
+def admission_stats() -> Dict[str, Any]:
+    return {
+        name: {**rc.stats, 'in_flight': rc.in_flight, 'concurrency': rc.concurrency,
+               'rate': rc.rate, 'burst': rc.burst}
+        for name, rc in ROUTE_CLASSES.items()
+    }
+
+def admission_class(name: str):
+    """Put a route under a ``ROUTE_CLASSES`` limit; place it below ``@router.post``"""
+    if name not in ROUTE_CLASSES:
+        raise ValueError(f"Unknown admission class: {name}")
+
+    def decorator(endpoint: Callable) -> Callable:
+        setattr(endpoint, ADMISSION_ATTRIBUTE, name)
+        return endpoint
+    return decorator
+
+class LocalBucketBackend:
+    """Token buckets for this worker only, LRU-bounded so idle clients age out.
+
+    ``take`` reserves a token even when the caller has to wait for it, so a
+    queue of waiting requests lines up behind each other instead of all
+    waking at the same instant.
+    """
+    def __init__(self, max_keys: int = settings.ADMISSION_MAX_CLIENTS):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: int, max_wait: float) -> float:
+        """Seconds until a token is available; reserved only if within ``max_wait``"""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(burst), now]
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+
+        tokens = min(float(burst), bucket[0] + (now - bucket[1]) * rate)
+        wait = (1 - tokens) / rate if tokens < 1 else 0.0
+        if wait <= max_wait:
+            tokens -= 1
+        bucket[0], bucket[1] = tokens, now
+        return wait
+
+# Same algorithm as LocalBucketBackend, run atomically inside Redis
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local max_wait = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens < 1 then wait = (1 - tokens) / rate end
+if wait <= max_wait then tokens = tokens - 1 end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+class RedisBucketBackend:
+    """Token buckets shared by every worker pointing at the same Redis"""
+    def __init__(self, url: str):
+        # Optional dependency, only needed when limits are shared across workers
+        import redis.asyncio as redis
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._take = self._redis.register_script(_TAKE_SCRIPT)
+
+    async def take(self, key: str, rate: float, burst: int, max_wait: float) -> float:
+        wait = await self._take(keys=[f"admission:{key}"], args=[rate, burst, time.time(), max_wait])
+        return float(wait)
+
+def _create_backend(name: str):
+    if name == 'redis':
+        return RedisBucketBackend(settings.REDIS_URL)
+    return LocalBucketBackend()
+
+class AdmissionMiddleware:
+    """ASGI admission control for routes tagged with ``@admission_class``.
+
+    Each request first takes a token from its client's bucket for that
+    route, then a concurrency slot of the route's class. Either step may
+    wait, but only until ``queue_timeout`` has passed since arrival; after
+    that the request is shed with 429 (client over its rate) or 503 (class
+    at capacity), both carrying ``Retry-After``. Untagged routes pass
+    straight through.
+    """
+    def __init__(self, app: ASGIApp, backend: Optional[Any] = None,
+                 queue_timeout: float = settings.ADMISSION_QUEUE_TIMEOUT,
+                 classes: Dict[str, RouteClass] = ROUTE_CLASSES):
+        self.app = app
+        self.backend = backend if backend is not None else _create_backend(settings.ADMISSION_BACKEND)
+        self.queue_timeout = queue_timeout
+        self.classes = classes
+        self._routes: Optional[List[Tuple[Any, RouteClass]]] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route, route_class = self._match(scope)
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        deadline = time.monotonic() + self.queue_timeout
+        if route_class.rate > 0:
+            key = f"{route.path}|{_client_key(scope)}"
+            wait = await self.backend.take(key, route_class.rate, route_class.burst, self.queue_timeout)
+            if wait > self.queue_timeout:
+                route_class.stats['rate_limited'] += 1
+                await _reject(send, 429, wait, "Too many requests for this endpoint")
+                return
+            if wait > 0:
+                route_class.stats['delayed'] += 1
+                await asyncio.sleep(wait)
+
+        if route_class.slots is not None and not await self._acquire(route_class, deadline):
+            route_class.stats['shed'] += 1
+            await _reject(send, 503, 1, "Server is busy, try again shortly")
+            return
+
+        route_class.stats['admitted'] += 1
+        route_class.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route_class.in_flight -= 1
+            if route_class.slots is not None:
+                route_class.slots.release()
+
+    def _match(self, scope: Scope) -> Tuple[Any, Optional[RouteClass]]:
+        if self._routes is None:
+            # Routes are fixed once the app is serving; collect tags once
+            self._routes = [
+                (route, self.classes[getattr(route.endpoint, ADMISSION_ATTRIBUTE)])
+                for route in scope["app"].router.routes
+                if hasattr(getattr(route, "endpoint", None), ADMISSION_ATTRIBUTE)
+            ]
+        for route, route_class in self._routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route, route_class
+        return None, None
+
+    async def _acquire(self, route_class: RouteClass, deadline: float) -> bool:
+        if not route_class.slots.locked():
+            await route_class.slots.acquire()
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        route_class.stats['delayed'] += 1
+        try:
+            await asyncio.wait_for(route_class.slots.acquire(), remaining)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+def _client_key(scope: Scope) -> str:
+    """Authenticated callers by user, everyone else by peer address.
+
+    The token is verified (cheaply, through the token cache) first: keying
+    on the raw header would give every made-up token a fresh bucket.
+    """
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token.strip():
+                try:
+                    return "user:" + str(decode_access_token(token.strip())["sub"])
+                except InvalidTokenError:
+                    pass
+            break
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+async def _reject(send: Send, status: int, retry_after: float, detail: str):
+    body = json.dumps({"detail": detail}).encode()
+    await send({"type": "http.response.start", "status": status, "headers": [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+    ]})
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,328 @@
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import anyio
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.settings import settings
+
+NO_COMPRESSION_ATTRIBUTE = "__no_compression__"
+# Set on the scope by a middleware that already chose the response encoding
+# (the response cache serves stored variants itself)
+HANDLED_SCOPE_KEY = "compression.handled"
+
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/x-ndjson", "application/javascript",
+    "application/xml", "image/svg+xml", "text/",
+)
+# Levels for bodies compressed on every response, and for cached bodies
+# compressed once per entry. On our JSON, br 11 and zstd 19 cost ~20x the
+# CPU of these for no smaller output, so even cached variants stop here.
+DYNAMIC_LEVELS = {'gzip': 5, 'br': 4, 'zstd': 3}
+CACHED_LEVELS = {'gzip': 9, 'br': 7, 'zstd': 9}
+# Bodies this large are compressed off the event loop
+THREAD_BYTES = 256 * 1024
+
+def no_compression(endpoint: Callable) -> Callable:
+    """Always send a route's responses uncompressed; place it below ``@router.get``.
+
+    For bodies that are already compressed (files, images) or streams
+    where flushing latency matters more than bytes.
+    """
+    setattr(endpoint, NO_COMPRESSION_ATTRIBUTE, True)
+    return endpoint
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        # Sync flush so each streamed chunk reaches the client promptly
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+class _BrotliStream:
+    def __init__(self, brotli, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+class _ZstdStream:
+    def __init__(self, zstandard, level: int):
+        self._zstandard = zstandard
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(self._zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+class Codec:
+    def __init__(self, name: str, compress: Callable[[bytes, int], bytes], stream: Callable[[int], Any]):
+        self.name = name
+        self.compress = compress
+        self.stream = stream
+
+def _load_codecs() -> Dict[str, Codec]:
+    """Codecs from COMPRESSION_ENCODINGS whose libraries are installed"""
+    codecs = {}
+    for name in (e.strip() for e in settings.COMPRESSION_ENCODINGS.split(",")):
+        if name == "gzip":
+            codecs[name] = Codec(name, _gzip, _GzipStream)
+        elif name == "br":
+            try:
+                import brotli
+            except ImportError:
+                continue
+            codecs[name] = Codec(name, lambda body, level, b=brotli: b.compress(body, quality=level),
+                                 lambda level, b=brotli: _BrotliStream(b, level))
+        elif name == "zstd":
+            try:
+                import zstandard
+            except ImportError:
+                continue
+            codecs[name] = Codec(name, lambda body, level, z=zstandard: z.ZstdCompressor(level=level).compress(body),
+                                 lambda level, z=zstandard: _ZstdStream(z, level))
+    return codecs
+
+def _gzip(body: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+_codecs: Optional[Dict[str, Codec]] = None
+
+def codecs() -> Dict[str, Codec]:
+    # Loaded on first use: brotli/zstandard stay off the import path
+    global _codecs
+    if _codecs is None:
+        _codecs = _load_codecs()
+    return _codecs
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best encoding the client accepts: highest q-value, then our preference order"""
+    if not accept_encoding:
+        return None
+    available = codecs()
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+    best, best_q = None, 0.0
+    for name in available:
+        q = accepted.get(name, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+def compressible(headers: List[Tuple[bytes, bytes]]) -> bool:
+    content_type = b""
+    for name, value in headers:
+        name = name.lower()
+        if name == b"content-encoding":
+            return False
+        if name == b"cache-control" and b"no-transform" in value.lower():
+            return False
+        if name == b"content-type":
+            content_type = value.lower()
+    return content_type.decode("latin-1").startswith(COMPRESSIBLE_TYPES)
+
+def with_vary(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    """``headers`` with Accept-Encoding added to Vary"""
+    values = [v.decode("latin-1") for k, v in headers if k.lower() == b"vary"]
+    names = [n.strip() for value in values for n in value.split(",") if n.strip()]
+    if any(n.lower() in ("accept-encoding", "*") for n in names):
+        return headers
+    headers = [(k, v) for k, v in headers if k.lower() != b"vary"]
+    headers.append((b"vary", ", ".join(names + ["Accept-Encoding"]).encode("latin-1")))
+    return headers
+
+def encoded_headers(headers: List[Tuple[bytes, bytes]], encoding: str,
+                    length: Optional[int]) -> List[Tuple[bytes, bytes]]:
+    """Response headers for the ``encoding`` variant of a body"""
+    result = []
+    for name, value in headers:
+        lower = name.lower()
+        if lower == b"content-length":
+            continue
+        if lower == b"etag" and not value.startswith(b"W/"):
+            # Same content, different bytes: only weakly equal to the original
+            value = b"W/" + value
+        result.append((name, value))
+    result.append((b"content-encoding", encoding.encode()))
+    if length is not None:
+        result.append((b"content-length", str(length).encode()))
+    return with_vary(result)
+
+class CompressionStats:
+    """Per-route CPU spent compressing against bytes saved, per encoding"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[str, Dict[str, Any]] = {}
+
+    def compressed(self, route: str, encoding: str, bytes_in: int, bytes_out: int,
+                   cpu_ns: int, cached: bool = False) -> None:
+        with self._lock:
+            stats = self._route(route)['encodings'].setdefault(encoding, {
+                'responses': 0, 'cached_hits': 0, 'bytes_in': 0, 'bytes_out': 0, 'cpu_ns': 0
+            })
+            stats['cached_hits' if cached else 'responses'] += 1
+            stats['bytes_in'] += bytes_in
+            stats['bytes_out'] += bytes_out
+            stats['cpu_ns'] += cpu_ns
+
+    def skipped(self, route: str, reason: str) -> None:
+        with self._lock:
+            skipped = self._route(route)['skipped']
+            skipped[reason] = skipped.get(reason, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            routes = {}
+            for route, data in self._routes.items():
+                encodings = {}
+                for encoding, s in data['encodings'].items():
+                    saved = s['bytes_in'] - s['bytes_out']
+                    cpu_ms = s['cpu_ns'] / 1e6
+                    encodings[encoding] = {
+                        'responses': s['responses'],
+                        'cached_hits': s['cached_hits'],
+                        'bytes_in': s['bytes_in'],
+                        'bytes_out': s['bytes_out'],
+                        'ratio': round(s['bytes_out'] / s['bytes_in'], 4) if s['bytes_in'] else None,
+                        'cpu_ms': round(cpu_ms, 3),
+                        # What each millisecond of compression CPU bought
+                        'kb_saved_per_cpu_ms': round(saved / 1024 / cpu_ms, 2) if cpu_ms else None,
+                    }
+                routes[route] = {'encodings': encodings, 'skipped': dict(data['skipped'])}
+            return {'available': list(codecs()), 'min_bytes': settings.COMPRESSION_MIN_BYTES, 'routes': routes}
+
+    def _route(self, route: str) -> Dict[str, Any]:
+        if route not in self._routes:
+            self._routes[route] = {'encodings': {}, 'skipped': {}}
+        return self._routes[route]
+
+compression_stats = CompressionStats()
+
+def compress(body: bytes, encoding: str, level_table: Dict[str, int]) -> Tuple[bytes, int]:
+    """Compressed ``body`` and the CPU time it took, in nanoseconds"""
+    started = time.thread_time_ns()
+    compressed = codecs()[encoding].compress(body, level_table[encoding])
+    return compressed, time.thread_time_ns() - started
+
+async def compress_async(body: bytes, encoding: str, level_table: Dict[str, int],
+                         in_thread: bool = False) -> Tuple[bytes, int]:
+    if in_thread or len(body) >= THREAD_BYTES:
+        return await anyio.to_thread.run_sync(compress, body, encoding, level_table)
+    return compress(body, encoding, level_table)
+
+class CompressionMiddleware:
+    """Content-negotiated gzip/br/zstd for compressible responses.
+
+    Single-body responses under ``COMPRESSION_MIN_BYTES`` are sent as is;
+    streamed responses are compressed chunk by chunk. Routes opt out with
+    ``@no_compression``. Cacheable routes are compressed by the response
+    cache, which keeps one compressed variant per entry and encoding.
+    """
+    def __init__(self, app: ASGIApp, min_bytes: int = settings.COMPRESSION_MIN_BYTES,
+                 stats: CompressionStats = compression_stats):
+        self.app = app
+        self.min_bytes = min_bytes
+        self.stats = stats
+        self._paths: Optional[Dict[Any, str]] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = None
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate(accept_encoding)
+
+        start: Optional[Message] = None
+        stream = None
+        route = None
+        bytes_in = bytes_out = cpu_ns = 0
+
+        async def compressing_send(message: Message) -> None:
+            nonlocal start, stream, route, bytes_in, bytes_out, cpu_ns
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                status = message["status"]
+                if (scope.get(HANDLED_SCOPE_KEY) or status < 200 or status in (204, 206, 304)
+                        or not compressible(headers)):
+                    await send(message)
+                    return
+                route = self._route_path(scope)
+                if encoding is None or getattr(scope.get("endpoint"), NO_COMPRESSION_ATTRIBUTE, False):
+                    self.stats.skipped(route, 'opted_out' if encoding else 'not_accepted')
+                    await send({**message, "headers": with_vary(headers)})
+                    return
+                # Hold the start until the first body chunk shows whether it is worth it
+                start = {**message, "headers": headers}
+                return
+
+            if message["type"] != "http.response.body" or (start is None and stream is None):
+                await send(message)
+                return
+
+            body, more_body = message.get("body", b""), message.get("more_body", False)
+            if start is not None and stream is None and not more_body:
+                headers, start_message = start["headers"], start
+                start = None
+                if len(body) < self.min_bytes:
+                    self.stats.skipped(route, 'below_threshold')
+                    await send({**start_message, "headers": with_vary(headers)})
+                    await send(message)
+                    return
+                compressed, used = await compress_async(body, encoding, DYNAMIC_LEVELS)
+                self.stats.compressed(route, encoding, len(body), len(compressed), used)
+                await send({**start_message, "headers": encoded_headers(headers, encoding, len(compressed))})
+                await send({"type": "http.response.body", "body": compressed})
+                return
+
+            if stream is None:
+                # A streamed response: length is unknown, compress as it flows
+                stream = codecs()[encoding].stream(DYNAMIC_LEVELS[encoding])
+                await send({**start, "headers": encoded_headers(start["headers"], encoding, None)})
+                start = None
+            began = time.thread_time_ns()
+            chunk = stream.compress(body) if body else b""
+            if not more_body:
+                chunk += stream.finish()
+            cpu_ns += time.thread_time_ns() - began
+            bytes_in += len(body)
+            bytes_out += len(chunk)
+            if not more_body:
+                self.stats.compressed(route, encoding, bytes_in, bytes_out, cpu_ns)
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, compressing_send)
+
+    def _route_path(self, scope: Scope) -> str:
+        """Route template of the matched endpoint; stats stay bounded by route count"""
+        if self._paths is None:
+            self._paths = {
+                route.endpoint: route.path
+                for route in scope["app"].router.routes
+                if getattr(route, "endpoint", None) is not None
+            }
+        return self._paths.get(scope.get("endpoint"), "unmatched")
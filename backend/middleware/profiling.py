@@ -0,0 +1,217 @@
+import hmac
+import json
+import os
+import random
+import sys
+import sysconfig
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.settings import settings
+
+PROFILE_TOKEN_HEADER = "x-profile-token"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STDLIB_DIR = sysconfig.get_paths()["stdlib"]
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(BACKEND_DIR):
+        filename = os.path.relpath(filename, BACKEND_DIR)
+    elif filename.startswith(STDLIB_DIR):
+        filename = os.path.relpath(filename, STDLIB_DIR)
+    else:
+        # Keep library frames readable: drop everything up to site-packages
+        filename = filename.split("site-packages" + os.sep)[-1]
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+def _runs_app_code(frame) -> bool:
+    while frame is not None:
+        if frame.f_code.co_filename.startswith(BACKEND_DIR):
+            return True
+        frame = frame.f_back
+    return False
+
+class StackSampler:
+    """Samples Python stacks from a background thread into collapsed form.
+
+    The thread that started the request (the event loop) is always sampled;
+    other threads only while they are running code from this project, which
+    picks up sync endpoints and ``run_in_threadpool`` work without filling
+    the profile with idle pool threads. Async stacks show the whole loop,
+    so concurrent requests can appear in each other's profiles.
+    """
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if thread_id != self.thread_id and not _runs_app_code(frame):
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                labels.append(names.get(thread_id, f"thread-{thread_id}"))
+                self.stacks[";".join(reversed(labels))] += 1
+
+class ProfileStore:
+    """Directory of ``<id>.collapsed`` profiles, each with a ``<id>.json`` sidecar.
+
+    The collapsed files are the input format of flamegraph.pl and load
+    directly in speedscope. After each write, profiles beyond ``max_files``
+    or older than ``max_age_hours`` are deleted.
+    """
+    def __init__(self, directory: str, max_files: int, max_age_hours: float):
+        self.directory = directory
+        self.max_files = max_files
+        self.max_age = max_age_hours * 3600
+
+    def save(self, profile_id: str, stacks: Counter, meta: Dict[str, Any]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(profile_id, ".collapsed"), "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(self._path(profile_id, ".json"), "w") as f:
+            json.dump(meta, f)
+        self.prune()
+
+    def list(self, limit: int = 50) -> List[Dict[str, Any]]:
+        profiles = []
+        for profile_id in self._ids()[:limit]:
+            try:
+                with open(self._path(profile_id, ".json")) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return profiles
+
+    def path(self, profile_id: str) -> Optional[str]:
+        # Ids are generated here; reject anything that could escape the directory
+        if os.path.basename(profile_id) != profile_id:
+            return None
+        path = self._path(profile_id, ".collapsed")
+        return path if os.path.isfile(path) else None
+
+    def prune(self) -> None:
+        cutoff = time.time() - self.max_age
+        for index, profile_id in enumerate(self._ids()):
+            collapsed = self._path(profile_id, ".collapsed")
+            try:
+                if index >= self.max_files or os.path.getmtime(collapsed) < cutoff:
+                    os.remove(collapsed)
+                    os.remove(self._path(profile_id, ".json"))
+            except OSError:
+                continue
+
+    def _ids(self) -> List[str]:
+        """Newest first; ids start with a millisecond timestamp"""
+        if not os.path.isdir(self.directory):
+            return []
+        ids = [name[:-len(".collapsed")] for name in os.listdir(self.directory)
+               if name.endswith(".collapsed")]
+        return sorted(ids, reverse=True)
+
+    def _path(self, profile_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, profile_id + suffix)
+
+profile_store = ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_FILES,
+                             settings.PROFILING_MAX_AGE_HOURS)
+
+def is_authorized(token: Optional[str]) -> bool:
+    return bool(settings.PROFILING_TOKEN and token
+                and hmac.compare_digest(token, settings.PROFILING_TOKEN))
+
+class ProfilingMiddleware:
+    """Runs a StackSampler around selected HTTP requests.
+
+    A request is profiled when it carries a valid ``X-Profile-Token`` header
+    or is picked by ``sample_rate``. The response gets an ``X-Profile-Id``
+    header naming the profile, which is written once the request finishes.
+    main.py only installs this middleware when profiling is configured.
+    """
+    def __init__(self, app: ASGIApp, store: ProfileStore = profile_store,
+                 sample_rate: float = settings.PROFILING_SAMPLE_RATE,
+                 interval_ms: float = settings.PROFILING_INTERVAL_MS):
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trigger = self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+        status = 500
+
+        async def profiled_send(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = {**message, "headers": [*message.get("headers", []),
+                                                  (PROFILE_ID_HEADER, profile_id.encode())]}
+            await send(message)
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, profiled_send)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            stacks = sampler.stop()
+            meta = {
+                'id': profile_id,
+                'method': scope["method"],
+                'path': scope["path"],
+                'status': status,
+                'duration_ms': round(duration_ms, 2),
+                'samples': sampler.samples,
+                'interval_ms': self.interval * 1000,
+                'trigger': trigger,
+                'created_at': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            }
+            await run_in_threadpool(self.store.save, profile_id, stacks, meta)
+
+    def _trigger(self, scope: Scope) -> Optional[str]:
+        for name, value in scope.get("headers", []):
+            if name == PROFILE_TOKEN_HEADER.encode():
+                return "header" if is_authorized(value.decode("latin-1")) else None
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sampled"
+        return None
@@ -0,0 +1,363 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.security import InvalidTokenError, decode_access_token
+from config.settings import settings
+from middleware.compression import (
+    CACHED_LEVELS, HANDLED_SCOPE_KEY, NO_COMPRESSION_ATTRIBUTE, compressible, compress_async,
+    compression_stats, encoded_headers, negotiate, with_vary
+)
+
+POLICY_ATTRIBUTE = "__response_cache_policy__"
+
+class CachePolicy:
+    def __init__(self, ttl: int, vary: Iterable[str] = (), tags: Iterable[str] = ()):
+        self.ttl = ttl
+        self.vary = tuple(h.lower() for h in vary)
+        self.tags = tuple(tags)
+        # Responses that depend on who is asking must not be stored by proxies
+        self.private = "authorization" in self.vary
+
+def cache_response(ttl: int, vary: Iterable[str] = (), tags: Iterable[str] = ()):
+    """Declare a TTL cache policy on a route; place it below ``@router.get``.
+
+    ``vary`` lists request headers that are part of the cache key (use
+    ``authorization`` for endpoints behind ``get_current_user``; the token
+    is then verified before every hit and entries never outlive it);
+    ``tags`` name groups of entries that can be dropped together with
+    ``response_cache.invalidate_tag``.
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        setattr(endpoint, POLICY_ATTRIBUTE, CachePolicy(ttl, vary, tags))
+        return endpoint
+    return decorator
+
+class CachedResponse:
+    __slots__ = ('status', 'headers', 'body', 'etag', 'created', 'expires', 'route', 'tags', 'size', 'variants')
+
+    def __init__(self, status: int, headers: List[Tuple[bytes, bytes]], body: bytes,
+                 ttl: int, route: str, tags: Tuple[str, ...], not_after: Optional[float] = None):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        self.created = time.time()
+        self.expires = self.created + ttl
+        if not_after is not None:
+            self.expires = min(self.expires, not_after)
+        self.route = route
+        self.tags = tags
+        self.size = len(body) + sum(len(k) + len(v) for k, v in headers) + 256
+        # Compressed bodies by content-coding, each made once per entry
+        self.variants: Dict[str, bytes] = {}
+
+class ResponseCacheStore:
+    """LRU of full responses bounded by total bytes rather than entry count"""
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._route_stats: Dict[str, Dict[str, int]] = {}
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CachedResponse) -> None:
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.current_bytes += entry.size
+            self._evict()
+
+    def add_variant(self, key: str, entry: CachedResponse, encoding: str, body: bytes) -> None:
+        """Keep a compressed copy of a stored entry; it counts towards the byte budget"""
+        with self._lock:
+            if self._entries.get(key) is not entry or encoding in entry.variants:
+                return
+            entry.variants[encoding] = body
+            entry.size += len(body)
+            self.current_bytes += len(body)
+            self._evict()
+
+    def invalidate_tag(self, tag: str) -> int:
+        with self._lock:
+            keys = [k for k, e in self._entries.items() if tag in e.tags]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def record(self, route: str, outcome: str) -> None:
+        with self._lock:
+            self._route(route)[outcome] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            routes = {}
+            for route, counts in self._route_stats.items():
+                lookups = counts['hits'] + counts['misses']
+                routes[route] = {**counts, 'hit_ratio': round(counts['hits'] / lookups, 4) if lookups else 0.0}
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'routes': routes,
+            }
+
+    def _evict(self) -> None:
+        while self.current_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._route(self._entries[oldest].route)['evictions'] += 1
+            self._remove(oldest)
+
+    def _route(self, route: str) -> Dict[str, int]:
+        if route not in self._route_stats:
+            self._route_stats[route] = {'hits': 0, 'misses': 0, 'not_modified': 0,
+                                        'stores': 0, 'bypassed': 0, 'evictions': 0}
+        return self._route_stats[route]
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry.size
+
+response_cache = ResponseCacheStore(settings.RESPONSE_CACHE_MAX_BYTES)
+
+class ResponseCacheMiddleware:
+    """ASGI middleware serving routes that declare ``@cache_response``.
+
+    The key is method + path + query + the listed ``vary`` headers + a hash
+    of the request body, so POST endpoints that are pure functions of their
+    input (match results) can be cached too. Hits carry
+    ETag/Last-Modified and conditional requests get 304s. Compressed
+    variants are made on first request per encoding and stored with the
+    entry, so a cached body is never compressed twice.
+
+    Per-user routes (``authorization`` in ``vary``) run before
+    ``get_current_user`` would, so the token is verified here: requests
+    without a valid one bypass the cache and get the route's own 401.
+    """
+    def __init__(self, app: ASGIApp, store: ResponseCacheStore = response_cache,
+                 max_body_bytes: int = 64 * 1024):
+        self.app = app
+        self.store = store
+        self.max_body_bytes = max_body_bytes
+        self._policies: Optional[List[Tuple[Any, CachePolicy]]] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD", "POST"):
+            await self.app(scope, receive, send)
+            return
+
+        route, policy = self._match(scope)
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        body, receive = await self._buffer_body(receive)
+        if body is None:
+            self.store.record(route.path, 'bypassed')
+            await self.app(scope, receive, send)
+            return
+
+        headers = _request_headers(scope)
+        token_expires = None
+        if policy.private:
+            token_expires = _token_expiry(headers)
+            if token_expires is None:
+                self.store.record(route.path, 'bypassed')
+                await self.app(scope, receive, send)
+                return
+        key = self._key(scope, headers, policy, body)
+        entry = self.store.get(key)
+        if entry is not None:
+            scope[HANDLED_SCOPE_KEY] = True
+            if _not_modified(headers, entry):
+                self.store.record(route.path, 'not_modified')
+                await self._send_cached(send, key, entry, route, policy, headers,
+                                        not_modified=True, head=scope["method"] == "HEAD")
+            else:
+                self.store.record(route.path, 'hits')
+                await self._send_cached(send, key, entry, route, policy, headers, head=scope["method"] == "HEAD")
+            return
+
+        self.store.record(route.path, 'misses')
+        status, response_headers, response_body = await self._capture(scope, receive)
+        if status == 200 and not _has_no_store(response_headers):
+            entry = CachedResponse(status, response_headers, response_body, policy.ttl, route.path, policy.tags,
+                                   not_after=token_expires)
+            self.store.put(key, entry)
+            self.store.record(route.path, 'stores')
+            scope[HANDLED_SCOPE_KEY] = True
+            await self._send_cached(send, key, entry, route, policy, headers,
+                                    hit=False, head=scope["method"] == "HEAD")
+        else:
+            await _send_response(send, status, response_headers, response_body)
+
+    def _match(self, scope: Scope) -> Tuple[Any, Optional[CachePolicy]]:
+        if self._policies is None:
+            # Routes are fixed once the app is serving; collect policies once
+            self._policies = [
+                (route, getattr(route.endpoint, POLICY_ATTRIBUTE))
+                for route in scope["app"].router.routes
+                if hasattr(getattr(route, "endpoint", None), POLICY_ATTRIBUTE)
+            ]
+        for route, policy in self._policies:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route, policy
+        return None, None
+
+    async def _buffer_body(self, receive: Receive):
+        """Read the request body so it can be hashed and replayed downstream"""
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                return None, _replay([message], receive)
+            chunks.append(message.get("body", b""))
+            size += len(chunks[-1])
+            if not message.get("more_body", False):
+                break
+            if size > self.max_body_bytes:
+                # Too big to be worth keying on; stream it through untouched
+                return None, _replay([{"type": "http.request", "body": b"".join(chunks), "more_body": True}], receive)
+        body = b"".join(chunks)
+        return body, _replay([{"type": "http.request", "body": body, "more_body": False}], receive)
+
+    def _key(self, scope: Scope, headers: Dict[str, str], policy: CachePolicy, body: bytes) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(scope["method"].replace("HEAD", "GET").encode())
+        digest.update(scope["path"].encode())
+        digest.update(b"?" + scope.get("query_string", b""))
+        for name in policy.vary:
+            digest.update(f"\n{name}:{headers.get(name, '')}".encode())
+        digest.update(b"\n" + body)
+        return digest.hexdigest()
+
+    async def _capture(self, scope: Scope, receive: Receive):
+        status, headers, chunks = 500, [], []
+
+        async def capture_send(message: Message):
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture_send)
+        return status, headers, b"".join(chunks)
+
+    async def _send_cached(self, send: Send, key: str, entry: CachedResponse, route: Any, policy: CachePolicy,
+                           request_headers: Dict[str, str], not_modified: bool = False,
+                           hit: bool = True, head: bool = False):
+        max_age = max(0, int(entry.expires - time.time()))
+        extra = [
+            (b"etag", entry.etag.encode()),
+            (b"last-modified", formatdate(entry.created, usegmt=True).encode()),
+            (b"cache-control", f"{'private' if policy.private else 'public'}, max-age={max_age}".encode()),
+            (b"x-cache", b"HIT" if hit else b"MISS"),
+        ]
+        encoding = self._encoding(entry, route, request_headers, head)
+        if not_modified:
+            if encoding:
+                # The validator the client holds is the compressed variant's
+                extra = [(k, b"W/" + v if k == b"etag" else v) for k, v in extra]
+            await _send_response(send, 304, with_vary(extra) if compressible(entry.headers) else extra, b"")
+            return
+        headers = [(k, v) for k, v in entry.headers if k.lower() not in (b"etag", b"last-modified", b"cache-control")]
+        headers += extra
+        body = b"" if head else entry.body
+        if encoding:
+            body = await self._variant(key, entry, route, encoding)
+            headers = encoded_headers(headers, encoding, None)
+        elif compressible(entry.headers):
+            headers = with_vary(headers)
+        await _send_response(send, entry.status, headers, body)
+
+    @staticmethod
+    def _encoding(entry: CachedResponse, route: Any, request_headers: Dict[str, str], head: bool) -> Optional[str]:
+        if (head or len(entry.body) < settings.COMPRESSION_MIN_BYTES or not compressible(entry.headers)
+                or getattr(route.endpoint, NO_COMPRESSION_ATTRIBUTE, False)):
+            return None
+        return negotiate(request_headers.get("accept-encoding"))
+
+    async def _variant(self, key: str, entry: CachedResponse, route: Any, encoding: str) -> bytes:
+        body = entry.variants.get(encoding)
+        if body is not None:
+            compression_stats.compressed(route.path, encoding, len(entry.body), len(body), 0, cached=True)
+            return body
+        # Made once per entry, so worth the slower, smaller levels (off the loop)
+        body, cpu_ns = await compress_async(entry.body, encoding, CACHED_LEVELS, in_thread=True)
+        compression_stats.compressed(route.path, encoding, len(entry.body), len(body), cpu_ns)
+        self.store.add_variant(key, entry, encoding, body)
+        return body
+
+def _replay(messages: List[Message], receive: Receive) -> Receive:
+    pending = list(messages)
+
+    async def replay_receive() -> Message:
+        if pending:
+            return pending.pop(0)
+        return await receive()
+    return replay_receive
+
+def _request_headers(scope: Scope) -> Dict[str, str]:
+    return {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+
+def _token_expiry(headers: Dict[str, str]) -> Optional[float]:
+    """``exp`` of the request's bearer token, or None if it has no valid one"""
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+    try:
+        # Verified tokens are cached, so this is a dict lookup on a hit
+        return float(decode_access_token(token.strip())["exp"])
+    except InvalidTokenError:
+        return None
+
+def _has_no_store(headers: List[Tuple[bytes, bytes]]) -> bool:
+    return any(k.lower() == b"cache-control" and b"no-store" in v.lower() for k, v in headers)
+
+def _not_modified(headers: Dict[str, str], entry: CachedResponse) -> bool:
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return entry.etag in tags or "*" in tags
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(entry.created) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+async def _send_response(send: Send, status: int, headers: List[Tuple[bytes, bytes]], body: bytes):
+    headers = [(k, v) for k, v in headers if k.lower() != b"content-length"]
+    if status != 304:
+        headers.append((b"content-length", str(len(body)).encode()))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,49 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, JSON, ForeignKey
+
+from .database import Base
+
+class Business(Base):
+    __tablename__ = "businesses"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=True)
+    sector = Column(String, nullable=True)
+    location = Column(String, nullable=True)
+    years_operation = Column(Integer, nullable=True)
+    description = Column(Text, nullable=True)
+    annual_revenue = Column(Float, nullable=True)
+    ebitda = Column(Float, nullable=True)
+    total_assets = Column(Float, nullable=True)
+    profit_margin = Column(Float, nullable=True)
+    is_listed = Column(Boolean, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class BusinessListing(Base):
+    __tablename__ = "business_listings"
+
+    id = Column(Integer, primary_key=True, index=True)
+    business_id = Column(Integer, ForeignKey("businesses.id"), index=True)
+    asking_price = Column(Float, nullable=True)
+    assets_included = Column(JSON, default=list)
+    transfer_timeline = Column(String, nullable=True)
+    handover_type = Column(String, default="Immediate")
+    status = Column(String, default="published")
+    views_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class ListingDraft(Base):
+    """Work-in-progress listing wizard state, one row per business"""
+    __tablename__ = "listing_drafts"
+
+    business_id = Column(Integer, primary_key=True)
+    business_info = Column(JSON, default=dict)
+    financial_info = Column(JSON, default=dict)
+    assets_info = Column(JSON, default=dict)
+    transfer_info = Column(JSON, default=dict)
+    version = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # SQLAlchemy bumps the version on every flush and refuses to write over
+    # a row another request has already moved forward
+    __mapper_args__ = {"version_id_col": version}
@@ -0,0 +1,17 @@
+from datetime import datetime
+from sqlalchemy import Column, BigInteger, String, Text, DateTime, Index
+
+from .database import Base
+
+class ChatMessage(Base):
+    __tablename__ = "chat_messages"
+
+    # Time-ordered id assigned by the publishing worker; doubles as the
+    # history cursor so replay does not depend on insert order
+    id = Column(BigInteger, primary_key=True, autoincrement=False)
+    channel = Column(String, nullable=False)
+    sender = Column(String, nullable=False)
+    message = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_chat_messages_channel_id", "channel", "id"),)
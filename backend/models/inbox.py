@@ -0,0 +1,20 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, Index
+
+from .database import Base
+
+class BuyerInboxItem(Base):
+    """A published listing that matched a buyer, written when it was published"""
+    __tablename__ = "buyer_inbox"
+
+    # Insert order doubles as the feed cursor (newest first)
+    id = Column(Integer, primary_key=True)
+    buyer_id = Column(String, nullable=False)
+    listing_id = Column(Integer, nullable=False, index=True)
+    business_id = Column(Integer, nullable=True)
+    match_score = Column(Float, nullable=False)
+    # Listing fields the feed shows, copied so reading a page needs no joins
+    summary = Column(JSON, default=dict)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_buyer_inbox_buyer_id_id", "buyer_id", "id"),)
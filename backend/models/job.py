@@ -0,0 +1,30 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON, Index
+
+from .database import Base
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    payload = Column(JSON, default=dict)
+    # queued -> running -> succeeded | failed (running -> queued on retry)
+    status = Column(String, default="queued", nullable=False)
+    # Higher runs first; ties run in submission order
+    priority = Column(Integer, default=0, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    run_after = Column(DateTime, default=datetime.utcnow, nullable=False)
+    idempotency_key = Column(String, unique=True, nullable=True)
+    user_id = Column(Integer, nullable=True, index=True)
+    progress = Column(Float, default=0.0)
+    progress_message = Column(String, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (Index("ix_jobs_claim", "status", "priority", "run_after"),)
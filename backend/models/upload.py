@@ -0,0 +1,34 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, JSON, Index
+
+from .database import Base
+
+class UploadSession(Base):
+    """A resumable upload: chunks land in a staging file until finalized"""
+    __tablename__ = "upload_sessions"
+
+    id = Column(String, primary_key=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    business_id = Column(String, nullable=False)
+    filename = Column(String, nullable=False)
+    total_size = Column(BigInteger, nullable=False)
+    # Expected SHA-256 (hex) of the whole file; may also be given at finalize
+    sha256 = Column(String, nullable=True)
+    # open -> finalizing -> complete (finalizing -> open on checksum mismatch)
+    status = Column(String, default="open", nullable=False)
+    document = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    # Pushed forward by every chunk; abandoned sessions are swept after it
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class UploadChunk(Base):
+    """One received byte range; rows are only ever inserted and overlapping
+    or re-sent ranges are merged when read"""
+    __tablename__ = "upload_chunks"
+
+    id = Column(Integer, primary_key=True)
+    session_id = Column(String, nullable=False)
+    offset = Column(BigInteger, nullable=False)
+    length = Column(BigInteger, nullable=False)
+
+    __table_args__ = (Index("ix_upload_chunks_session_offset", "session_id", "offset"),)
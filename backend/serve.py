@@ -0,0 +1,111 @@
+"""Run the API in several worker processes that share read-only data.
+
+With preloading (the default) the parent imports the app, the heavy
+libraries behind it and the read-only datasets (buyer pool mapping, location
+index, agent tables) once, freezes the garbage collector so those objects
+are never written to, and forks the workers. Each worker then shares those
+pages with the parent copy-on-write instead of holding its own copy, so
+memory grows with traffic-dependent state rather than with the worker count.
+``--no-preload`` starts each worker from scratch (like ``uvicorn --workers``)
+for comparison; benchmarks/worker_memory.py measures both.
+
+    cd backend
+    python serve.py
+    python serve.py --workers 4 --port 8000
+"""
+import argparse
+import gc
+import importlib
+import multiprocessing
+import socket
+
+from config.settings import settings
+from utils.process_supervisor import supervise
+
+# Imported lazily by the routes that use them; preloading pulls them into
+# the shared parent image instead of into every worker separately
+PRELOAD_MODULES = ["numpy", "pandas", "pyarrow.parquet", "orjson", "jose.jwt", "passlib.handlers.bcrypt"]
+
+def preload():
+    """Import the app and build the read-only data every worker needs"""
+    from main import app
+    from config.security import get_pwd_context
+    from services.buyer_pool import buyer_pool
+
+    for module in PRELOAD_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+    get_pwd_context()
+    # Maps the snapshot and builds its vocabulary lookups
+    buyer_pool.snapshot()
+    return app
+
+def create_tables():
+    # Once, before the workers start: workers racing to do it in their
+    # lifespan trip over each other on a fresh database
+    import main  # noqa: F401  (registers every model)
+    from models.database import Base, engine
+
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()  # connections must not be shared across the fork
+
+def run_worker(sock: socket.socket, log_level: str, chat_worker_id: int):
+    import uvicorn
+    from services.chat_bus import chat_bus
+
+    app = preload()  # already done (and shared) when the parent preloaded
+    # Forked workers share the parent's chat bus; each needs its own id bits
+    chat_bus.ids.assign(chat_worker_id)
+    gc.enable()
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API in worker processes")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.WEB_WORKERS)
+    parser.add_argument("--preload", action=argparse.BooleanOptionalAction, default=settings.WEB_PRELOAD)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    first_chat_worker_id = max(settings.CHAT_WORKER_ID, 0)
+    if first_chat_worker_id + max(1, args.workers) > 64:
+        parser.error("CHAT_WORKER_ID plus the worker count must not exceed 64 (chat message id bits)")
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.set_inheritable(True)
+
+    if args.preload:
+        # No collections while the shared image is built, then move every
+        # object into the permanent generation: a collection in a worker
+        # would otherwise write to (and so copy) every shared page it scans
+        gc.disable()
+        create_tables()
+        preload()
+        gc.freeze()
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context("spawn")
+        # In a throwaway process so this parent stays small
+        creator = context.Process(target=create_tables)
+        creator.start()
+        creator.join()
+
+    def start(index: int) -> multiprocessing.process.BaseProcess:
+        # A replacement reuses its slot's chat worker id, so ids stay unique
+        process = context.Process(target=run_worker,
+                                  args=(sock, args.log_level, first_chat_worker_id + index),
+                                  name=f"web-worker-{index}")
+        process.start()
+        return process
+
+    # Workers that die are replaced; on SIGTERM uvicorn drains in-flight
+    # requests in each worker before exiting
+    supervise(start, max(1, args.workers))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""Append-only audit trail of valuations and match sets.
+
+Producers (request handlers, agents, job workers) only put a record on a
+bounded in-memory queue. A background writer thread drains it in batches
+and appends each batch to the current segment file as one gzip member, so
+segments are valid ``.jsonl.gz`` files at every batch boundary and a crash
+loses at most the batch being written. Segments rotate by size and age and
+are named per process, so pre-forked workers never share a file.
+
+When the queue is full a producer waits up to ``AUDIT_LOG_PUT_TIMEOUT_MS``
+and then drops the record; both are counted in ``stats()``.
+"""
+import atexit
+import gzip
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+from config.settings import settings
+
+class _Flush:
+    """Queue marker: set once every record queued before it is written"""
+    def __init__(self):
+        self.done = threading.Event()
+
+_STOP = object()
+# Non-str dict keys (ids, enums) are written as strings rather than failing
+_DUMPS_OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+
+class AuditLog:
+    def __init__(self, directory: str = settings.AUDIT_LOG_DIR,
+                 queue_size: int = settings.AUDIT_LOG_QUEUE_SIZE,
+                 batch_size: int = settings.AUDIT_LOG_BATCH_SIZE,
+                 flush_interval: float = settings.AUDIT_LOG_FLUSH_INTERVAL,
+                 segment_bytes: int = settings.AUDIT_LOG_SEGMENT_BYTES,
+                 segment_seconds: float = settings.AUDIT_LOG_SEGMENT_SECONDS,
+                 put_timeout_ms: float = settings.AUDIT_LOG_PUT_TIMEOUT_MS,
+                 enabled: bool = settings.AUDIT_LOG_ENABLED):
+        self.directory = directory
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.put_timeout = put_timeout_ms / 1000
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._segment: Optional[str] = None
+        self._segment_started = 0.0
+        self._segment_size = 0
+        self._segment_sequence = 0
+        self._atexit_registered = False
+        self._stats = {
+            'enqueued': 0, 'written': 0, 'dropped': 0, 'blocked': 0, 'batches': 0,
+            'write_errors': 0, 'serialize_errors': 0, 'writer_errors': 0, 'writer_restarts': 0, 'bytes_written': 0, 'segments': 0, 'max_depth': 0, 'write_ms': 0.0,
+        }
+
+    def record(self, kind: str, source: str, method: Optional[str], inputs: Any, outputs: Any,
+               latency_ms: float, error: Optional[str] = None) -> bool:
+        """Queue one audit record without waiting on disk; False if it was dropped"""
+        if not self.enabled:
+            return False
+        entry = {
+            'ts': datetime.utcnow().isoformat() + "Z",
+            'kind': kind,
+            'source': source,
+            'method': method,
+            'latency_ms': round(latency_ms, 3),
+            'inputs': inputs,
+            'outputs': outputs,
+            'error': error,
+            'pid': os.getpid(),
+        }
+        records = self._ensure_writer()
+        try:
+            records.put_nowait(entry)
+        except queue.Full:
+            self._count('blocked')
+            try:
+                # Brief backpressure before giving up on the record
+                records.put(entry, timeout=self.put_timeout)
+            except queue.Full:
+                self._count('dropped')
+                return False
+        depth = records.qsize()
+        with self._lock:
+            self._stats['enqueued'] += 1
+            if depth > self._stats['max_depth']:
+                self._stats['max_depth'] = depth
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far is on disk"""
+        if self._thread is None or self._pid != os.getpid():
+            return True
+        marker = _Flush()
+        self._ensure_writer().put(marker)
+        return marker.done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 30) -> bool:
+        """Flush and stop the writer; records after this start a new writer"""
+        with self._lock:
+            thread, records = self._thread, self._queue
+            if thread is None or self._pid != os.getpid():
+                return True
+            self._thread = None
+        records.put(_STOP)
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats['write_ms'] = round(stats['write_ms'], 3)
+        stats['queue_depth'] = self._queue.qsize() if self._queue is not None else 0
+        stats['queue_size'] = self.queue_size
+        stats['segment'] = self._segment
+        stats['enabled'] = self.enabled
+        return stats
+
+    def _ensure_writer(self) -> queue.Queue:
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid and self._thread.is_alive():
+            return self._queue
+        with self._lock:
+            # Should never happen (_run guards its loop), but a dead writer must
+            # not leave records queueing up unwritten: restart it on the same queue
+            restart = self._thread is not None and self._pid == pid and not self._thread.is_alive()
+            # A forked worker inherits the parent's objects but not its thread
+            if restart or self._thread is None or self._pid != pid:
+                if restart:
+                    self._stats['writer_restarts'] += 1
+                else:
+                    self._queue = queue.Queue(self.queue_size)
+                    self._segment = None
+                self._pid = pid
+                self._thread = threading.Thread(target=self._run, args=(self._queue,),
+                                                name="audit-log-writer", daemon=True)
+                self._thread.start()
+                if not self._atexit_registered:
+                    # Job workers have no lifespan hook; flush on interpreter exit
+                    atexit.register(self.close)
+                    self._atexit_registered = True
+            return self._queue
+
+    def _run(self, records: queue.Queue) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[Dict[str, Any]] = []
+            markers: List[_Flush] = []
+            try:
+                item = records.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            while True:
+                if item is _STOP:
+                    stopping = True
+                elif isinstance(item, _Flush):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if stopping or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = records.get_nowait()
+                except queue.Empty:
+                    break
+            if stopping:
+                # Drain whatever was queued ahead of (or raced with) the stop
+                while True:
+                    try:
+                        item = records.get_nowait()
+                    except queue.Empty:
+                        break
+                    if isinstance(item, _Flush):
+                        markers.append(item)
+                    elif item is not _STOP:
+                        batch.append(item)
+            try:
+                if batch:
+                    self._write(batch, attempts=3 if stopping else None)
+            except Exception:
+                # Anything unexpected costs this batch, never the writer thread
+                self._count('writer_errors')
+                self._count('dropped', len(batch))
+            finally:
+                for marker in markers:
+                    marker.done.set()
+
+    def _write(self, batch: List[Dict[str, Any]], attempts: Optional[int] = None) -> None:
+        lines = []
+        for entry in batch:
+            try:
+                lines.append(orjson.dumps(entry, default=str, option=_DUMPS_OPTIONS))
+            except (orjson.JSONEncodeError, TypeError, ValueError):
+                self._count('serialize_errors')
+                self._count('dropped')
+        if not lines:
+            return
+        batch_size = len(lines)
+        member = gzip.compress(b"".join(lines), compresslevel=6)
+        attempt = 0
+        while True:
+            attempt += 1
+            started = time.perf_counter()
+            try:
+                path = self._current_segment(len(member))
+                with open(path, "ab") as f:
+                    f.write(member)
+                    f.flush()
+                    os.fsync(f.fileno())
+            except OSError:
+                self._count('write_errors')
+                if attempts is not None and attempt >= attempts:
+                    self._count('dropped', batch_size)
+                    return
+                # Hold the batch; the queue fills and producers see backpressure
+                time.sleep(self.flush_interval)
+                continue
+            self._segment_size += len(member)
+            with self._lock:
+                self._stats['written'] += batch_size
+                self._stats['batches'] += 1
+                self._stats['bytes_written'] += len(member)
+                self._stats['write_ms'] += (time.perf_counter() - started) * 1000
+            return
+
+    def _current_segment(self, incoming: int) -> str:
+        now = time.time()
+        if (self._segment is None or now - self._segment_started >= self.segment_seconds
+                or (self._segment_size and self._segment_size + incoming > self.segment_bytes)):
+            os.makedirs(self.directory, exist_ok=True)
+            self._segment_sequence += 1
+            stamp = datetime.utcfromtimestamp(now).strftime("%Y%m%dT%H%M%S")
+            self._segment = os.path.join(
+                self.directory, f"audit-{stamp}-{os.getpid()}-{self._segment_sequence:04d}.jsonl.gz"
+            )
+            self._segment_started = now
+            self._segment_size = 0
+            self._count('segments')
+        return self._segment
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += amount
+
+audit_log = AuditLog()
@@ -0,0 +1,492 @@
+"""Buyer pool stored as a memory-mapped columnar snapshot.
+
+Buyers are ingested from CSV or JSONL one row at a time (see
+ingest_buyers.py) into a single binary file:
+
+    magic | header length | JSON header | 64-byte aligned columns
+
+The header holds the small vocabularies (buyer types, sectors, locations)
+and the dtype/offset/length of every column. Columns are plain little-endian
+arrays: investment bounds, vocabulary ids, CSR offsets for the sector and
+location lists, location coverage bitsets (services/locations.py) and one
+string table (offsets + UTF-8 blob) for ids, names and descriptions. Opening a snapshot maps the file and wraps each column with
+``np.frombuffer``, so nothing is parsed and worker processes share the pages
+through the OS page cache. numpy is imported on first use, like pandas in
+financial_history, so it stays off the main:app import path.
+
+Snapshots are replaced with an atomic rename. ``BuyerPoolStore`` notices the
+new file within BUYER_POOL_RELOAD_INTERVAL seconds and swaps it in; requests
+already scoring against the old mapping keep it alive until they finish.
+"""
+import asyncio
+import csv
+import json
+import mmap
+import os
+import time
+from array import array
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config.settings import settings
+from services.locations import location_index
+
+if TYPE_CHECKING:
+    import numpy as np
+
+MAGIC = b"BUYPOOL1"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+TEXT_FIELDS = ('id', 'name', 'description')
+# Vocabulary ids are stored as uint16
+MAX_VOCABULARY = 65535
+
+# Served when no snapshot has been ingested yet
+DEFAULT_BUYERS = [
+    {
+        'id': 'fund_001',
+        'type': 'VC Fund',
+        'name': 'Alpha Ventures',
+        'preferred_sectors': ['Technology', 'Manufacturing', 'Services'],
+        'min_investment': 5000000,
+        'max_investment': 50000000,
+        'preferred_locations': ['Bangalore', 'Mumbai', 'Delhi'],
+        'description': 'Early-stage technology focused fund'
+    },
+    {
+        'id': 'individual_001',
+        'type': 'Entrepreneur',
+        'name': 'Raj Sharma',
+        'preferred_sectors': ['Retail', 'Services'],
+        'min_investment': 1000000,
+        'max_investment': 15000000,
+        'preferred_locations': ['Delhi', 'Chennai'],
+        'description': 'Experienced business owner looking to expand'
+    },
+    {
+        'id': 'corporate_001',
+        'type': 'Corporate Investor',
+        'name': 'Growth Corp',
+        'preferred_sectors': ['Manufacturing', 'Technology'],
+        'min_investment': 10000000,
+        'max_investment': 100000000,
+        'preferred_locations': ['All India'],
+        'description': 'Strategic acquisitions for portfolio expansion'
+    }
+]
+
+class BuyerValidationError(ValueError):
+    pass
+
+def validate_buyer(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize one ingested row; raises BuyerValidationError"""
+    buyer_id = str(raw.get('id') or '').strip()
+    name = str(raw.get('name') or '').strip()
+    if not buyer_id:
+        raise BuyerValidationError("Missing id")
+    if not name:
+        raise BuyerValidationError("Missing name")
+
+    bounds = []
+    for field in ('min_investment', 'max_investment'):
+        value = raw.get(field)
+        try:
+            amount = float(value)
+        except (TypeError, ValueError):
+            raise BuyerValidationError(f"{field} must be a number")
+        if not amount >= 0 or amount != amount or amount > 2 ** 62:
+            raise BuyerValidationError(f"{field} must be a non-negative amount")
+        bounds.append(int(round(amount)))
+    if bounds[0] > bounds[1]:
+        raise BuyerValidationError("min_investment exceeds max_investment")
+
+    return {
+        'id': buyer_id,
+        'type': str(raw.get('type') or '').strip(),
+        'name': name,
+        'preferred_sectors': _string_list(raw.get('preferred_sectors'), 'preferred_sectors'),
+        'min_investment': bounds[0],
+        'max_investment': bounds[1],
+        'preferred_locations': _string_list(raw.get('preferred_locations'), 'preferred_locations'),
+        'description': str(raw.get('description') or '').strip(),
+    }
+
+def _string_list(value: Any, field: str) -> List[str]:
+    if value is None or value == '':
+        return []
+    if isinstance(value, str):
+        # CSV cells hold lists as "Technology;Services"
+        value = value.split(';')
+    if not isinstance(value, list):
+        raise BuyerValidationError(f"{field} must be a list")
+    items = []
+    for item in value:
+        item = str(item).strip()
+        if item and item not in items:
+            items.append(item)
+    return items
+
+def read_records(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (line number, row) from a .csv or .jsonl file without loading it whole"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith('.csv'):
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        elif path.endswith(('.jsonl', '.ndjson')):
+            for line_number, line in enumerate(f, start=1):
+                if line.strip():
+                    try:
+                        row = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        row = {'__error__': f"Invalid JSON: {e.msg}"}
+                    yield line_number, row
+        else:
+            raise ValueError("Buyer files must be .csv or .jsonl")
+
+class SnapshotBuilder:
+    """Accumulates validated buyers into compact typed arrays"""
+    def __init__(self):
+        self.count = 0
+        self.types: Dict[str, int] = {}
+        self.sectors: Dict[str, int] = {}
+        self.locations: Dict[str, int] = {}
+        self.type_ids = array('H')
+        self.min_investment = array('q')
+        self.max_investment = array('q')
+        self.sector_offsets = array('q', [0])
+        self.sector_ids = array('H')
+        self.location_offsets = array('q', [0])
+        self.location_ids = array('H')
+        # LocationIndex.words uint64 words per buyer
+        self.location_masks = array('Q')
+        self.text_offsets = array('q', [0])
+        self.text = bytearray()
+
+    def add(self, buyer: Dict[str, Any]) -> None:
+        self.type_ids.append(self._vocabulary_id(self.types, buyer['type']))
+        self.min_investment.append(buyer['min_investment'])
+        self.max_investment.append(buyer['max_investment'])
+        for sector in buyer['preferred_sectors']:
+            self.sector_ids.append(self._vocabulary_id(self.sectors, sector))
+        self.sector_offsets.append(len(self.sector_ids))
+        for location in buyer['preferred_locations']:
+            self.location_ids.append(self._vocabulary_id(self.locations, location))
+        self.location_offsets.append(len(self.location_ids))
+        # Preferences expand to everything they cover once, here, not per match
+        self.location_masks.extend(location_index.to_words(location_index.coverage(buyer['preferred_locations'])))
+        for field in TEXT_FIELDS:
+            self.text += buyer[field].encode('utf-8')
+            self.text_offsets.append(len(self.text))
+        self.count += 1
+
+    def columns(self) -> Dict[str, "np.ndarray"]:
+        import numpy as np
+
+        return {
+            'type_ids': np.frombuffer(self.type_ids, dtype=np.uint16),
+            'min_investment': np.frombuffer(self.min_investment, dtype=np.int64),
+            'max_investment': np.frombuffer(self.max_investment, dtype=np.int64),
+            'sector_offsets': np.frombuffer(self.sector_offsets, dtype=np.int64),
+            'sector_ids': np.frombuffer(self.sector_ids, dtype=np.uint16),
+            'location_offsets': np.frombuffer(self.location_offsets, dtype=np.int64),
+            'location_ids': np.frombuffer(self.location_ids, dtype=np.uint16),
+            'location_masks': np.frombuffer(self.location_masks, dtype=np.uint64),
+            'text_offsets': np.frombuffer(self.text_offsets, dtype=np.int64),
+            'text': np.frombuffer(bytes(self.text), dtype=np.uint8),
+        }
+
+    def header(self) -> Dict[str, Any]:
+        return {
+            'version': FORMAT_VERSION,
+            'count': self.count,
+            'created_at': time.time(),
+            'types': list(self.types),
+            'sectors': list(self.sectors),
+            'locations': list(self.locations),
+            'location_fingerprint': location_index.fingerprint,
+        }
+
+    def write(self, path: str) -> None:
+        """Write the snapshot next to ``path`` and rename it into place"""
+        columns = self.columns()
+        layout, offset = {}, 0
+        for name, column in columns.items():
+            # Offsets are relative to the first aligned byte after the header
+            layout[name] = {'dtype': column.dtype.newbyteorder('<').str, 'length': len(column), 'offset': offset}
+            offset = _align(offset + column.nbytes)
+        header_bytes = json.dumps({**self.header(), 'columns': layout}).encode()
+        data_start = _align(len(MAGIC) + 8 + len(header_bytes))
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(len(header_bytes).to_bytes(8, 'little'))
+            f.write(header_bytes)
+            for name, column in columns.items():
+                f.write(b'\0' * (data_start + layout[name]['offset'] - f.tell()))
+                f.write(column.astype(layout[name]['dtype'], copy=False).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _vocabulary_id(vocabulary: Dict[str, int], value: str) -> int:
+        index = vocabulary.get(value)
+        if index is None:
+            if len(vocabulary) >= MAX_VOCABULARY:
+                raise BuyerValidationError(f"More than {MAX_VOCABULARY} distinct values")
+            index = vocabulary[value] = len(vocabulary)
+        return index
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def ingest(source: str, destination: str = settings.BUYER_POOL_PATH,
+           max_errors: int = 100, allow_rejects: bool = False) -> Dict[str, Any]:
+    """Stream buyers from ``source`` into a new snapshot at ``destination``.
+
+    Invalid rows are reported (the first ``max_errors`` of them); duplicate
+    ids keep the first row. Unless ``allow_rejects`` is set, a file with any
+    invalid row is not published, so a bad export never replaces a good pool.
+    """
+    builder = SnapshotBuilder()
+    seen = set()
+    errors: List[Dict[str, Any]] = []
+    rejected = 0
+    for line, row in read_records(source):
+        try:
+            if '__error__' in row:
+                raise BuyerValidationError(row['__error__'])
+            buyer = validate_buyer(row)
+            if buyer['id'] in seen:
+                raise BuyerValidationError(f"Duplicate id {buyer['id']}")
+            builder.add(buyer)
+            seen.add(buyer['id'])
+        except BuyerValidationError as e:
+            rejected += 1
+            if len(errors) < max_errors:
+                errors.append({'line': line, 'error': str(e)})
+
+    published = builder.count > 0 and (allow_rejects or rejected == 0)
+    if published:
+        builder.write(destination)
+    return {'buyers': builder.count, 'rejected': rejected, 'errors': errors,
+            'published': published, 'path': destination}
+
+class BuyerPoolSnapshot:
+    """Read-only columnar view of one buyer pool"""
+    def __init__(self, header: Dict[str, Any], columns: Dict[str, "np.ndarray"], path: Optional[str] = None):
+        self.count = header['count']
+        self.created_at = header['created_at']
+        self.path = path
+        self.types = header['types']
+        self.sectors = header['sectors']
+        self.locations = header['locations']
+        self._sector_index = {value: i for i, value in enumerate(self.sectors)}
+        self._location_index = {value: i for i, value in enumerate(self.locations)}
+        self.type_ids = columns['type_ids']
+        self.min_investment = columns['min_investment']
+        self.max_investment = columns['max_investment']
+        self.sector_offsets = columns['sector_offsets']
+        self.sector_ids = columns['sector_ids']
+        self.location_offsets = columns['location_offsets']
+        self.location_ids = columns['location_ids']
+        if header.get('location_fingerprint') == location_index.fingerprint:
+            self.location_masks = columns['location_masks'].reshape(self.count, location_index.words)
+        else:
+            # Written before the hierarchy last changed; bits no longer line up
+            self.location_masks = self._expand_locations()
+        self.text_offsets = columns['text_offsets']
+        self.text = columns['text']
+
+    @classmethod
+    def open(cls, path: str) -> "BuyerPoolSnapshot":
+        import numpy as np
+
+        with open(path, 'rb') as f:
+            # The mapping outlives the file object and, after a rename, the file name
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if buffer[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a buyer pool snapshot")
+            header_length = int.from_bytes(buffer[len(MAGIC):len(MAGIC) + 8], 'little')
+            header = json.loads(buffer[len(MAGIC) + 8:len(MAGIC) + 8 + header_length])
+            if header.get('version') != FORMAT_VERSION:
+                raise ValueError(f"Unsupported buyer pool snapshot version {header.get('version')}")
+            data_start = _align(len(MAGIC) + 8 + header_length)
+            columns = {
+                name: np.frombuffer(buffer, dtype=spec['dtype'], count=spec['length'],
+                                    offset=data_start + spec['offset'])
+                for name, spec in header['columns'].items()
+            }
+        except Exception:
+            buffer.close()
+            raise
+        return cls(header, columns, path)
+
+    @classmethod
+    def from_records(cls, buyers: Iterable[Dict[str, Any]]) -> "BuyerPoolSnapshot":
+        """In-memory snapshot, for the default pool and benchmarks"""
+        builder = SnapshotBuilder()
+        for buyer in buyers:
+            builder.add(validate_buyer(buyer))
+        return cls(builder.header(), builder.columns())
+
+    def __len__(self) -> int:
+        return self.count
+
+    def buyer(self, index: int) -> Dict[str, Any]:
+        """Materialize one buyer as the dict shape MatchAgent has always returned"""
+        buyer_id, name, description = (self._string(index * len(TEXT_FIELDS) + i) for i in range(len(TEXT_FIELDS)))
+        sectors = self.sector_ids[self.sector_offsets[index]:self.sector_offsets[index + 1]]
+        locations = self.location_ids[self.location_offsets[index]:self.location_offsets[index + 1]]
+        return {
+            'id': buyer_id,
+            'type': self.types[self.type_ids[index]],
+            'name': name,
+            'preferred_sectors': [self.sectors[i] for i in sectors],
+            'min_investment': int(self.min_investment[index]),
+            'max_investment': int(self.max_investment[index]),
+            'preferred_locations': [self.locations[i] for i in locations],
+            'description': description,
+        }
+
+    def buyer_id(self, index: int) -> str:
+        return self._string(index * len(TEXT_FIELDS))
+
+    def buyers_preferring(self, kind: str, value: Any) -> "np.ndarray":
+        """Indices of buyers whose preferred ``sector``/``location`` list includes ``value``"""
+        import numpy as np
+
+        if kind == 'sector':
+            index, ids, offsets = self._sector_index, self.sector_ids, self.sector_offsets
+        else:
+            index, ids, offsets = self._location_index, self.location_ids, self.location_offsets
+        value_id = index.get(value) if isinstance(value, str) else None
+        if value_id is None:
+            return np.empty(0, dtype=np.int64)
+        positions = np.flatnonzero(ids == value_id)
+        # CSR offsets map each list entry back to the buyer that owns it
+        return np.searchsorted(offsets, positions, side='right') - 1
+
+    def location_matches(self, location: Any, nearby_km: float = 0) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Boolean arrays of buyers whose preferences cover ``location`` and,
+        when ``nearby_km`` is set, of the others covering a city within that
+        distance of it"""
+        import numpy as np
+
+        covered = np.zeros(self.count, dtype=bool)
+        bit = location_index.resolve(location)
+        if bit is not None:
+            word, shift = divmod(bit, 64)
+            covered = (self.location_masks[:, word] & np.uint64(1 << shift)) != 0
+        # Places outside the hierarchy still match buyers naming them exactly
+        covered[self.buyers_preferring('location', location)] = True
+
+        nearby = location_index.nearby(location, nearby_km)
+        if not nearby:
+            return covered, np.zeros(self.count, dtype=bool)
+        near = (self.location_masks & location_index.to_array(nearby)).any(axis=1)
+        return covered, near & ~covered
+
+    def _expand_locations(self) -> "np.ndarray":
+        import numpy as np
+
+        vocabulary = np.array([location_index.to_words(location_index.coverage([name])) for name in self.locations],
+                              dtype=np.uint64).reshape(len(self.locations), location_index.words)
+        masks = np.zeros((self.count, location_index.words), dtype=np.uint64)
+        starts, ends = self.location_offsets[:-1], self.location_offsets[1:]
+        non_empty = np.flatnonzero(ends > starts)
+        if len(non_empty):
+            masks[non_empty] = np.bitwise_or.reduceat(vocabulary[self.location_ids], starts[non_empty], axis=0)
+        return masks
+
+    def _string(self, index: int) -> str:
+        return self.text[self.text_offsets[index]:self.text_offsets[index + 1]].tobytes().decode('utf-8')
+
+class BuyerPoolStore:
+    """The current snapshot, swapped for a newer file without a restart.
+
+    ``snapshot()`` re-checks the file at most every ``reload_interval``
+    seconds; API workers also run ``start()`` so a swap is noticed (and
+    ``on_swap`` callbacks fire) even when no match request comes in.
+    Pass ``snapshot`` to pin a fixed pool (tests, benchmarks).
+    """
+    def __init__(self, path: Optional[str] = settings.BUYER_POOL_PATH,
+                 reload_interval: float = settings.BUYER_POOL_RELOAD_INTERVAL,
+                 snapshot: Optional[BuyerPoolSnapshot] = None):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._snapshot = snapshot
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._checked_at = 0.0
+        self._pinned = snapshot is not None
+        self._callbacks: List[Callable[[BuyerPoolSnapshot], None]] = []
+        self._watcher: Optional[asyncio.Task] = None
+
+    def snapshot(self) -> BuyerPoolSnapshot:
+        if not self._pinned and (self._snapshot is None
+                                 or time.monotonic() - self._checked_at >= self.reload_interval):
+            self.refresh()
+        return self._snapshot
+
+    def refresh(self) -> bool:
+        """Load the file if it changed since the last check; returns whether it swapped"""
+        self._checked_at = time.monotonic()
+        try:
+            stat = os.stat(self.path)
+            signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        except (OSError, TypeError):
+            signature = None
+
+        if signature is not None and signature != self._signature:
+            try:
+                snapshot = BuyerPoolSnapshot.open(self.path)
+            except (OSError, ValueError):
+                # Keep serving the previous pool rather than failing matches
+                if self._snapshot is not None:
+                    return False
+                snapshot = BuyerPoolSnapshot.from_records(DEFAULT_BUYERS)
+        elif self._snapshot is None:
+            snapshot = BuyerPoolSnapshot.from_records(DEFAULT_BUYERS)
+        else:
+            return False
+
+        first_load = self._snapshot is None
+        # A single attribute assignment: readers see the old pool or the new one
+        self._snapshot = snapshot
+        self._signature = signature
+        if not first_load:
+            for callback in self._callbacks:
+                callback(snapshot)
+        return not first_load
+
+    def on_swap(self, callback: Callable[[BuyerPoolSnapshot], None]) -> None:
+        self._callbacks.append(callback)
+
+    async def start(self):
+        if self._watcher is None and not self._pinned:
+            self._watcher = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            self.refresh()
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self.snapshot()
+        return {
+            'path': snapshot.path,
+            'buyers': snapshot.count,
+            'created_at': snapshot.created_at,
+            'sectors': len(snapshot.sectors),
+            'locations': len(snapshot.locations),
+        }
+
+buyer_pool = BuyerPoolStore()
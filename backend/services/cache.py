@@ -0,0 +1,199 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from config.settings import settings
+
+class LocalCacheBackend:
+    """In-process stand-in for a shared cache such as Redis.
+
+    Implements the same small surface (get/set/incr/delete) so the cache can
+    be exercised in tests and local runs without a server.
+    """
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+        self._expiry: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            expires = self._expiry.get(key)
+            if expires is not None and expires < time.monotonic():
+                self._data.pop(key, None)
+                self._expiry.pop(key, None)
+                return None
+            return self._data.get(key)
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        with self._lock:
+            self._data[key] = value
+            if ttl:
+                self._expiry[key] = time.monotonic() + ttl
+            else:
+                self._expiry.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value = int(self._data.get(key, 0)) + 1
+            self._data[key] = str(value)
+            return value
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            self._expiry.pop(key, None)
+
+class RedisCacheBackend:
+    def __init__(self, url: str):
+        # Optional dependency, only needed when a shared cache is configured
+        import redis
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        self._client.set(key, value, ex=ttl)
+
+    def incr(self, key: str) -> int:
+        return self._client.incr(key)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+class ReadThroughCache:
+    """Two-level read-through cache with versioned keys.
+
+    Reads hit a per-process LRU first, then the shared backend (if any), then
+    the loader. Every key lives under a scope such as ``business:7``; bumping
+    the scope version makes all of its keys unreachable at once, across
+    workers when a shared backend is used. Concurrent misses on the same key
+    are collapsed so only one caller runs the loader.
+    """
+    def __init__(self, namespace: str, maxsize: int = 1024, ttl: int = 60,
+                 backend: Optional[Any] = None):
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.backend = backend
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, threading.Event] = {}
+        self._stats = {'hits': 0, 'shared_hits': 0, 'misses': 0, 'loads': 0,
+                       'coalesced': 0, 'invalidations': 0, 'evictions': 0}
+
+    def get_or_load(self, scope: str, key: str, loader: Callable[[], Any], cache_none: bool = True) -> Any:
+        """Cached value of ``key``; with ``cache_none=False`` a None from the
+        loader (e.g. a row that does not exist yet) is returned but not stored"""
+        full_key = f"{self.namespace}:{scope}:v{self.version(scope)}:{key}"
+
+        while True:
+            value = self._local_get(full_key)
+            if value is not None:
+                return value[0]
+
+            with self._lock:
+                event = self._inflight.get(full_key)
+                if event is None:
+                    event = threading.Event()
+                    self._inflight[full_key] = event
+                    break
+                self._stats['coalesced'] += 1
+            # Someone else is loading this key; wait for them and re-check
+            event.wait(timeout=5)
+
+        try:
+            if self.backend is not None:
+                raw = self.backend.get(full_key)
+                if raw is not None:
+                    value = json.loads(raw)
+                    self._local_set(full_key, value)
+                    self._count('shared_hits')
+                    return value
+
+            self._count('misses')
+            value = loader()
+            self._count('loads')
+            if value is None and not cache_none:
+                return value
+            self._local_set(full_key, value)
+            if self.backend is not None:
+                self.backend.set(full_key, json.dumps(value), ttl=self.ttl)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(full_key, None)
+            event.set()
+
+    def version(self, scope: str) -> int:
+        if self.backend is not None:
+            return int(self.backend.get(self._version_key(scope)) or 0)
+        with self._lock:
+            return self._versions.get(scope, 0)
+
+    def invalidate(self, scope: str) -> None:
+        """Move the scope to a new version; old entries age out of the LRU"""
+        if self.backend is not None:
+            self.backend.incr(self._version_key(scope))
+        else:
+            with self._lock:
+                self._versions[scope] = self._versions.get(scope, 0) + 1
+        self._count('invalidations')
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['shared_hits'] + stats['misses']
+        stats['hit_ratio'] = round((stats['hits'] + stats['shared_hits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _version_key(self, scope: str) -> str:
+        return f"{self.namespace}:{scope}:version"
+
+    def _local_get(self, full_key: str) -> Optional[tuple]:
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._entries[full_key]
+                return None
+            self._entries.move_to_end(full_key)
+            self._stats['hits'] += 1
+            return (value,)
+
+    def _local_set(self, full_key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[full_key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+def _create_backend(name: str):
+    if name == 'redis':
+        return RedisCacheBackend(settings.REDIS_URL)
+    if name == 'local':
+        return LocalCacheBackend()
+    return None
+
+listing_cache = ReadThroughCache(
+    namespace="listings",
+    maxsize=settings.LISTING_CACHE_SIZE,
+    ttl=settings.LISTING_CACHE_TTL,
+    backend=_create_backend(settings.CACHE_BACKEND)
+)
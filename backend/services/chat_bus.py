@@ -0,0 +1,315 @@
+import asyncio
+import json
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from starlette.concurrency import run_in_threadpool
+
+from config.settings import settings
+from models.chat import ChatMessage
+from models.database import SessionLocal
+from services.connection_manager import ConnectionManager, manager
+
+CHANNEL_PATTERN = re.compile(r"^(deal:\d+|pair:[\w-]+:[\w-]+)$")
+
+def deal_channel(listing_id: int) -> str:
+    return f"deal:{listing_id}"
+
+def pair_channel(buyer_id: str, seller_id: str) -> str:
+    # Sorted so both participants resolve to the same channel
+    first, second = sorted([buyer_id, seller_id])
+    return f"pair:{first}:{second}"
+
+def is_valid_channel(channel: str) -> bool:
+    return bool(CHANNEL_PATTERN.match(channel or ""))
+
+class MessageIdGenerator:
+    """Snowflake-style ids: milliseconds since 2024 | worker bits | sequence.
+
+    Ids sort by time across workers, so they can be used as history cursors
+    without a database round trip on publish. The layout (39 + 6 + 8 bits)
+    stays below 2**53 so browsers can hold ids as plain numbers. Ids are
+    only unique if no two workers share a worker id, so it is assigned
+    explicitly rather than derived from the pid.
+    """
+    EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+    MAX_WORKER_ID = 0x3F
+
+    def __init__(self, worker_id: Optional[int] = None):
+        self.worker_id: Optional[int] = None
+        if worker_id is not None:
+            self.assign(worker_id)
+        self._last_ms = 0
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def assign(self, worker_id: int) -> None:
+        if not 0 <= worker_id <= self.MAX_WORKER_ID:
+            raise ValueError(f"Chat worker id must be between 0 and {self.MAX_WORKER_ID}, got {worker_id}")
+        self.worker_id = worker_id
+
+    def next_id(self) -> int:
+        if self.worker_id is None:
+            raise RuntimeError("Chat worker id is not assigned; start the chat bus first")
+        with self._lock:
+            now_ms = int(time.time() * 1000) - self.EPOCH_MS
+            if now_ms <= self._last_ms:
+                self._sequence = (self._sequence + 1) & 0xFF
+                if self._sequence == 0:
+                    self._last_ms += 1
+                now_ms = self._last_ms
+            else:
+                self._sequence = 0
+            self._last_ms = now_ms
+            return (now_ms << 14) | (self.worker_id << 8) | self._sequence
+
+Handler = Callable[[str], Awaitable[None]]
+
+class LocalBusBackend:
+    """In-process stand-in for a cross-worker broker.
+
+    Every ChatBus attached to the same LocalBusBackend instance receives
+    every published message, which is how several "workers" can be
+    simulated in one process for tests.
+    """
+    def __init__(self):
+        self._handlers: List[Handler] = []
+
+    async def start(self, handler: Handler):
+        self._handlers.append(handler)
+
+    async def stop(self, handler: Handler):
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+
+    async def publish(self, payload: str):
+        for handler in list(self._handlers):
+            await handler(payload)
+
+class RedisBusBackend:
+    CHANNEL = "chat:events"
+
+    def __init__(self, url: str):
+        # Optional dependency, only needed for multi-worker deployments
+        import redis.asyncio as redis
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self, handler: Handler):
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(self.CHANNEL)
+        self._listener = asyncio.create_task(self._listen(pubsub, handler))
+
+    async def stop(self, handler: Handler):
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+    async def publish(self, payload: str):
+        await self._redis.publish(self.CHANNEL, payload)
+
+    async def _listen(self, pubsub, handler: Handler):
+        async for item in pubsub.listen():
+            if item.get("type") == "message":
+                await handler(item["data"])
+
+class ChatBus:
+    """Topic pub/sub for deal-room chat.
+
+    Local subscriptions map channels to client ids on this worker. Published
+    messages go through the backend so that subscribers on other workers
+    receive them too; the publishing worker also queues the message for
+    batched persistence.
+    """
+    def __init__(self, connections: ConnectionManager, backend: Any,
+                 batch_size: int = settings.CHAT_PERSIST_BATCH_SIZE,
+                 flush_interval: float = settings.CHAT_PERSIST_INTERVAL,
+                 max_retries: int = settings.CHAT_PERSIST_MAX_RETRIES):
+        self.connections = connections
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.ids = MessageIdGenerator(settings.CHAT_WORKER_ID if settings.CHAT_WORKER_ID >= 0 else None)
+
+        self.subscribers: Dict[str, Set[str]] = {}
+        self.client_channels: Dict[str, Set[str]] = {}
+
+        self._pending: List[Dict[str, Any]] = []
+        self._failed_flushes = 0
+        self._persist_stats = {'persisted': 0, 'failed_flushes': 0, 'dropped': 0}
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._started = False
+
+    async def start(self):
+        if self._started:
+            return
+        if self.ids.worker_id is None:
+            if not isinstance(self.backend, LocalBusBackend):
+                raise RuntimeError(
+                    "CHAT_WORKER_ID must be set, and differ per worker, with a cross-worker chat bus"
+                )
+            # The local bus serves a single process; serve.py assigns its workers' ids
+            self.ids.assign(0)
+        self._started = True
+        self._flush_lock = asyncio.Lock()
+        await self.backend.start(self._on_backend_message)
+        self._writer = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if not self._started:
+            return
+        self._started = False
+        await self.backend.stop(self._on_backend_message)
+        if self._writer is not None:
+            self._writer.cancel()
+            self._writer = None
+        await self.flush()
+
+    def subscribe(self, client_id: str, channel: str):
+        self.subscribers.setdefault(channel, set()).add(client_id)
+        self.client_channels.setdefault(client_id, set()).add(channel)
+
+    def unsubscribe(self, client_id: str, channel: str):
+        members = self.subscribers.get(channel)
+        if members is not None:
+            members.discard(client_id)
+            if not members:
+                del self.subscribers[channel]
+        self.client_channels.get(client_id, set()).discard(channel)
+
+    def drop_client(self, client_id: str):
+        for channel in list(self.client_channels.pop(client_id, ())):
+            self.unsubscribe(client_id, channel)
+
+    async def publish(self, channel: str, sender: str, text: str) -> Dict[str, Any]:
+        message = {
+            "type": "message",
+            "id": self.ids.next_id(),
+            "channel": channel,
+            "from": sender,
+            "message": text,
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+        self._pending.append(message)
+        if len(self._pending) >= self.batch_size:
+            asyncio.create_task(self.flush())
+
+        await self.backend.publish(json.dumps(message))
+        return message
+
+    async def flush(self):
+        """Write queued messages to the database in a single transaction"""
+        if not self._pending:
+            return
+        async with self._flush_lock or asyncio.Lock():
+            batch, self._pending = self._pending, []
+            if not batch:
+                return
+            try:
+                await run_in_threadpool(self._write_batch, batch)
+            except Exception:
+                self._failed_flushes += 1
+                self._persist_stats['failed_flushes'] += 1
+                if self._failed_flushes < self.max_retries:
+                    # Put the batch back so it is retried on the next flush
+                    self._pending = batch + self._pending
+                    raise
+                # Still failing: one bad row must not hold every later message
+                # back, so write them one by one and drop those that fail
+                self._failed_flushes = 0
+                written = await run_in_threadpool(self._write_each, batch)
+                self._persist_stats['persisted'] += written
+                self._persist_stats['dropped'] += len(batch) - written
+            else:
+                self._failed_flushes = 0
+                self._persist_stats['persisted'] += len(batch)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._persist_stats, 'pending': len(self._pending), 'worker_id': self.ids.worker_id}
+
+    def history(self, channel: str, before: Optional[int] = None, after: Optional[int] = None,
+                limit: int = 50) -> List[Dict[str, Any]]:
+        """Cursor-paginated history, oldest first within the page"""
+        db = SessionLocal()
+        try:
+            query = db.query(ChatMessage).filter(ChatMessage.channel == channel)
+            if after is not None:
+                rows = query.filter(ChatMessage.id > after).order_by(ChatMessage.id.asc()).limit(limit).all()
+            else:
+                if before is not None:
+                    query = query.filter(ChatMessage.id < before)
+                rows = list(reversed(query.order_by(ChatMessage.id.desc()).limit(limit).all()))
+            return [self._row_to_message(row) for row in rows]
+        finally:
+            db.close()
+
+    async def _on_backend_message(self, payload: str):
+        message = json.loads(payload)
+        for client_id in list(self.subscribers.get(message["channel"], ())):
+            await self.connections.send_personal_message(payload, client_id)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                # Keep the loop alive; the next flush retries with new messages
+                pass
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        db = SessionLocal()
+        try:
+            db.bulk_insert_mappings(ChatMessage, [self._message_to_row(m) for m in batch])
+            db.commit()
+        finally:
+            db.close()
+
+    def _write_each(self, batch: List[Dict[str, Any]]) -> int:
+        """Write messages in their own transactions; returns how many were written"""
+        written = 0
+        db = SessionLocal()
+        try:
+            for message in batch:
+                try:
+                    db.bulk_insert_mappings(ChatMessage, [self._message_to_row(message)])
+                    db.commit()
+                    written += 1
+                except Exception:
+                    db.rollback()
+        finally:
+            db.close()
+        return written
+
+    @staticmethod
+    def _message_to_row(message: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": message["id"],
+            "channel": message["channel"],
+            "sender": message["from"],
+            "message": message["message"],
+            "created_at": datetime.fromisoformat(message["timestamp"].rstrip("Z"))
+        }
+
+    @staticmethod
+    def _row_to_message(row: ChatMessage) -> Dict[str, Any]:
+        return {
+            "type": "message",
+            "id": row.id,
+            "channel": row.channel,
+            "from": row.sender,
+            "message": row.message,
+            "timestamp": row.created_at.isoformat() + "Z"
+        }
+
+def _create_backend(name: str):
+    if name == "redis":
+        return RedisBusBackend(settings.REDIS_URL)
+    return LocalBusBackend()
+
+chat_bus = ChatBus(manager, _create_backend(settings.CHAT_BUS_BACKEND))
@@ -0,0 +1,218 @@
+import asyncio
+import json
+import time
+from typing import Any, Dict, Optional
+from fastapi import WebSocket
+
+from config.settings import settings
+from utils.helpers import get_rss_bytes
+
+# Close codes: 1001 = going away (idle peer), 1013 = try again later
+IDLE_CLOSE_CODE = 1001
+SLOW_CONSUMER_CLOSE_CODE = 1013
+OVERLOADED_CLOSE_CODE = 1013
+
+PING_MESSAGE = json.dumps({"type": "ping"})
+
+class ClientConnection:
+    """A registered websocket with its own bounded outbound queue and writer"""
+    __slots__ = ('client_id', 'websocket', 'queue', 'writer', 'dropped',
+                 'buffered_bytes', 'last_seen')
+
+    def __init__(self, client_id: str, websocket: WebSocket, queue_size: int):
+        self.client_id = client_id
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.dropped = 0
+        self.buffered_bytes = 0
+        self.last_seen = time.monotonic()
+
+    def touch(self):
+        self.last_seen = time.monotonic()
+
+class ConnectionManager:
+    """Tracks websocket connections by client id and fans messages out.
+
+    Sends never happen on the caller's task: messages are put on each
+    connection's queue and a per-connection writer drains it, so one slow
+    socket cannot hold up the others. When a queue (or the worker-wide
+    buffer budget) is full the ``slow_consumer_policy`` decides whether the
+    message is dropped for that connection ("drop") or the connection is
+    closed ("disconnect").
+
+    A single heartbeat task pings quiet connections and reaps those that
+    have not sent anything (including pongs) within ``idle_timeout``.
+    New connections are refused once the worker is at ``max_connections``
+    or ``max_buffered_bytes``.
+    """
+    def __init__(self, queue_size: int = settings.CHAT_SEND_QUEUE_SIZE,
+                 slow_consumer_policy: str = settings.CHAT_SLOW_CONSUMER_POLICY,
+                 heartbeat_interval: float = settings.CHAT_HEARTBEAT_INTERVAL,
+                 idle_timeout: float = settings.CHAT_IDLE_TIMEOUT,
+                 max_connections: int = settings.CHAT_MAX_CONNECTIONS,
+                 max_buffered_bytes: int = settings.CHAT_MAX_BUFFERED_BYTES):
+        if slow_consumer_policy not in ('drop', 'disconnect'):
+            raise ValueError(f"Unknown slow consumer policy: {slow_consumer_policy}")
+        self.queue_size = queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self.heartbeat_interval = heartbeat_interval
+        self.idle_timeout = idle_timeout
+        self.max_connections = max_connections
+        self.max_buffered_bytes = max_buffered_bytes
+
+        self.active_connections: Dict[str, ClientConnection] = {}
+        self.buffered_bytes = 0
+        self.dropped_messages = 0
+        self.slow_disconnects = 0
+        self.idle_reaped = 0
+        self.rejected_connections = 0
+
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._baseline_rss: Optional[int] = None
+
+    async def connect(self, websocket: WebSocket, client_id: str) -> Optional[ClientConnection]:
+        """Accept and register a websocket, or refuse it when over budget"""
+        previous = self.active_connections.get(client_id)
+        if previous is None and not self._admit():
+            self.rejected_connections += 1
+            await websocket.close(code=OVERLOADED_CLOSE_CODE)
+            return None
+
+        await websocket.accept()
+        self._ensure_heartbeat()
+
+        # A reconnect with the same id replaces the stale connection
+        if previous is not None:
+            self.disconnect(client_id)
+            asyncio.create_task(self._close(previous))
+
+        connection = ClientConnection(client_id, websocket, self.queue_size)
+        connection.writer = asyncio.create_task(self._writer(connection))
+        self.active_connections[client_id] = connection
+        return connection
+
+    def disconnect(self, client_id: str, connection: Optional[ClientConnection] = None):
+        current = self.active_connections.get(client_id)
+        # Ignore late disconnects from a connection that was already replaced
+        if current is None or (connection is not None and current is not connection):
+            return
+        del self.active_connections[client_id]
+        self.buffered_bytes -= current.buffered_bytes
+        current.buffered_bytes = 0
+        if current.writer is not None and current.writer is not asyncio.current_task():
+            current.writer.cancel()
+
+    def touch(self, client_id: str):
+        connection = self.active_connections.get(client_id)
+        if connection is not None:
+            connection.touch()
+
+    async def send_personal_message(self, message: str, client_id: str):
+        connection = self.active_connections.get(client_id)
+        if connection is not None:
+            self._enqueue(connection, message, len(message.encode()))
+
+    async def broadcast(self, message: str):
+        size = len(message.encode())
+        # Snapshot: slow-consumer disconnects mutate the dict while we loop
+        for connection in list(self.active_connections.values()):
+            self._enqueue(connection, message, size)
+
+    async def stop(self):
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        for client_id, connection in list(self.active_connections.items()):
+            self.disconnect(client_id, connection)
+            await self._close(connection, IDLE_CLOSE_CODE)
+
+    def stats(self) -> Dict[str, Any]:
+        live = len(self.active_connections)
+        rss = get_rss_bytes()
+        baseline = self._baseline_rss if self._baseline_rss is not None else rss
+        return {
+            'live_connections': live,
+            'max_connections': self.max_connections,
+            'queued_messages': sum(c.queue.qsize() for c in self.active_connections.values()),
+            'buffered_bytes': self.buffered_bytes,
+            'max_buffered_bytes': self.max_buffered_bytes,
+            'rss_bytes': rss,
+            # RSS growth since the first connection, spread over live sockets
+            'memory_per_connection_bytes': (rss - baseline) // live if live else 0,
+            'dropped_messages': self.dropped_messages,
+            'slow_disconnects': self.slow_disconnects,
+            'idle_reaped': self.idle_reaped,
+            'rejected_connections': self.rejected_connections,
+        }
+
+    def _admit(self) -> bool:
+        return (len(self.active_connections) < self.max_connections
+                and self.buffered_bytes < self.max_buffered_bytes)
+
+    def _enqueue(self, connection: ClientConnection, message: str, size: int):
+        if self.buffered_bytes + size > self.max_buffered_bytes:
+            self._handle_slow_consumer(connection)
+            return
+        try:
+            connection.queue.put_nowait((message, size))
+        except asyncio.QueueFull:
+            self._handle_slow_consumer(connection)
+            return
+        connection.buffered_bytes += size
+        self.buffered_bytes += size
+
+    def _handle_slow_consumer(self, connection: ClientConnection):
+        if self.slow_consumer_policy == 'disconnect':
+            self.slow_disconnects += 1
+            self.disconnect(connection.client_id, connection)
+            asyncio.create_task(self._close(connection, SLOW_CONSUMER_CLOSE_CODE))
+        else:
+            connection.dropped += 1
+            self.dropped_messages += 1
+
+    async def _writer(self, connection: ClientConnection):
+        try:
+            while True:
+                message, size = await connection.queue.get()
+                try:
+                    await connection.websocket.send_text(message)
+                finally:
+                    # disconnect() already released the bytes of dropped connections
+                    if self.active_connections.get(connection.client_id) is connection:
+                        connection.buffered_bytes -= size
+                        self.buffered_bytes -= size
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            # Peer went away mid-send; the receive loop will notice as well
+            self.disconnect(connection.client_id, connection)
+
+    def _ensure_heartbeat(self):
+        if self._baseline_rss is None:
+            self._baseline_rss = get_rss_bytes()
+        if self._heartbeat is None or self._heartbeat.done():
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            self._sweep(time.monotonic())
+
+    def _sweep(self, now: float):
+        for client_id, connection in list(self.active_connections.items()):
+            idle = now - connection.last_seen
+            if idle >= self.idle_timeout:
+                self.idle_reaped += 1
+                self.disconnect(client_id, connection)
+                asyncio.create_task(self._close(connection, IDLE_CLOSE_CODE))
+            elif idle >= self.heartbeat_interval:
+                self._enqueue(connection, PING_MESSAGE, len(PING_MESSAGE))
+
+    async def _close(self, connection: ClientConnection, code: int = 1000):
+        try:
+            await connection.websocket.close(code=code)
+        except Exception:
+            pass
+
+manager = ConnectionManager()
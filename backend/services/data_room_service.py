@@ -1,10 +1,9 @@
-import boto3
-from botocore.exceptions import ClientError
 import uuid
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import os
 from config.settings import settings
+from services.document_index import BUSINESS_ID
 
 class DataRoomService:
     def __init__(self):
@@ -16,26 +15,18 @@ class DataRoomService:
     async def upload_document(self, file_content: bytes, filename: str, 
                             business_id: str, user_id: str) -> Dict:
         try:
-            # Create business-specific folder
-            business_folder = os.path.join(self.base_path, str(business_id))
-            os.makedirs(business_folder, exist_ok=True)
-            
-            # Generate unique filename
-            file_extension = os.path.splitext(filename)[1]
-            unique_filename = f"{uuid.uuid4()}{file_extension}"
-            file_path = os.path.join(business_folder, unique_filename)
+            file_path, unique_filename = self._new_file_path(business_id, filename)
             
             # Save file
             with open(file_path, 'wb') as f:
                 f.write(file_content)
             
+            return self._stored(file_path, filename, unique_filename)
+        except FileNotFoundError:
             return {
-                'success': True,
-                'file_path': file_path,
-                'filename': filename,
-                'unique_filename': unique_filename,
-                'uploaded_at': datetime.now().isoformat(),
-                'message': 'Document uploaded successfully'
+                'success': False,
+                'error': 'Data room not found',
+                'status_code': 404
             }
         except Exception as e:
             return {
@@ -43,6 +34,61 @@ class DataRoomService:
                 'error': str(e)
             }
     
+    def store_file(self, source_path: str, filename: str, business_id: str, user_id: str) -> Dict:
+        """Move an already assembled file (e.g. a finished resumable upload)
+        into the business's data room without copying it"""
+        file_path, unique_filename = self._new_file_path(business_id, filename)
+        os.replace(source_path, file_path)
+        return self._stored(file_path, filename, unique_filename)
+    
+    def _new_file_path(self, business_id: str, filename: str):
+        # Create business-specific folder
+        business_folder = self.business_folder(business_id)
+        os.makedirs(business_folder, exist_ok=True)
+        
+        # Generate unique filename
+        file_extension = os.path.splitext(filename)[1]
+        unique_filename = f"{uuid.uuid4()}{file_extension}"
+        return os.path.join(business_folder, unique_filename), unique_filename
+    
+    @staticmethod
+    def _stored(file_path: str, filename: str, unique_filename: str) -> Dict:
+        return {
+            'success': True,
+            'file_path': file_path,
+            'filename': filename,
+            'unique_filename': unique_filename,
+            'uploaded_at': datetime.now().isoformat(),
+            'message': 'Document uploaded successfully'
+        }
+    
+    async def delete_document(self, business_id: str, document_id: str) -> Dict:
+        try:
+            os.remove(self.document_path(business_id, document_id))
+            return {
+                'success': True,
+                'document_id': document_id,
+                'message': 'Document deleted successfully'
+            }
+        except FileNotFoundError:
+            return {
+                'success': False,
+                'error': 'Document not found'
+            }
+    
+    def document_path(self, business_id: str, document_id: str) -> str:
+        """Path of a stored document, by its unique filename"""
+        if os.path.basename(document_id) != document_id or document_id in ('', '.', '..'):
+            raise FileNotFoundError(document_id)
+        return os.path.join(self.business_folder(business_id), document_id)
+    
+    def business_folder(self, business_id: str) -> str:
+        """A business's data room folder; ids that are not plain names (``..``,
+        paths) have none, so callers never touch files outside ``base_path``"""
+        if not BUSINESS_ID.match(str(business_id)):
+            raise FileNotFoundError(business_id)
+        return os.path.join(self.base_path, str(business_id))
+    
     async def generate_shareable_link(self, file_path: str, 
                                     recipient_id: str, 
                                     expiry_hours: int = 24) -> Dict:
@@ -64,7 +110,10 @@ class DataRoomService:
             }
     
     async def list_documents(self, business_id: str) -> List[Dict]:
-        business_folder = os.path.join(self.base_path, str(business_id))
+        try:
+            business_folder = self.business_folder(business_id)
+        except FileNotFoundError:
+            return []
         if not os.path.exists(business_folder):
             return []
         
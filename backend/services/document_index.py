@@ -0,0 +1,136 @@
+"""Full-text search over each business's data room (SQLite FTS5).
+
+Every business gets its own index file under ``DOCUMENT_INDEX_DIR``, so a
+search only ever touches the documents of the data room being searched and
+a business's index can be dropped with one file. Uploads stage an
+``index_document`` job; the worker extracts the text and upserts the row.
+Deletes remove the row right away, and the job re-checks the file on disk,
+so an upload job that runs after its document was deleted does nothing.
+"""
+import html
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from services.job_queue import JobQueue
+
+INDEX_DOCUMENT = "index_document"
+BUSINESS_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+QUERY_TERM = re.compile(r'"([^"]*)"|(\S+)')
+# Filename hits rank above body hits (bm25 weight per column)
+FILENAME_WEIGHT = 4.0
+BODY_WEIGHT = 1.0
+SNIPPET_TOKENS = 16
+# Hit markers are control characters stripped from indexed text, which
+# survive html.escape, so snippets are escaped first and highlighted after
+_HIT_START, _HIT_END = "\x01", "\x02"
+_STRIP_MARKERS = {ord(_HIT_START): None, ord(_HIT_END): None}
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5(
+    document_id UNINDEXED, filename, body, indexed_at UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+class DocumentIndex:
+    def __init__(self, directory: str = settings.DOCUMENT_INDEX_DIR):
+        self.directory = directory
+
+    def path(self, business_id: str) -> str:
+        if not BUSINESS_ID.match(str(business_id)):
+            raise ValueError(f"Invalid business id: {business_id!r}")
+        return os.path.join(self.directory, f"{business_id}.fts")
+
+    def _connect(self, business_id: str, create: bool = False) -> Optional[sqlite3.Connection]:
+        path = self.path(business_id)
+        if not create and not os.path.exists(path):
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        # Short-lived connections: sqlite3 objects must stay on one thread,
+        # and opening a local file costs microseconds
+        connection = sqlite3.connect(path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(SCHEMA)
+        return connection
+
+    def upsert(self, business_id: str, document_id: str, filename: str, body: str) -> None:
+        with closing(self._connect(business_id, create=True)) as connection, connection:
+            connection.execute("DELETE FROM documents WHERE document_id = ?", (document_id,))
+            connection.execute(
+                "INSERT INTO documents (document_id, filename, body, indexed_at) VALUES (?, ?, ?, ?)",
+                (document_id, filename, body.translate(_STRIP_MARKERS), time.time())
+            )
+
+    def remove(self, business_id: str, document_id: str) -> bool:
+        connection = self._connect(business_id)
+        if connection is None:
+            return False
+        with closing(connection), connection:
+            return connection.execute("DELETE FROM documents WHERE document_id = ?", (document_id,)).rowcount > 0
+
+    def search(self, business_id: str, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Best matches first, each with a highlighted snippet of the body"""
+        match = self.match_expression(query)
+        connection = self._connect(business_id) if match is not None else None
+        if connection is None:
+            return []
+        with closing(connection):
+            rows = connection.execute(
+                f"""
+                SELECT document_id, filename,
+                       snippet(documents, 2, ?, ?, '…', {SNIPPET_TOKENS}),
+                       bm25(documents, 0, {FILENAME_WEIGHT}, {BODY_WEIGHT}) AS score
+                FROM documents WHERE documents MATCH ?
+                ORDER BY score LIMIT ?
+                """,
+                (_HIT_START, _HIT_END, match, limit)
+            ).fetchall()
+        return [
+            {
+                'document_id': document_id,
+                'filename': filename,
+                'snippet': self._highlight(snippet),
+                # bm25 is lower-is-better; flip it so higher means more relevant
+                'score': round(-score, 4),
+            }
+            for document_id, filename, snippet, score in rows
+        ]
+
+    @staticmethod
+    def match_expression(query: str) -> Optional[str]:
+        """FTS5 query matching every term; "quoted text" is a phrase.
+
+        Every term is quoted, so user input can never be parsed as FTS5
+        syntax (operators, column filters) or fail to parse.
+        """
+        terms = []
+        for phrase, word in QUERY_TERM.findall(query or ""):
+            term = (phrase or word).strip()
+            if term:
+                terms.append('"' + term.replace('"', '""') + '"')
+        return " ".join(terms) or None
+
+    @staticmethod
+    def _highlight(snippet: str) -> str:
+        return html.escape(snippet).replace(_HIT_START, "<mark>").replace(_HIT_END, "</mark>")
+
+def add_index_job(db: Session, business_id: str, document: Dict[str, Any]) -> None:
+    """Stage indexing of a stored data room document; the caller commits"""
+    JobQueue(db).add(
+        INDEX_DOCUMENT,
+        {
+            'business_id': str(business_id),
+            'document_id': document['unique_filename'],
+            'filename': document['filename'],
+        },
+        idempotency_key=f"{INDEX_DOCUMENT}:{business_id}:{document['unique_filename']}"
+    )
+
+document_index = DocumentIndex()
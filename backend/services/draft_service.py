@@ -0,0 +1,123 @@
+from typing import Dict, Any, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+from models.business import Business, BusinessListing, ListingDraft
+from services.listing_service import ListingService
+
+class DraftConflictError(Exception):
+    """Raised when a draft changed since the version the client last saw"""
+    def __init__(self, business_id: int, current_version: Optional[int]):
+        self.business_id = business_id
+        self.current_version = current_version
+        super().__init__(
+            f"Draft for business {business_id} is at version {current_version}"
+        )
+
+class DraftNotFoundError(Exception):
+    pass
+
+class DraftService:
+    SECTIONS = ('business_info', 'financial_info', 'assets_info', 'transfer_info')
+
+    # Draft fields copied onto the Business row when the listing is published
+    BUSINESS_FIELDS = {
+        'business_info': ['name', 'sector', 'location', 'years_operation', 'description'],
+        'financial_info': ['annual_revenue', 'ebitda', 'total_assets', 'profit_margin'],
+    }
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_draft(self, business_id: int) -> Optional[ListingDraft]:
+        return self.db.get(ListingDraft, business_id)
+
+    def patch_section(self, business_id: int, section: str, changes: Dict[str, Any],
+                      expected_version: Optional[int] = None) -> ListingDraft:
+        """Merge the changed fields of one wizard section into the draft"""
+        if section not in self.SECTIONS:
+            raise ValueError(f"Unknown draft section: {section}")
+
+        draft = self.get_draft(business_id)
+        if draft is None:
+            if expected_version not in (None, 0):
+                raise DraftConflictError(business_id, None)
+            draft = ListingDraft(business_id=business_id)
+            self.db.add(draft)
+        elif expected_version is not None and expected_version != draft.version:
+            raise DraftConflictError(business_id, draft.version)
+
+        # JSON columns only notice reassignment, so build a new dict
+        setattr(draft, section, {**(getattr(draft, section) or {}), **changes})
+
+        try:
+            self.db.commit()
+        except (StaleDataError, IntegrityError):
+            # Another request updated (or created) the draft first
+            self.db.rollback()
+            current = self.get_draft(business_id)
+            raise DraftConflictError(business_id, current.version if current else None)
+
+        self.db.refresh(draft)
+        return draft
+
+    def publish(self, business_id: int, listing_data: Dict[str, Any],
+                expected_version: Optional[int] = None) -> BusinessListing:
+        """Turn the draft into a BusinessListing and drop it, in one transaction"""
+        draft = self.get_draft(business_id)
+        if draft is None:
+            raise DraftNotFoundError(f"No draft found for business {business_id}")
+        if expected_version is not None and expected_version != draft.version:
+            raise DraftConflictError(business_id, draft.version)
+
+        try:
+            business = self.db.get(Business, business_id)
+            if business is None:
+                business = Business(id=business_id)
+                self.db.add(business)
+            for section, fields in self.BUSINESS_FIELDS.items():
+                values = getattr(draft, section) or {}
+                for field in fields:
+                    if field in values:
+                        setattr(business, field, values[field])
+            self.db.flush()
+
+            listing = ListingService(self.db).add_listing(
+                business_id, self._listing_fields(draft, listing_data)
+            )
+            self.db.delete(draft)
+            self.db.commit()
+        except StaleDataError:
+            self.db.rollback()
+            current = self.get_draft(business_id)
+            raise DraftConflictError(business_id, current.version if current else None)
+        except Exception:
+            self.db.rollback()
+            raise
+
+        self.db.refresh(listing)
+        ListingService(self.db).invalidate_business(business_id)
+        return listing
+
+    def _listing_fields(self, draft: ListingDraft, listing_data: Dict[str, Any]) -> Dict[str, Any]:
+        assets = draft.assets_info or {}
+        transfer = draft.transfer_info or {}
+
+        fields = {
+            'assets_included': [item for items in assets.values() for item in (items or [])],
+            'transfer_timeline': transfer.get('timeline'),
+            'handover_type': transfer.get('handover_type', 'Immediate'),
+        }
+        # Explicit values sent with the publish request win over the draft
+        fields.update({k: v for k, v in listing_data.items() if v is not None})
+        return fields
+
+    @staticmethod
+    def to_dict(draft: ListingDraft) -> Dict[str, Any]:
+        return {
+            'business_id': draft.business_id,
+            'version': draft.version,
+            'updated_at': draft.updated_at.isoformat() if draft.updated_at else None,
+            **{section: getattr(draft, section) or {} for section in DraftService.SECTIONS}
+        }
@@ -0,0 +1,338 @@
+"""Spreadsheet exports of portfolio valuations and buyer matches.
+
+Businesses are read in keyset-paginated chunks of ``EXPORT_CHUNK_ROWS``;
+each chunk is valued (and matched), formatted column by column and
+written out before the next one is read, so memory stays flat whatever
+the export size. CSV amounts use ``format_currency_column``. XLSX is
+written as a zip stream with the standard library: amounts stay numbers
+(sortable) and get an Indian lakh/crore number format.
+"""
+import csv
+import io
+import re
+import zipfile
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+from xml.sax.saxutils import escape
+
+from sqlalchemy.orm import Session
+
+from agents.match_agent import MatchAgent
+from config.settings import settings
+from models.business import Business
+from models.database import SessionLocal
+from services.financial_history import history_store
+from services.valuation_engine import ValuationEngine
+from utils.helpers import format_currency_column
+
+# Starlette appends "; charset=utf-8" to text types
+CSV_MEDIA_TYPE = "text/csv"
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+MEDIA_TYPES = {'csv': CSV_MEDIA_TYPE, 'xlsx': XLSX_MEDIA_TYPE}
+
+class Column:
+    """One export column; ``kind`` is text, number or amount (rupees)"""
+    def __init__(self, key: str, title: str, kind: str = 'text'):
+        self.key = key
+        self.title = title
+        self.kind = kind
+
+VALUATION_COLUMNS = [
+    Column('business_id', 'Business ID', 'number'),
+    Column('business_name', 'Business'),
+    Column('sector', 'Sector'),
+    Column('location', 'Location'),
+    Column('method', 'Method'),
+    Column('estimated_value', 'Estimated value', 'amount'),
+    Column('annual_revenue', 'Annual revenue', 'amount'),
+    Column('ebitda', 'EBITDA', 'amount'),
+    Column('total_assets', 'Total assets', 'amount'),
+    Column('confidence_score', 'Confidence', 'number'),
+    Column('error', 'Error'),
+]
+
+MATCH_COLUMNS = [
+    Column('business_id', 'Business ID', 'number'),
+    Column('business_name', 'Business'),
+    Column('sector', 'Sector'),
+    Column('location', 'Location'),
+    Column('business_valuation', 'Business valuation', 'amount'),
+    Column('rank', 'Rank', 'number'),
+    Column('buyer_id', 'Buyer'),
+    Column('buyer_type', 'Buyer type'),
+    Column('match_score', 'Match score', 'number'),
+    Column('min_investment', 'Min investment', 'amount'),
+    Column('max_investment', 'Max investment', 'amount'),
+]
+
+def business_chunks(business_ids: Optional[Sequence[int]] = None, chunk_rows: int = settings.EXPORT_CHUNK_ROWS,
+                    session_factory: Callable[[], Session] = SessionLocal) -> Iterator[List[Business]]:
+    """The given businesses (default: every listed one) in id order, a chunk at a time"""
+    last_id = 0
+    with session_factory() as db:
+        while True:
+            query = db.query(Business).filter(Business.id > last_id)
+            if business_ids:
+                query = query.filter(Business.id.in_(business_ids))
+            else:
+                query = query.filter(Business.is_listed == True)  # noqa: E712
+            chunk = query.order_by(Business.id).limit(chunk_rows).all()
+            if not chunk:
+                return
+            last_id = chunk[-1].id
+            yield chunk
+            # Rows already written need not stay in the identity map
+            db.expunge_all()
+
+def _financial_data(business: Business, histories: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    financial_data = {
+        'annual_revenue': business.annual_revenue or 0,
+        'total_assets': business.total_assets or 0,
+        'profit_margin': business.profit_margin or 0,
+        'years_operation': business.years_operation or 0,
+    }
+    if business.ebitda is not None:
+        # Left out when unknown so the engine estimates it from revenue
+        financial_data['ebitda'] = business.ebitda
+    if business.id in histories:
+        financial_data['history'] = histories[business.id]
+    return financial_data
+
+def valuation_rows(chunk: List[Business], engine: ValuationEngine, method: str = 'auto') -> List[Dict[str, Any]]:
+    histories = history_store.metrics([b.id for b in chunk])
+    rows = []
+    for business in chunk:
+        financial_data = _financial_data(business, histories)
+        row = {
+            'business_id': business.id, 'business_name': business.name,
+            'sector': business.sector, 'location': business.location,
+            'annual_revenue': financial_data['annual_revenue'], 'ebitda': business.ebitda,
+            'total_assets': financial_data['total_assets'],
+        }
+        try:
+            valuation = engine.calculate_valuation(financial_data, method)
+        except ValueError as e:
+            row.update(method=method, estimated_value=None, confidence_score=None, error=str(e))
+        else:
+            row.update(method=valuation['method'], estimated_value=valuation['estimated_value'],
+                       confidence_score=valuation['confidence_score'], error=None)
+        rows.append(row)
+    return rows
+
+def match_rows(chunk: List[Business], engine: ValuationEngine, matcher) -> List[Dict[str, Any]]:
+    """One row per (business, matched buyer), businesses valued with the auto method"""
+    rows = []
+    for valuation in valuation_rows(chunk, engine):
+        if valuation['estimated_value'] is None:
+            continue
+        matches = matcher.find_matches({
+            'sector': valuation['sector'],
+            'location': valuation['location'],
+            'valuation': valuation['estimated_value'],
+        })
+        for rank, match in enumerate(matches, start=1):
+            rows.append({
+                'business_id': valuation['business_id'], 'business_name': valuation['business_name'],
+                'sector': valuation['sector'], 'location': valuation['location'],
+                'business_valuation': valuation['estimated_value'], 'rank': rank,
+                # Same anonymized handle the match API shows
+                'buyer_id': match['anonymized_id'], 'buyer_type': match['type'],
+                'match_score': match['match_score'],
+                'min_investment': match['min_investment'], 'max_investment': match['max_investment'],
+            })
+    return rows
+
+# Spreadsheets treat text starting with these as a formula
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+def _defuse(value: Any) -> Any:
+    """User text (business names, locations) as a literal, never a live formula"""
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+class CsvExportWriter:
+    def __init__(self, columns: List[Column]):
+        self.columns = columns
+
+    def start(self) -> bytes:
+        # BOM so Excel opens the file as UTF-8 (₹)
+        return ("\ufeff" + self._encode([[c.title for c in self.columns]])).encode("utf-8")
+
+    def rows(self, rows: List[Dict[str, Any]]) -> bytes:
+        if not rows:
+            return b""
+        cells = []
+        for column in self.columns:
+            values = [row.get(column.key) for row in rows]
+            if column.kind == 'amount':
+                # One vectorized pass per column instead of per cell
+                values = format_currency_column([float('nan') if v is None else v for v in values])
+            elif column.kind == 'text':
+                values = [_defuse(v) for v in values]
+            cells.append(['' if v is None else v for v in values])
+        return self._encode(zip(*cells)).encode("utf-8")
+
+    def finish(self) -> bytes:
+        return b""
+
+    @staticmethod
+    def _encode(rows) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+
+# Characters XML 1.0 does not allow, even escaped
+_XML_INVALID = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+# Up to 99 crore the lakh/crore grouping is exact; Excel formats have no
+# repeating two-digit group, so larger amounts lump the leading digits
+INDIAN_AMOUNT_FORMAT = '[>=10000000]"₹"##\\,##\\,##\\,##0;[>=100000]"₹"##\\,##\\,##0;"₹"#,##0'
+
+_XLSX_STATIC = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+        'Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/styles.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        f'<numFmts count="1"><numFmt numFmtId="164" formatCode="{escape(INDIAN_AMOUNT_FORMAT, {chr(34): "&quot;"})}"/></numFmts>'
+        '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+        '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+        '</styleSheet>'
+    ),
+}
+AMOUNT_STYLE, HEADER_STYLE = 1, 2
+
+class _Sink:
+    """Write-only file object whose contents are collected between reads"""
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+class XlsxExportWriter:
+    """Single-sheet workbook streamed as it is written (inline strings, no
+    shared string table, so nothing has to be held until the end)"""
+    def __init__(self, columns: List[Column], sheet_name: str = "Export"):
+        self.columns = columns
+        self.sheet_name = sheet_name
+        self._sink = _Sink()
+        # The sink cannot seek, so zipfile writes sizes in data descriptors
+        self._zip = zipfile.ZipFile(self._sink, "w", zipfile.ZIP_DEFLATED)
+        self._sheet = None
+        self._row = 0
+
+    def start(self) -> bytes:
+        for name, content in _XLSX_STATIC.items():
+            self._zip.writestr(name, content)
+        self._zip.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{self._text(self.sheet_name)}" sheetId="1" r:id="rId1"/></sheets>'
+            '</workbook>'
+        ))
+        self._sheet = self._zip.open('xl/worksheets/sheet1.xml', 'w')
+        self._sheet.write((
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            '<sheetData>'
+        ).encode())
+        self._write_rows([[(c.title, 'header') for c in self.columns]])
+        return self._sink.take()
+
+    def rows(self, rows: List[Dict[str, Any]]) -> bytes:
+        self._write_rows([[(row.get(c.key), c.kind) for c in self.columns] for row in rows])
+        return self._sink.take()
+
+    def finish(self) -> bytes:
+        self._sheet.write(b'</sheetData></worksheet>')
+        self._sheet.close()
+        self._zip.close()
+        return self._sink.take()
+
+    def _write_rows(self, rows: List[List[Any]]) -> None:
+        parts = []
+        for cells in rows:
+            self._row += 1
+            parts.append(f'<row r="{self._row}">')
+            for value, kind in cells:
+                if value is None or value == '':
+                    parts.append('<c/>')
+                elif kind in ('number', 'amount') and isinstance(value, (int, float)):
+                    style = f' s="{AMOUNT_STYLE}"' if kind == 'amount' else ''
+                    parts.append(f'<c{style}><v>{value!r}</v></c>')
+                else:
+                    style = f' s="{HEADER_STYLE}"' if kind == 'header' else ''
+                    parts.append(f'<c t="inlineStr"{style}><is><t>{self._text(value)}</t></is></c>')
+            parts.append('</row>')
+        self._sheet.write("".join(parts).encode("utf-8"))
+
+    @staticmethod
+    def _text(value: Any) -> str:
+        return escape(_XML_INVALID.sub("", str(value)), {'"': "&quot;"})
+
+WRITERS = {'csv': CsvExportWriter, 'xlsx': XlsxExportWriter}
+
+def stream_export(kind: str, export_format: str, business_ids: Optional[Sequence[int]] = None,
+                  method: str = 'auto', matcher=None) -> Iterator[bytes]:
+    """Bytes of a ``valuations`` or ``matches`` export, produced chunk by chunk"""
+    engine = ValuationEngine()
+    if kind == 'valuations':
+        writer = WRITERS[export_format](VALUATION_COLUMNS)
+        make_rows = lambda chunk: valuation_rows(chunk, engine, method)  # noqa: E731
+    else:
+        writer = WRITERS[export_format](MATCH_COLUMNS)
+        matcher = matcher or MatchAgent()
+        make_rows = lambda chunk: match_rows(chunk, engine, matcher)  # noqa: E731
+
+    yield writer.start()
+    for chunk in business_chunks(business_ids):
+        data = writer.rows(make_rows(chunk))
+        if data:
+            yield data
+    yield writer.finish()
@@ -0,0 +1,146 @@
+"""Quarterly/annual financial history per business, stored as Parquet.
+
+Each business has one Parquet file of periods. Metrics for any number of
+businesses are derived together with grouped, vectorized pandas operations
+(no Python loop per business), so a batch re-valuation over thousands of
+businesses with decades of quarters is a handful of array passes.
+
+pandas is imported on first use; most requests never touch history.
+"""
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+from config.settings import settings
+
+HISTORY_COLUMNS = ['period_end', 'period_type', 'revenue', 'ebitda', 'total_assets']
+PERIODS_PER_YEAR = {'Q': 4, 'A': 1}
+# Longest gap between consecutive period ends that is not a missing period
+MAX_PERIOD_DAYS = {'Q': 100, 'A': 380}
+# Growth and volatility look at this many most recent years
+GROWTH_WINDOW_YEARS = 5
+METRIC_COLUMNS = ['ttm_revenue', 'ttm_ebitda', 'ttm_ebitda_margin', 'revenue_growth',
+                  'growth_volatility', 'years_of_history', 'latest_period', 'latest_total_assets']
+
+class FinancialHistoryStore:
+    def __init__(self, directory: str = settings.FINANCIAL_HISTORY_DIR):
+        self.directory = directory
+
+    def save(self, business_id: int, periods: List[Dict[str, Any]]) -> int:
+        """Replace a business's history; returns the number of periods stored"""
+        import pandas as pd
+
+        frame = pd.DataFrame(periods, columns=HISTORY_COLUMNS)
+        if frame.empty:
+            raise ValueError("History must contain at least one period")
+        period_types = set(frame['period_type'])
+        if len(period_types) != 1 or not period_types <= set(PERIODS_PER_YEAR):
+            raise ValueError("All periods must share one period_type, 'Q' or 'A'")
+
+        frame['period_end'] = pd.to_datetime(frame['period_end'])
+        for column in ('revenue', 'ebitda', 'total_assets'):
+            frame[column] = pd.to_numeric(frame[column]).astype('float64')
+        frame = (frame.drop_duplicates('period_end', keep='last')
+                      .sort_values('period_end')
+                      .reset_index(drop=True))
+        # TTM and growth windows count periods, so a missing one would make
+        # "four quarters" span eighteen months
+        gaps = frame['period_end'].diff().dt.days > MAX_PERIOD_DAYS[period_types.pop()]
+        if gaps.any():
+            missing_after = frame['period_end'].shift(1)[gaps].dt.strftime('%Y-%m-%d').tolist()
+            raise ValueError(f"History has missing periods after {', '.join(missing_after)}")
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(business_id)
+        # Write then rename so readers never see a half-written file
+        frame.to_parquet(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+        return len(frame)
+
+    def load(self, business_ids: Iterable[int]):
+        """One frame with a business_id column for every business that has history"""
+        import pandas as pd
+
+        frames = []
+        for business_id in business_ids:
+            path = self._path(business_id)
+            if os.path.exists(path):
+                frames.append(pd.read_parquet(path).assign(business_id=business_id))
+        if not frames:
+            return pd.DataFrame(columns=HISTORY_COLUMNS + ['business_id'])
+        return pd.concat(frames, ignore_index=True)
+
+    def business_ids(self) -> List[int]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(int(name[:-len(".parquet")]) for name in os.listdir(self.directory)
+                      if name.endswith(".parquet") and name[:-len(".parquet")].isdigit())
+
+    def metrics(self, business_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """History metrics keyed by business id; businesses without history are absent"""
+        frame = history_metrics(self.load(business_ids))
+        # NaN (e.g. growth with under a year of data) becomes None for JSON
+        frame = frame.astype(object).where(frame.notna(), None)
+        return {int(business_id): row for business_id, row in frame.to_dict('index').items()}
+
+    def _path(self, business_id: int) -> str:
+        return os.path.join(self.directory, f"{int(business_id)}.parquet")
+
+def history_metrics(history):
+    """Per-business TTM figures, growth and volatility from a history frame.
+
+    TTM revenue/EBITDA come from grouped cumulative sums (value now minus
+    value one year of periods earlier). Growth is the mean year-over-year
+    change of TTM revenue over the last GROWTH_WINDOW_YEARS, volatility its
+    standard deviation. Windows are counted in periods, so any that span
+    more than a year of period ends (a gap in older history) are left out.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if history.empty:
+        return pd.DataFrame(columns=METRIC_COLUMNS).rename_axis('business_id')
+
+    df = history.sort_values(['business_id', 'period_end'], kind='mergesort').reset_index(drop=True)
+    grouped = df.groupby('business_id', sort=False)
+    from_end = grouped.cumcount(ascending=False)
+    periods_per_year = df['period_type'].map(PERIODS_PER_YEAR)
+
+    df['ttm_revenue'] = np.nan
+    df['ttm_ebitda'] = np.nan
+    df['revenue_growth'] = np.nan
+    # A business has a single period type, so each subset shifts by a constant
+    for period_type, n in PERIODS_PER_YEAR.items():
+        mask = df['period_type'] == period_type
+        if not mask.any():
+            continue
+        subset = df.loc[mask]
+        by_business = subset['business_id']
+        ends = subset['period_end'].groupby(by_business)
+        # NaN spans (fewer than n periods so far) compare False
+        full_year = (subset['period_end'] - ends.shift(n - 1)).dt.days <= (n - 1) * MAX_PERIOD_DAYS[period_type]
+        year_apart = (subset['period_end'] - ends.shift(n)).dt.days <= n * MAX_PERIOD_DAYS[period_type]
+        for column in ('revenue', 'ebitda'):
+            running = subset[column].groupby(by_business).cumsum()
+            year_ago = running.groupby(by_business).shift(n).fillna(0.0)
+            df.loc[mask, f'ttm_{column}'] = (running - year_ago).where(full_year)
+        ttm_revenue = df.loc[mask, 'ttm_revenue']
+        previous = ttm_revenue.groupby(by_business).shift(n).where(year_apart)
+        df.loc[mask, 'revenue_growth'] = (ttm_revenue / previous.where(previous > 0)) - 1
+
+    recent = df[from_end < GROWTH_WINDOW_YEARS * periods_per_year]
+    growth = recent.groupby('business_id')['revenue_growth'].agg(['mean', 'std'])
+
+    latest = grouped.tail(1).set_index('business_id')
+    result = pd.DataFrame({
+        'ttm_revenue': latest['ttm_revenue'],
+        'ttm_ebitda': latest['ttm_ebitda'],
+        'ttm_ebitda_margin': latest['ttm_ebitda'] / latest['ttm_revenue'].where(latest['ttm_revenue'] > 0),
+        'revenue_growth': growth['mean'],
+        'growth_volatility': growth['std'],
+        'years_of_history': grouped.size() / grouped['period_type'].first().map(PERIODS_PER_YEAR),
+        'latest_period': latest['period_end'].dt.strftime('%Y-%m-%d'),
+        'latest_total_assets': latest['total_assets'],
+    })
+    return result.rename_axis('business_id')
+
+history_store = FinancialHistoryStore()
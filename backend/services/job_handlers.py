@@ -0,0 +1,111 @@
+"""Handlers for background jobs; importing this module registers them"""
+import os
+from typing import Any, Dict
+
+from agents.match_agent import MatchAgent
+from agents.orchestrator import AgentOrchestrator
+from models.business import Business
+from models.database import SessionLocal
+from services.data_room_service import DataRoomService
+from services.document_index import INDEX_DOCUMENT, document_index
+from services.financial_history import history_store
+from services.job_queue import JobContext, PermanentJobError, job_handler
+from services.match_inbox import LISTING_PUBLISHED, MatchInboxService
+from services.text_extraction import extract_text
+from services.valuation_engine import ValuationEngine
+
+AGENT_ACTIONS = ("start_valuation", "create_listing", "find_buyers", "start_transfer")
+
+@job_handler("agent_action")
+async def run_agent_action(payload: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    """Any orchestrator workflow, off the request path"""
+    action = payload.get("action")
+    if action not in AGENT_ACTIONS:
+        raise PermanentJobError(f"Unknown agent action: {action}")
+    # A fresh orchestrator per job: its workflow state is per conversation
+    return await AgentOrchestrator().execute_workflow(
+        user_id=str(context.user_id),
+        action=action,
+        data=payload.get("data", {})
+    )
+
+@job_handler("batch_revaluation")
+def run_batch_revaluation(payload: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    """Re-value the given businesses (or every listed one) with ValuationEngine"""
+    engine = ValuationEngine()
+    method = payload.get("method", "auto")
+    if method not in engine.methods and method != "auto":
+        raise PermanentJobError(f"Unknown valuation method: {method}")
+
+    with SessionLocal() as db:
+        query = db.query(Business)
+        if payload.get("business_ids"):
+            query = query.filter(Business.id.in_(payload["business_ids"]))
+        else:
+            query = query.filter(Business.is_listed == True)  # noqa: E712
+        businesses = query.order_by(Business.id).all()
+        # One vectorized pass over every business's history
+        histories = history_store.metrics([b.id for b in businesses])
+
+        valuations, errors = {}, {}
+        for index, business in enumerate(businesses, start=1):
+            financial_data = {
+                'annual_revenue': business.annual_revenue or 0,
+                'total_assets': business.total_assets or 0,
+                'profit_margin': business.profit_margin or 0,
+                'years_operation': business.years_operation or 0,
+            }
+            if business.ebitda is not None:
+                # Left out when unknown so the engine estimates it from revenue
+                financial_data['ebitda'] = business.ebitda
+            if business.id in histories:
+                financial_data['history'] = histories[business.id]
+            try:
+                valuations[business.id] = engine.calculate_valuation(financial_data, method)['estimated_value']
+            except ValueError as e:
+                errors[business.id] = str(e)
+            if index % 25 == 0 or index == len(businesses):
+                context.progress(index / len(businesses), f"Valued {index} of {len(businesses)} businesses")
+
+    return {'method': method, 'valuations': valuations, 'errors': errors}
+
+@job_handler(LISTING_PUBLISHED)
+def run_listing_fan_out(payload: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    """Append a newly published listing to every matching buyer's inbox"""
+    listing_id = payload.get("listing_id")
+    if not isinstance(listing_id, int):
+        raise PermanentJobError("listing_id is required")
+    with SessionLocal() as db:
+        try:
+            matched = MatchInboxService(db).fan_out(listing_id, MatchAgent())
+        except LookupError as e:
+            raise PermanentJobError(str(e))
+    return {"listing_id": listing_id, "buyers_matched": matched}
+
+@job_handler(INDEX_DOCUMENT)
+def run_document_index(payload: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    """Extract a data room document's text into its business's search index"""
+    business_id, document_id = payload.get("business_id"), payload.get("document_id")
+    if not business_id or not document_id:
+        raise PermanentJobError("business_id and document_id are required")
+    try:
+        document_index.path(business_id)
+        path = DataRoomService().document_path(business_id, document_id)
+    except (ValueError, FileNotFoundError) as e:
+        raise PermanentJobError(str(e))
+
+    if not os.path.exists(path):
+        # Deleted before we got to it
+        document_index.remove(business_id, document_id)
+        return {"document_id": document_id, "indexed": False}
+    try:
+        text, error = extract_text(path), None
+    except ValueError as e:
+        # Still searchable by filename
+        text, error = None, str(e)
+    document_index.upsert(business_id, document_id, payload.get("filename") or document_id, text or "")
+    if not os.path.exists(path):
+        # Deleted while we were extracting; the delete's removal already ran
+        document_index.remove(business_id, document_id)
+        return {"document_id": document_id, "indexed": False}
+    return {"document_id": document_id, "indexed": True, "characters": len(text or ""), "error": error}
@@ -0,0 +1,259 @@
+import asyncio
+import inspect
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from models.database import SessionLocal
+from models.job import Job
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any], "JobContext"], Any]
+
+_HANDLERS: Dict[str, Handler] = {}
+
+def job_handler(kind: str):
+    """Register ``func(payload, context)`` to run jobs of ``kind``; may be async"""
+    def decorator(func: Handler) -> Handler:
+        _HANDLERS[kind] = func
+        return func
+    return decorator
+
+def registered_kinds() -> List[str]:
+    return sorted(_HANDLERS)
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help (bad payload, missing row)"""
+
+class JobQueue:
+    """Durable job queue stored in the application database.
+
+    Jobs are claimed with a compare-and-set update, so any number of worker
+    processes can share one SQLite file (or a real database) without an
+    external broker. Failed jobs are retried with exponential backoff until
+    ``max_attempts``; jobs whose worker died are taken back after
+    ``JOB_LEASE_SECONDS``.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add(self, kind: str, payload: Optional[Dict[str, Any]] = None, priority: int = 0,
+            idempotency_key: Optional[str] = None, user_id: Optional[int] = None,
+            max_attempts: int = settings.JOB_MAX_ATTEMPTS, delay: float = 0) -> Job:
+        """Stage a job in the current transaction; the caller commits"""
+        job = Job(
+            kind=kind,
+            payload=payload or {},
+            priority=priority,
+            idempotency_key=idempotency_key,
+            user_id=user_id,
+            max_attempts=max_attempts,
+            run_after=datetime.utcnow() + timedelta(seconds=delay),
+        )
+        self.db.add(job)
+        return job
+
+    def enqueue(self, kind: str, payload: Optional[Dict[str, Any]] = None, priority: int = 0,
+                idempotency_key: Optional[str] = None, user_id: Optional[int] = None,
+                max_attempts: int = settings.JOB_MAX_ATTEMPTS, delay: float = 0) -> Job:
+        """Add and commit a job; a repeated idempotency key returns the original job"""
+        if idempotency_key:
+            existing = self.get_by_key(idempotency_key)
+            if existing is not None:
+                return existing
+        job = self.add(kind, payload, priority, idempotency_key, user_id, max_attempts, delay)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Lost a race with another request using the same key
+            self.db.rollback()
+            existing = self.get_by_key(idempotency_key) if idempotency_key else None
+            if existing is None:
+                raise
+            return existing
+        self.db.refresh(job)
+        return job
+
+    def get(self, job_id: int) -> Optional[Job]:
+        return self.db.get(Job, job_id)
+
+    def get_by_key(self, idempotency_key: str) -> Optional[Job]:
+        return self.db.query(Job).filter(Job.idempotency_key == idempotency_key).first()
+
+    def claim(self, worker_id: str, kinds: Optional[List[str]] = None) -> Optional[Job]:
+        """Take the highest-priority due job, or None when nothing is runnable"""
+        while True:
+            now = datetime.utcnow()
+            query = self.db.query(Job.id).filter(Job.status == "queued", Job.run_after <= now)
+            if kinds:
+                query = query.filter(Job.kind.in_(kinds))
+            candidate = query.order_by(Job.priority.desc(), Job.id).first()
+            if candidate is None:
+                return None
+
+            claimed = self.db.query(Job).filter(Job.id == candidate.id, Job.status == "queued").update({
+                Job.status: "running",
+                Job.locked_by: worker_id,
+                Job.locked_at: now,
+                Job.attempts: Job.attempts + 1,
+            }, synchronize_session=False)
+            self.db.commit()
+            if claimed:
+                return self.db.get(Job, candidate.id)
+            # Another worker got there first; look for the next one
+
+    def report_progress(self, job_id: int, progress: float, message: Optional[str] = None,
+                        worker_id: Optional[str] = None) -> None:
+        query = self.db.query(Job).filter(Job.id == job_id, Job.status == "running")
+        if worker_id is not None:
+            # A worker that lost its lease must not keep renewing someone else's
+            query = query.filter(Job.locked_by == worker_id)
+        query.update({
+            Job.progress: max(0.0, min(1.0, progress)),
+            Job.progress_message: message,
+            # Progress doubles as a heartbeat so long jobs keep their lease
+            Job.locked_at: datetime.utcnow(),
+        }, synchronize_session=False)
+        self.db.commit()
+
+    def complete(self, job: Job, result: Any = None, worker_id: Optional[str] = None) -> bool:
+        """Record success; False (and the result dropped) if the lease is gone"""
+        return self._settle(job, worker_id, {
+            Job.status: "succeeded",
+            Job.result: result,
+            Job.progress: 1.0,
+            Job.error: None,
+            Job.locked_by: None,
+            Job.finished_at: datetime.utcnow(),
+        })
+
+    def fail(self, job: Job, error: str, retry: bool = True, worker_id: Optional[str] = None) -> bool:
+        values = {Job.error: error, Job.locked_by: None}
+        if retry and job.attempts < job.max_attempts:
+            values[Job.status] = "queued"
+            values[Job.run_after] = datetime.utcnow() + timedelta(seconds=self.backoff(job.attempts))
+        else:
+            values[Job.status] = "failed"
+            values[Job.finished_at] = datetime.utcnow()
+        return self._settle(job, worker_id, values)
+
+    def _settle(self, job: Job, worker_id: Optional[str], values: Dict[Any, Any]) -> bool:
+        # Only the lease holder may settle a job: once requeue_stale has handed
+        # it to another worker, a slow original must not overwrite that attempt
+        owner = worker_id if worker_id is not None else job.locked_by
+        settled = self.db.query(Job).filter(
+            Job.id == job.id, Job.status == "running", Job.locked_by == owner
+        ).update(values, synchronize_session=False)
+        self.db.commit()
+        return bool(settled)
+
+    def requeue_stale(self, lease_seconds: float = settings.JOB_LEASE_SECONDS) -> int:
+        """Return jobs held by workers that stopped reporting to the queue"""
+        cutoff = datetime.utcnow() - timedelta(seconds=lease_seconds)
+        stale = self.db.query(Job).filter(Job.status == "running", Job.locked_at < cutoff).all()
+        for job in stale:
+            self.fail(job, f"Worker {job.locked_by} lost its lease")
+        return len(stale)
+
+    @staticmethod
+    def backoff(attempts: int) -> float:
+        delay = min(settings.JOB_RETRY_MAX_DELAY, settings.JOB_RETRY_BASE_DELAY * 2 ** (attempts - 1))
+        # Jitter so jobs that failed together do not retry together
+        return delay * random.uniform(0.8, 1.2)
+
+    @staticmethod
+    def to_dict(job: Job) -> Dict[str, Any]:
+        return {
+            'id': job.id,
+            'kind': job.kind,
+            'status': job.status,
+            'priority': job.priority,
+            'attempts': job.attempts,
+            'max_attempts': job.max_attempts,
+            'progress': job.progress,
+            'progress_message': job.progress_message,
+            'result': job.result,
+            'error': job.error,
+            'created_at': job.created_at.isoformat() if job.created_at else None,
+            'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        }
+
+class JobContext:
+    """Handed to handlers for reporting progress on the running job"""
+    def __init__(self, job: Job, session_factory: Callable[[], Session]):
+        self.job_id = job.id
+        self.worker_id = job.locked_by
+        self.attempt = job.attempts
+        self.user_id = job.user_id
+        self._session_factory = session_factory
+
+    def progress(self, fraction: float, message: Optional[str] = None) -> None:
+        with self._session_factory() as db:
+            JobQueue(db).report_progress(self.job_id, fraction, message, self.worker_id)
+
+class JobWorker:
+    """Claims and runs jobs in a loop; worker.py runs one per process"""
+    def __init__(self, worker_id: str, session_factory: Callable[[], Session] = SessionLocal,
+                 poll_interval: float = settings.JOB_POLL_INTERVAL,
+                 kinds: Optional[List[str]] = None):
+        self.worker_id = worker_id
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval
+        self.kinds = kinds
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        stop = stop or threading.Event()
+        next_sweep = 0.0
+        failures = 0
+        while not stop.is_set():
+            try:
+                if time.monotonic() >= next_sweep:
+                    with self.session_factory() as db:
+                        JobQueue(db).requeue_stale()
+                    next_sweep = time.monotonic() + settings.JOB_LEASE_SECONDS / 4
+                ran = self.run_once()
+            except Exception:
+                # Queue bookkeeping failed (e.g. "database is locked"); the
+                # session rolled back when it closed. A job claimed but not
+                # settled is requeued once its lease runs out.
+                failures += 1
+                delay = min(settings.JOB_RETRY_MAX_DELAY, self.poll_interval * 2 ** min(failures, 8))
+                logger.exception("Job worker %s: queue error, retrying in %.1fs", self.worker_id, delay)
+                stop.wait(delay)
+                continue
+            failures = 0
+            if not ran:
+                stop.wait(self.poll_interval)
+
+    def run_once(self) -> bool:
+        """Run one job if any is due; returns whether a job was run"""
+        with self.session_factory() as db:
+            queue = JobQueue(db)
+            job = queue.claim(self.worker_id, self.kinds)
+            if job is None:
+                return False
+
+            handler = _HANDLERS.get(job.kind)
+            if handler is None:
+                queue.fail(job, f"No handler registered for job kind '{job.kind}'", retry=False,
+                           worker_id=self.worker_id)
+                return True
+            try:
+                result = handler(dict(job.payload or {}), JobContext(job, self.session_factory))
+                if inspect.isawaitable(result):
+                    result = asyncio.run(result)
+            except PermanentJobError as e:
+                queue.fail(job, str(e), retry=False, worker_id=self.worker_id)
+            except Exception as e:
+                queue.fail(job, f"{type(e).__name__}: {e}", worker_id=self.worker_id)
+            else:
+                queue.complete(job, result, worker_id=self.worker_id)
+            return True
@@ -1,12 +1,27 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
 from models.business import Business, BusinessListing
+from services.cache import ReadThroughCache, listing_cache
+from services.match_inbox import MatchInboxService
+from utils.helpers import serialize_model
 
 class ListingService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, cache: ReadThroughCache = listing_cache):
         self.db = db
+        self.cache = cache
     
     def create_listing(self, business_id: int, listing_data: Dict[str, Any]) -> BusinessListing:
+        listing = self.add_listing(business_id, listing_data)
+        
+        # Listing row and business status go out in one commit
+        self.db.commit()
+        self.db.refresh(listing)
+        self.invalidate_business(business_id)
+        
+        return listing
+    
+    def add_listing(self, business_id: int, listing_data: Dict[str, Any]) -> BusinessListing:
+        """Stage a listing and mark the business as listed without committing"""
         listing = BusinessListing(
             business_id=business_id,
             asking_price=listing_data.get('asking_price'),
@@ -16,15 +31,15 @@ class ListingService:
         )
         
         self.db.add(listing)
-        self.db.commit()
-        self.db.refresh(listing)
         
         # Update business status
         business = self.db.query(Business).filter(Business.id == business_id).first()
         if business:
             business.is_listed = True
-            self.db.commit()
         
+        self.db.flush()
+        # Buyer inboxes are filled by a job committed with the listing itself
+        MatchInboxService(self.db).add_listing_event(listing)
         return listing
     
     def get_business_listings(self, business_id: int) -> List[BusinessListing]:
@@ -35,13 +50,47 @@ class ListingService:
     def update_listing_status(self, listing_id: int, status: str) -> BusinessListing:
         listing = self.db.query(BusinessListing).filter(BusinessListing.id == listing_id).first()
         if listing:
-            listing.status = status
+            previous_status, listing.status = listing.status, status
+            # Sold or withdrawn listings leave buyer inboxes in the same commit
+            MatchInboxService(self.db).listing_status_changed(listing, previous_status)
             self.db.commit()
             self.db.refresh(listing)
+            self.cache.invalidate(f"listing:{listing_id}")
+            self.invalidate_business(listing.business_id)
         return listing
     
+    # --- Cached reads ---
+    # Hot read paths return plain dicts so they can be shared between
+    # requests (and workers); writes above invalidate the affected scopes.
+    # views_count is deliberately not invalidated on every view.
+    
+    def get_listing_data(self, listing_id: int) -> Optional[Dict[str, Any]]:
+        def load():
+            listing = self.db.query(BusinessListing).filter(BusinessListing.id == listing_id).first()
+            return self._listing_to_dict(listing) if listing else None
+        
+        # Misses are not cached: the next listing id would 404 for the whole
+        # TTL after it is created, and creation only knows the business scope
+        return self.cache.get_or_load(f"listing:{listing_id}", "detail", load, cache_none=False)
+    
+    def get_business_listings_data(self, business_id: int) -> List[Dict[str, Any]]:
+        def load():
+            return [self._listing_to_dict(l) for l in self.get_business_listings(business_id)]
+        
+        return self.cache.get_or_load(f"business:{business_id}", "listings", load)
+    
+    def invalidate_business(self, business_id: int) -> None:
+        self.cache.invalidate(f"business:{business_id}")
+    
+    @staticmethod
+    def _listing_to_dict(listing: BusinessListing) -> Dict[str, Any]:
+        data = serialize_model(listing)
+        if data.get('created_at') is not None:
+            data['created_at'] = data['created_at'].isoformat()
+        return data
+    
     def increment_views(self, listing_id: int) -> None:
         listing = self.db.query(BusinessListing).filter(BusinessListing.id == listing_id).first()
         if listing:
             listing.views_count += 1
-            self.db.commit()
\ No newline at end of file
+            self.db.commit()
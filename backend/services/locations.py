@@ -0,0 +1,160 @@
+"""Location hierarchy (country -> region -> state -> city) as bitsets.
+
+Every place in the hierarchy owns one bit. A place's *coverage* is its own
+bit OR'd with the bits of everything below it, so a buyer preferring
+"West" covers Maharashtra, Mumbai, Pune, Gujarat, Surat... Buyer
+preferences are expanded to a coverage mask once, when the buyer pool is
+ingested; scoring a business is then a single AND of the business
+location's bit against each buyer's mask.
+
+Masks are Python ints while building and fixed-width little-endian uint64
+words (``LocationIndex.words`` per buyer) inside buyer pool snapshots.
+"""
+import hashlib
+import math
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# region -> state -> {city: (latitude, longitude)}
+INDIA = {
+    'North': {
+        'Delhi NCT': {'Delhi': (28.61, 77.21)},
+        'Haryana': {'Gurugram': (28.46, 77.03), 'Faridabad': (28.41, 77.32)},
+        'Punjab': {'Ludhiana': (30.90, 75.85), 'Amritsar': (31.63, 74.87)},
+        'Chandigarh UT': {'Chandigarh': (30.73, 76.78)},
+        'Uttar Pradesh': {'Lucknow': (26.85, 80.95), 'Noida': (28.54, 77.39), 'Kanpur': (26.45, 80.33),
+                          'Varanasi': (25.32, 82.97), 'Agra': (27.18, 78.01)},
+        'Rajasthan': {'Jaipur': (26.91, 75.79), 'Jodhpur': (26.24, 73.02), 'Udaipur': (24.59, 73.71)},
+        'Uttarakhand': {'Dehradun': (30.32, 78.03)},
+        'Himachal Pradesh': {'Shimla': (31.10, 77.17)},
+        'Jammu and Kashmir': {'Srinagar': (34.08, 74.80), 'Jammu': (32.73, 74.86)},
+    },
+    'West': {
+        'Maharashtra': {'Mumbai': (19.08, 72.88), 'Pune': (18.52, 73.86), 'Nagpur': (21.15, 79.09),
+                        'Nashik': (20.00, 73.79), 'Thane': (19.22, 72.98)},
+        'Gujarat': {'Ahmedabad': (23.02, 72.57), 'Surat': (21.17, 72.83), 'Vadodara': (22.31, 73.18),
+                    'Rajkot': (22.30, 70.80)},
+        'Goa': {'Panaji': (15.49, 73.83)},
+    },
+    'South': {
+        'Karnataka': {'Bangalore': (12.97, 77.59), 'Mysore': (12.30, 76.64), 'Mangalore': (12.91, 74.86)},
+        'Tamil Nadu': {'Chennai': (13.08, 80.27), 'Coimbatore': (11.02, 76.96), 'Madurai': (9.93, 78.12)},
+        'Kerala': {'Kochi': (9.93, 76.27), 'Thiruvananthapuram': (8.52, 76.94)},
+        'Telangana': {'Hyderabad': (17.39, 78.49)},
+        'Andhra Pradesh': {'Visakhapatnam': (17.69, 83.22), 'Vijayawada': (16.51, 80.65)},
+        'Puducherry UT': {'Puducherry': (11.94, 79.81)},
+    },
+    'East': {
+        'West Bengal': {'Kolkata': (22.57, 88.36)},
+        'Odisha': {'Bhubaneswar': (20.30, 85.82)},
+        'Bihar': {'Patna': (25.59, 85.14)},
+        'Jharkhand': {'Ranchi': (23.34, 85.31), 'Jamshedpur': (22.80, 86.20)},
+    },
+    'Central': {
+        'Madhya Pradesh': {'Indore': (22.72, 75.86), 'Bhopal': (23.26, 77.41)},
+        'Chhattisgarh': {'Raipur': (21.25, 81.63)},
+    },
+    'North East': {
+        'Assam': {'Guwahati': (26.14, 91.74)},
+        'Meghalaya': {'Shillong': (25.58, 91.89)},
+    },
+}
+
+# Groupings that cut across states
+CLUSTERS = {
+    'NCR': ['Delhi', 'Gurugram', 'Faridabad', 'Noida'],
+}
+
+ALIASES = {
+    'all india': 'India', 'pan india': 'India', 'anywhere in india': 'India',
+    'bengaluru': 'Bangalore', 'bombay': 'Mumbai', 'new delhi': 'Delhi', 'gurgaon': 'Gurugram',
+    'mysuru': 'Mysore', 'mangaluru': 'Mangalore', 'cochin': 'Kochi', 'trivandrum': 'Thiruvananthapuram',
+    'calcutta': 'Kolkata', 'madras': 'Chennai', 'vizag': 'Visakhapatnam', 'pondicherry': 'Puducherry',
+    'baroda': 'Vadodara', 'delhi ncr': 'NCR', 'north india': 'North', 'south india': 'South',
+    'east india': 'East', 'west india': 'West', 'central india': 'Central', 'northeast': 'North East',
+}
+
+EARTH_RADIUS_KM = 6371.0
+
+class LocationIndex:
+    def __init__(self, country: str, regions: Dict[str, Dict[str, Dict[str, Tuple[float, float]]]],
+                 clusters: Dict[str, List[str]], aliases: Dict[str, str]):
+        self.names: List[str] = []
+        self.coordinates: Dict[int, Tuple[float, float]] = {}
+        self._coverage: List[int] = []
+        self._lookup: Dict[str, int] = {}
+
+        country_bit = self._add(country)
+        for region, states in regions.items():
+            region_bit = self._add(region)
+            for state, cities in states.items():
+                state_bit = self._add(state)
+                for city, coordinates in cities.items():
+                    city_bit = self._add(city)
+                    self.coordinates[city_bit] = coordinates
+                    self._coverage[state_bit] |= 1 << city_bit
+                self._coverage[region_bit] |= self._coverage[state_bit]
+            self._coverage[country_bit] |= self._coverage[region_bit]
+        for cluster, members in clusters.items():
+            cluster_bit = self._add(cluster)
+            for member in members:
+                self._coverage[cluster_bit] |= self._coverage[self._lookup[member.lower()]]
+        for alias, target in aliases.items():
+            self._lookup[alias] = self._lookup[target.lower()]
+
+        self.words = (len(self.names) + 63) // 64
+        # Snapshots built against a different hierarchy must be re-expanded
+        self.fingerprint = hashlib.blake2b(repr((self.names, self._coverage)).encode(), digest_size=8).hexdigest()
+
+    def _add(self, name: str) -> int:
+        if name.lower() in self._lookup:
+            raise ValueError(f"Duplicate location {name}")
+        bit = len(self.names)
+        self.names.append(name)
+        self._coverage.append(1 << bit)
+        self._lookup[name.lower()] = bit
+        return bit
+
+    def resolve(self, name: object) -> Optional[int]:
+        """Bit of a place name (case-insensitive, aliases allowed), or None"""
+        if not isinstance(name, str):
+            return None
+        return self._lookup.get(name.strip().lower())
+
+    def coverage(self, names: Iterable[str]) -> int:
+        """Mask of every place covered by any of ``names``; unknown names add nothing"""
+        mask = 0
+        for name in names:
+            bit = self.resolve(name)
+            if bit is not None:
+                mask |= self._coverage[bit]
+        return mask
+
+    def nearby(self, name: object, radius_km: float) -> int:
+        """Bits of the cities within ``radius_km`` of city ``name``, excluding itself"""
+        bit = self.resolve(name)
+        if bit not in self.coordinates or radius_km <= 0:
+            return 0
+        mask = 0
+        for other, coordinates in self.coordinates.items():
+            if other != bit and self.distance_km(self.coordinates[bit], coordinates) <= radius_km:
+                mask |= 1 << other
+        return mask
+
+    def to_words(self, mask: int) -> List[int]:
+        return [(mask >> (64 * word)) & 0xFFFFFFFFFFFFFFFF for word in range(self.words)]
+
+    def to_array(self, mask: int) -> "np.ndarray":
+        import numpy as np
+
+        return np.array(self.to_words(mask), dtype=np.uint64)
+
+    @staticmethod
+    def distance_km(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+        lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+        h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+location_index = LocationIndex('India', INDIA, CLUSTERS, ALIASES)
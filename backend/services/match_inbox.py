@@ -0,0 +1,117 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from models.business import Business, BusinessListing
+from models.inbox import BuyerInboxItem
+from services.job_queue import JobQueue
+
+LISTING_PUBLISHED = "listing_published"
+# The only listing status that belongs in buyer feeds
+ACTIVE_LISTING_STATUS = "published"
+# Rows per INSERT when fanning a listing out to thousands of buyers
+INSERT_BATCH_SIZE = 5000
+
+class MatchInboxService:
+    """Per-buyer feeds of matching listings, materialized at publish time.
+
+    Publishing a listing stages a ``listing_published`` job in the same
+    transaction (``add_listing_event``), so the event exists exactly when the
+    listing does. A job worker scores the listing against the whole buyer
+    pool once and appends a row to every matching buyer's inbox; reading a
+    feed is then an index range scan of one page, with no scoring at all.
+    Inboxes reflect the buyer pool as it was when the listing was published.
+    A listing that is sold or withdrawn leaves every inbox with its status
+    change (``listing_status_changed``) and is fanned out again if it returns.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add_listing_event(self, listing: BusinessListing) -> None:
+        """Stage the fan-out job for a flushed listing; the caller commits"""
+        self._add_fan_out(listing.id, idempotency_key=f"{LISTING_PUBLISHED}:{listing.id}")
+
+    def listing_status_changed(self, listing: BusinessListing, previous_status: Optional[str]) -> None:
+        """Stage the inbox side of a status change; the caller commits"""
+        if listing.status == previous_status:
+            return
+        if listing.status == ACTIVE_LISTING_STATUS:
+            # Back on the market: the buyer pool may have changed meanwhile
+            self._add_fan_out(listing.id)
+        elif previous_status == ACTIVE_LISTING_STATUS:
+            self.db.execute(delete(BuyerInboxItem).where(BuyerInboxItem.listing_id == listing.id))
+
+    def _add_fan_out(self, listing_id: int, idempotency_key: Optional[str] = None) -> None:
+        JobQueue(self.db).add(
+            LISTING_PUBLISHED,
+            {'listing_id': listing_id},
+            # Feeds are user-facing; fan out ahead of batch work
+            priority=5,
+            idempotency_key=idempotency_key
+        )
+
+    def fan_out(self, listing_id: int, matcher) -> int:
+        """Score one listing against every buyer and fill their inboxes.
+
+        Safe to re-run (job retries): the listing's previous rows are
+        replaced in the same transaction. Returns the number of buyers matched.
+        """
+        listing = self.db.get(BusinessListing, listing_id)
+        if listing is None:
+            raise LookupError(f"Listing {listing_id} not found")
+        if listing.status != ACTIVE_LISTING_STATUS:
+            # Withdrawn before this job ran; the status change cleared its rows
+            return 0
+        business = self.db.get(Business, listing.business_id) if listing.business_id else None
+        summary = self.listing_summary(listing, business)
+
+        pool, candidates, points = matcher.score_buyers({
+            'sector': summary['sector'],
+            'location': summary['location'],
+            'valuation': listing.asking_price or 0,
+        })
+
+        self.db.execute(delete(BuyerInboxItem).where(BuyerInboxItem.listing_id == listing_id))
+        for start in range(0, len(candidates), INSERT_BATCH_SIZE):
+            batch = candidates[start:start + INSERT_BATCH_SIZE]
+            self.db.execute(insert(BuyerInboxItem), [
+                {
+                    'buyer_id': pool.buyer_id(int(index)),
+                    'listing_id': listing_id,
+                    'business_id': listing.business_id,
+                    'match_score': round(int(points[index]) / 10, 2),
+                    'summary': summary,
+                }
+                for index in batch
+            ])
+        self.db.commit()
+        return len(candidates)
+
+    def feed(self, buyer_id: str, before: Optional[int] = None, limit: int = 50) -> List[BuyerInboxItem]:
+        """One page of a buyer's inbox, newest first; pass the last id as ``before``"""
+        query = self.db.query(BuyerInboxItem).filter(BuyerInboxItem.buyer_id == buyer_id)
+        if before is not None:
+            query = query.filter(BuyerInboxItem.id < before)
+        return query.order_by(BuyerInboxItem.id.desc()).limit(limit).all()
+
+    @staticmethod
+    def listing_summary(listing: BusinessListing, business: Optional[Business]) -> Dict[str, Any]:
+        return {
+            'sector': business.sector if business else None,
+            'location': business.location if business else None,
+            'asking_price': listing.asking_price,
+            'transfer_timeline': listing.transfer_timeline,
+            'handover_type': listing.handover_type,
+        }
+
+    @staticmethod
+    def to_dict(item: BuyerInboxItem) -> Dict[str, Any]:
+        return {
+            'id': item.id,
+            'listing_id': item.listing_id,
+            'business_id': item.business_id,
+            'match_score': item.match_score,
+            **(item.summary or {}),
+            'created_at': item.created_at.isoformat() if item.created_at else None,
+        }
@@ -0,0 +1,109 @@
+"""Plain text from data room documents, for the search index.
+
+Only the standard library is needed for text formats and Office Open XML
+(.docx/.xlsx/.pptx, which are zipped XML). PDFs use ``pypdf`` when it is
+installed; without it a PDF is indexed by filename only.
+
+Archives are read against a decompressed byte budget and every extractor
+stops once ``DOCUMENT_INDEX_MAX_CHARS`` is reached, so a small zip bomb or
+a huge PDF costs a bounded amount of a job worker's memory.
+"""
+import html
+import os
+import re
+import zipfile
+from typing import Callable, Dict, Optional
+
+from config.settings import settings
+
+TAG = re.compile(r"<[^>]+>")
+# Paragraph, row and slide-text boundaries in Office XML, and block tags in HTML
+BREAK = re.compile(r"</(?:w:p|a:p|row|si|p|div|li|tr|h[1-6])>|<br\s*/?>", re.IGNORECASE)
+SPACES = re.compile(r"[ \t\r\f\v]+")
+SCRIPT = re.compile(r"<(script|style)\b.*?</\1>", re.IGNORECASE | re.DOTALL)
+READ_BLOCK_BYTES = 1024 * 1024
+
+def _markup_to_text(markup: str) -> str:
+    text = TAG.sub(" ", BREAK.sub("\n", markup))
+    return SPACES.sub(" ", html.unescape(text))
+
+def _read_text(path: str) -> str:
+    with open(path, "rb") as f:
+        data = f.read(settings.DOCUMENT_INDEX_MAX_CHARS * 4)
+    return data.decode("utf-8", errors="replace")
+
+def _html(path: str) -> str:
+    return _markup_to_text(SCRIPT.sub(" ", _read_text(path)))
+
+def _read_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, budget: int) -> bytes:
+    """Up to ``budget`` bytes of a member; the declared size is not trusted"""
+    chunks, size = [], 0
+    with archive.open(info) as member:
+        while size < budget:
+            chunk = member.read(min(READ_BLOCK_BYTES, budget - size))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+    return b"".join(chunks)
+
+def _zipped_xml(*prefixes: str) -> Callable[[str], str]:
+    def extract(path: str) -> str:
+        parts, chars = [], 0
+        budget = settings.DOCUMENT_INDEX_MAX_XML_BYTES
+        with zipfile.ZipFile(path) as archive:
+            members = sorted((i for i in archive.infolist()
+                              if i.filename.endswith(".xml") and i.filename.startswith(prefixes)),
+                             key=lambda i: i.filename)
+            for info in members:
+                if budget <= 0 or chars >= settings.DOCUMENT_INDEX_MAX_CHARS:
+                    break
+                # Never more than the member claims, nor than the budget left
+                data = _read_member(archive, info, min(info.file_size, budget))
+                budget -= len(data)
+                parts.append(_markup_to_text(data.decode("utf-8", errors="replace")))
+                chars += len(parts[-1])
+        return "\n".join(parts)
+    return extract
+
+def _pdf(path: str) -> Optional[str]:
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+    parts, chars = [], 0
+    for page in PdfReader(path).pages:
+        if chars >= settings.DOCUMENT_INDEX_MAX_CHARS:
+            break
+        parts.append(page.extract_text() or "")
+        chars += len(parts[-1]) + 1
+    return "\n".join(parts)
+
+EXTRACTORS: Dict[str, Callable[[str], Optional[str]]] = {
+    ".txt": _read_text, ".md": _read_text, ".csv": _read_text, ".tsv": _read_text,
+    ".json": _read_text, ".xml": _html, ".html": _html, ".htm": _html,
+    ".docx": _zipped_xml("word/document", "word/header", "word/footer"),
+    ".xlsx": _zipped_xml("xl/sharedStrings", "xl/worksheets/"),
+    ".pptx": _zipped_xml("ppt/slides/slide"),
+    ".pdf": _pdf,
+}
+
+def extract_text(path: str) -> Optional[str]:
+    """Text of the file at ``path``, or None when its type cannot be read.
+
+    Raises ``ValueError`` for files that claim a supported type but are
+    damaged, so callers can tell "not searchable" from "broken".
+    """
+    extractor = EXTRACTORS.get(os.path.splitext(path)[1].lower())
+    if extractor is None:
+        return None
+    try:
+        text = extractor(path)
+    except (zipfile.BadZipFile, KeyError) as e:
+        raise ValueError(f"Cannot read {os.path.basename(path)}: {e}")
+    except Exception as e:
+        # pypdf raises its own error types for damaged PDFs
+        if type(e).__module__.startswith("pypdf"):
+            raise ValueError(f"Cannot read {os.path.basename(path)}: {e}")
+        raise
+    return text[:settings.DOCUMENT_INDEX_MAX_CHARS] if text is not None else None
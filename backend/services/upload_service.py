@@ -0,0 +1,261 @@
+import fcntl
+import hashlib
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from models.upload import UploadChunk, UploadSession
+from services.data_room_service import DataRoomService
+from services.document_index import add_index_job
+
+# Expired sessions removed per sweep, so creating a session stays cheap
+EXPIRY_SWEEP_LIMIT = 100
+HASH_BLOCK_BYTES = 1024 * 1024
+
+class UploadError(Exception):
+    """Client-side problem with an upload; ``status_code`` maps it to HTTP"""
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+class UploadService:
+    """Resumable uploads: create a session, write chunks at any offset in any
+    order (from any worker), check what has arrived, then finalize.
+
+    Chunks are written with ``os.pwrite`` straight into a preallocated
+    staging file, so parallel chunks never touch each other's bytes and
+    finalizing needs no assembly step: after the coverage and SHA-256 checks
+    the file is renamed into the data room. Each received range is an
+    inserted ``UploadChunk`` row; the ranges are merged when read.
+
+    Writers hold a shared ``flock`` on the staging file and check that the
+    session is still open while holding it; finalizing holds the lock
+    exclusively from hashing until the file has moved. So no chunk can land
+    after the checksum was taken, whichever worker it arrives on.
+    """
+    def __init__(self, db: Session, data_room: Optional[DataRoomService] = None,
+                 directory: str = settings.UPLOAD_DIR):
+        self.db = db
+        self.data_room = data_room or DataRoomService()
+        self.directory = directory
+
+    def create(self, user_id: int, business_id: str, filename: str, total_size: int,
+               sha256: Optional[str] = None) -> UploadSession:
+        if total_size <= 0 or total_size > settings.UPLOAD_MAX_BYTES:
+            raise UploadError(f"size must be between 1 and {settings.UPLOAD_MAX_BYTES} bytes")
+        try:
+            # Rejects ids that are not plain names before anything touches disk
+            self.data_room.business_folder(business_id)
+        except FileNotFoundError:
+            raise UploadError("Data room not found", 404)
+        self.expire_sessions()
+
+        session = UploadSession(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            business_id=str(business_id),
+            filename=os.path.basename(filename) or "upload",
+            total_size=total_size,
+            sha256=self._normalize_digest(sha256),
+            expires_at=self._expiry(),
+        )
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.staging_path(session.id), 'wb') as f:
+            # Sparse: disk is only used as chunks arrive
+            f.truncate(total_size)
+        self.db.add(session)
+        self.db.commit()
+        return session
+
+    def get(self, upload_id: str, user_id: int) -> UploadSession:
+        """The caller's open session; other users' sessions do not exist for them"""
+        session = self.db.get(UploadSession, upload_id)
+        if session is None or session.user_id != user_id:
+            raise UploadError("Upload not found", 404)
+        if session.status != "complete" and session.expires_at < datetime.utcnow():
+            raise UploadError("Upload session expired", 410)
+        return session
+
+    def check_chunk(self, session: UploadSession, offset: int, length: Optional[int]) -> None:
+        if session.status != "open":
+            raise UploadError(f"Upload is {session.status}", 409)
+        if offset < 0 or offset >= session.total_size:
+            raise UploadError("offset is outside the file", 416)
+        if length is not None and (length > settings.UPLOAD_MAX_CHUNK_BYTES
+                                   or offset + length > session.total_size):
+            raise UploadError("Chunk is too large or runs past the end of the file", 413)
+
+    def write(self, upload_id: str, offset: int, data: bytes) -> None:
+        """Write bytes of a chunk at ``offset``; called repeatedly as the body streams in"""
+        try:
+            fd = os.open(self.staging_path(upload_id), os.O_WRONLY)
+        except FileNotFoundError:
+            # Completed, aborted or expired since the chunk started
+            raise UploadError("Upload is no longer accepting chunks", 409)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH)
+            status = self._current_status(upload_id)
+            if status != "open":
+                raise UploadError(f"Upload is {status or 'gone'}", 409)
+            view = memoryview(data)
+            while view:
+                written = os.pwrite(fd, view, offset)
+                view, offset = view[written:], offset + written
+        finally:
+            os.close(fd)
+
+    def record_chunk(self, upload_id: str, offset: int, length: int) -> None:
+        # Only while still open, in the same transaction as the chunk row
+        touched = self.db.query(UploadSession).filter(
+            UploadSession.id == upload_id, UploadSession.status == "open"
+        ).update({UploadSession.expires_at: self._expiry()}, synchronize_session=False)
+        if not touched:
+            self.db.rollback()
+            raise UploadError(f"Upload is {self._current_status(upload_id) or 'gone'}", 409)
+        if length:
+            self.db.add(UploadChunk(session_id=upload_id, offset=offset, length=length))
+        self.db.commit()
+
+    def received_ranges(self, upload_id: str) -> List[Tuple[int, int]]:
+        """Merged [start, end) ranges received so far"""
+        chunks = (self.db.query(UploadChunk.offset, UploadChunk.length)
+                  .filter(UploadChunk.session_id == upload_id)
+                  .order_by(UploadChunk.offset).all())
+        ranges: List[List[int]] = []
+        for offset, length in chunks:
+            if ranges and offset <= ranges[-1][1]:
+                ranges[-1][1] = max(ranges[-1][1], offset + length)
+            else:
+                ranges.append([offset, offset + length])
+        return [(start, end) for start, end in ranges]
+
+    def begin_finalize(self, session: UploadSession, sha256: Optional[str]) -> str:
+        """Claim the session for finalizing; returns the digest to verify against"""
+        if session.status == "complete":
+            raise UploadError("Upload is already complete", 409)
+        expected = self._normalize_digest(sha256) or session.sha256
+        if expected is None:
+            raise UploadError("sha256 is required, at creation or finalize")
+        if self.received_ranges(session.id) != [(0, session.total_size)]:
+            raise UploadError("Upload is missing byte ranges", 409)
+
+        # Compare-and-set so two finalize requests cannot both move the file
+        claimed = self.db.query(UploadSession).filter(
+            UploadSession.id == session.id, UploadSession.status == "open"
+        ).update({UploadSession.status: "finalizing"}, synchronize_session=False)
+        self.db.commit()
+        if not claimed:
+            raise UploadError("Upload is already being finalized", 409)
+        return expected
+
+    def finalize(self, session: UploadSession, expected_sha256: str) -> Dict[str, Any]:
+        """Verify the staged file and move it into the data room (blocking I/O).
+
+        Any failure hands the session back as open, so the client can retry
+        instead of getting 409s until the session expires.
+        """
+        path = self.staging_path(session.id)
+        document: Optional[Dict[str, Any]] = None
+        try:
+            with open(path, 'rb') as f:
+                # Waits for chunks already being written; later ones see finalizing
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                digest = hashlib.sha256()
+                for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+                    digest.update(block)
+                os.fsync(f.fileno())
+
+                self.db.refresh(session)
+                if digest.hexdigest() != expected_sha256:
+                    # Some chunk arrived corrupted; the client can re-send and retry
+                    session.expires_at = self._expiry()
+                    raise UploadError("Checksum mismatch; re-send the file's chunks and finalize again", 422)
+
+                document = self.data_room.store_file(path, session.filename, session.business_id,
+                                                     str(session.user_id))
+                document['size'] = session.total_size
+                document['sha256'] = expected_sha256
+                session.status = "complete"
+                session.document = document
+                add_index_job(self.db, session.business_id, document)
+                self.db.query(UploadChunk).filter(UploadChunk.session_id == session.id).delete(synchronize_session=False)
+                self.db.commit()
+            return document
+        except Exception:
+            self.db.rollback()
+            if document is not None:
+                # Moved into the data room but never recorded: put the bytes back
+                try:
+                    os.replace(document['file_path'], path)
+                except OSError:
+                    pass
+            self.db.query(UploadSession).filter(
+                UploadSession.id == session.id, UploadSession.status == "finalizing"
+            ).update({UploadSession.status: "open", UploadSession.expires_at: self._expiry()},
+                     synchronize_session=False)
+            self.db.commit()
+            raise
+
+    def abort(self, session: UploadSession) -> None:
+        self._remove(session)
+        self.db.commit()
+
+    def expire_sessions(self, limit: int = EXPIRY_SWEEP_LIMIT) -> int:
+        """Drop abandoned sessions and their staged bytes"""
+        expired = (self.db.query(UploadSession)
+                   .filter(UploadSession.status != "complete", UploadSession.expires_at < datetime.utcnow())
+                   .limit(limit).all())
+        for session in expired:
+            self._remove(session)
+        self.db.commit()
+        return len(expired)
+
+    def status(self, session: UploadSession) -> Dict[str, Any]:
+        ranges = self.received_ranges(session.id) if session.status != "complete" else [(0, session.total_size)]
+        return {
+            'upload_id': session.id,
+            'filename': session.filename,
+            'business_id': session.business_id,
+            'size': session.total_size,
+            'status': session.status,
+            'received': [list(r) for r in ranges],
+            'received_bytes': sum(end - start for start, end in ranges),
+            'max_chunk_bytes': settings.UPLOAD_MAX_CHUNK_BYTES,
+            'expires_at': session.expires_at.isoformat(),
+            'document': session.document,
+        }
+
+    def _current_status(self, upload_id: str) -> Optional[str]:
+        # Fresh read: end any transaction whose snapshot predates a finalize
+        self.db.rollback()
+        status = self.db.query(UploadSession.status).filter(UploadSession.id == upload_id).scalar()
+        self.db.rollback()
+        return status
+
+    def staging_path(self, upload_id: str) -> str:
+        return os.path.join(self.directory, f"{upload_id}.part")
+
+    def _remove(self, session: UploadSession) -> None:
+        try:
+            os.remove(self.staging_path(session.id))
+        except FileNotFoundError:
+            pass
+        self.db.query(UploadChunk).filter(UploadChunk.session_id == session.id).delete(synchronize_session=False)
+        self.db.delete(session)
+
+    @staticmethod
+    def _expiry() -> datetime:
+        return datetime.utcnow() + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+
+    @staticmethod
+    def _normalize_digest(sha256: Optional[str]) -> Optional[str]:
+        if sha256 is None:
+            return None
+        digest = sha256.strip().lower()
+        if len(digest) != 64 or any(c not in "0123456789abcdef" for c in digest):
+            raise UploadError("sha256 must be 64 hex characters")
+        return digest
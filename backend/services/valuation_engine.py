@@ -1,8 +1,22 @@
-import pandas as pd
-import numpy as np
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Iterable, List, Optional
+
+from services.audit_log import audit_log
 
 class ValuationEngine:
+    # Inputs each method reads (ebitda falls back to a share of revenue, so
+    # revenue matters wherever ebitda does). A change to any other field
+    # leaves that method's result unchanged.
+    METHOD_INPUTS = {
+        'ebitda_multiple': frozenset({'ebitda', 'annual_revenue', 'profit_margin', 'years_operation', 'total_assets'}),
+        'revenue_multiple': frozenset({'annual_revenue', 'profit_margin'}),
+        'asset_based': frozenset({'total_assets'}),
+        'dcf': frozenset({'ebitda', 'annual_revenue', 'history'}),
+    }
+    # Numeric inputs a client can set directly; 'history' holds the metrics
+    # from services.financial_history and is attached server-side
+    INPUT_FIELDS = frozenset().union(*METHOD_INPUTS.values()) - {'history'}
+
     def __init__(self):
         self.methods = {
             'ebitda_multiple': self._ebitda_multiple,
@@ -12,6 +26,18 @@ class ValuationEngine:
         }
     
     def calculate_valuation(self, financial_data: Dict[str, Any], method: str = 'auto') -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            valuation = self._calculate(financial_data, method)
+        except ValueError as e:
+            audit_log.record('valuation', 'ValuationEngine', method, dict(financial_data), None,
+                             (time.perf_counter() - started) * 1000, error=str(e))
+            raise
+        audit_log.record('valuation', 'ValuationEngine', valuation['method'], dict(financial_data), valuation,
+                         (time.perf_counter() - started) * 1000)
+        return valuation
+
+    def _calculate(self, financial_data: Dict[str, Any], method: str) -> Dict[str, Any]:
         if method == 'auto':
             method = self._select_best_method(financial_data)
         
@@ -29,6 +55,18 @@ class ValuationEngine:
             'confidence_score': result.get('confidence', 0.8)
         }
     
+    def calculate_methods(self, financial_data: Dict[str, Any],
+                          methods: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Results for several methods at once, keyed by method name"""
+        return {m: self.calculate_valuation(financial_data, m) for m in (methods or self.methods)}
+
+    def affected_methods(self, changed_fields: Iterable[str]) -> List[str]:
+        changed = set(changed_fields)
+        return [m for m, fields in self.METHOD_INPUTS.items() if fields & changed]
+
+    def recommended_method(self, financial_data: Dict[str, Any]) -> str:
+        return self._select_best_method(financial_data)
+
     def _ebitda_multiple(self, data: Dict) -> Dict:
         ebitda = data.get('ebitda', data.get('annual_revenue', 0) * 0.25)
         multiple = 3.0  # Industry standard multiple
@@ -94,6 +132,18 @@ class ValuationEngine:
         growth_rate = 0.05  # 5% growth assumption
         discount_rate = 0.12  # 12% discount rate
         terminal_growth = 0.02  # 2% terminal growth
+        source = 'assumed'
+
+        # With multi-year history, project from trailing-twelve-month EBITDA
+        # at the observed growth, and charge a premium for volatile revenue
+        history = data.get('history') or {}
+        if history.get('ttm_ebitda') is not None:
+            cash_flow = history['ttm_ebitda']
+            source = 'history'
+        if history.get('revenue_growth') is not None:
+            growth_rate = min(max(history['revenue_growth'], -0.10), 0.25)
+        if history.get('growth_volatility') is not None:
+            discount_rate += min(history['growth_volatility'] * 0.5, 0.08)
         
         # 5-year projection
         years = 5
@@ -117,9 +167,11 @@ class ValuationEngine:
                 'cash_flow': cash_flow,
                 'growth_rate': growth_rate,
                 'discount_rate': discount_rate,
-                'terminal_growth': terminal_growth
+                'terminal_growth': terminal_growth,
+                'inputs_source': source
             },
-            'confidence': 0.7
+            # Observed history makes the projection more trustworthy
+            'confidence': 0.8 if source == 'history' else 0.7
         }
     
     def _select_best_method(self, data: Dict) -> str:
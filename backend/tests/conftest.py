@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Before settings are read: tests must never write the real audit trail
+os.environ.setdefault("AUDIT_LOG_ENABLED", "false")
+
+from models.database import Base  # noqa: E402
+import models.business, models.inbox, models.job, models.upload  # noqa: E401,E402,F401
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Sessions on a throwaway SQLite file with every table created"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+@pytest.fixture
+def db(session_factory):
+    with session_factory() as session:
+        yield session
@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+from services.financial_history import FinancialHistoryStore, history_metrics
+
+def _quarters(start, end, revenue=100.0):
+    return [
+        {'period_end': d.strftime('%Y-%m-%d'), 'period_type': 'Q',
+         'revenue': revenue, 'ebitda': revenue / 4, 'total_assets': 1000.0}
+        for d in pd.date_range(start, end, freq='Q')
+    ]
+
+def test_ttm_sums_the_last_four_quarters(tmp_path):
+    store = FinancialHistoryStore(str(tmp_path))
+    periods = _quarters('2023-01-01', '2023-12-31', 100.0) + _quarters('2024-01-01', '2024-12-31', 150.0)
+    assert store.save(1, periods) == 8
+    metrics = store.metrics([1])[1]
+    assert metrics['ttm_revenue'] == 600.0
+    assert metrics['ttm_ebitda'] == 150.0
+    assert metrics['revenue_growth'] == pytest.approx(0.5)
+    assert metrics['latest_period'] == '2024-12-31'
+
+def test_save_rejects_missing_quarters(tmp_path):
+    periods = [p for p in _quarters('2023-01-01', '2024-12-31')
+               if p['period_end'] not in ('2024-03-31', '2024-06-30')]
+    with pytest.raises(ValueError, match="missing periods after 2023-12-31"):
+        FinancialHistoryStore(str(tmp_path)).save(1, periods)
+
+def test_metrics_ignore_windows_spanning_a_gap():
+    # History stored before gaps were rejected: four quarters over 18 months
+    periods = [p for p in _quarters('2023-01-01', '2024-12-31')
+               if p['period_end'] not in ('2024-03-31', '2024-06-30')]
+    frame = pd.DataFrame(periods).assign(business_id=1)
+    frame['period_end'] = pd.to_datetime(frame['period_end'])
+    metrics = history_metrics(frame).loc[1]
+    assert pd.isna(metrics['ttm_revenue'])
+    assert pd.isna(metrics['revenue_growth'])
@@ -0,0 +1,101 @@
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import OperationalError
+
+from models.job import Job
+from services.job_queue import JobQueue, JobWorker, job_handler
+
+def _make_due(db, job_id):
+    # Retries are delayed by backoff; pull them forward
+    db.query(Job).filter(Job.id == job_id).update({Job.run_after: datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+
+def test_claim_takes_highest_priority_first_and_only_once(session_factory):
+    with session_factory() as db:
+        queue = JobQueue(db)
+        low = queue.enqueue("test", {"n": 1}).id
+        high = queue.enqueue("test", {"n": 2}, priority=5).id
+
+    with session_factory() as first, session_factory() as second:
+        claimed = JobQueue(first).claim("worker-a")
+        assert claimed.id == high
+        assert claimed.status == "running" and claimed.locked_by == "worker-a" and claimed.attempts == 1
+        assert JobQueue(second).claim("worker-b").id == low
+        assert JobQueue(second).claim("worker-b") is None
+
+def test_idempotency_key_returns_the_original_job(db):
+    queue = JobQueue(db)
+    first = queue.enqueue("test", idempotency_key="once")
+    assert queue.enqueue("test", idempotency_key="once").id == first.id
+    assert db.query(Job).count() == 1
+
+def test_lease_takeover_keeps_the_new_holders_result(session_factory):
+    with session_factory() as db:
+        job_id = JobQueue(db).enqueue("test").id
+
+    with session_factory() as slow_db, session_factory() as sweeper_db, session_factory() as new_db:
+        slow = JobQueue(slow_db)
+        slow_job = slow.claim("slow")
+
+        # The slow worker stops heartbeating; its lease is handed on
+        assert JobQueue(sweeper_db).requeue_stale(lease_seconds=-1) == 1
+        _make_due(sweeper_db, job_id)
+        new = JobQueue(new_db)
+        new_job = new.claim("new")
+        assert new_job.id == job_id and new_job.attempts == 2
+
+        # Heartbeats and results from the worker that lost the lease are ignored
+        slow.report_progress(job_id, 0.5, "still going", worker_id="slow")
+        assert slow.complete(slow_job, {"by": "slow"}, worker_id="slow") is False
+        assert slow.fail(slow_job, "late failure", worker_id="slow") is False
+        assert new.complete(new_job, {"by": "new"}, worker_id="new") is True
+
+    with session_factory() as db:
+        job = db.get(Job, job_id)
+        assert job.status == "succeeded"
+        assert job.result == {"by": "new"}
+        assert job.attempts == 2
+        assert job.progress_message != "still going"
+
+def test_fail_retries_until_max_attempts(session_factory):
+    with session_factory() as db:
+        queue = JobQueue(db)
+        job_id = queue.enqueue("test", max_attempts=2).id
+        assert queue.fail(queue.claim("w"), "boom", worker_id="w")
+        assert db.get(Job, job_id).status == "queued"
+        _make_due(db, job_id)
+        assert queue.fail(queue.claim("w"), "boom again", worker_id="w")
+        job = db.get(Job, job_id)
+        assert job.status == "failed" and job.error == "boom again" and job.finished_at is not None
+
+def test_worker_runs_handler_and_settles(session_factory):
+    @job_handler("test_double")
+    def double(payload, context):
+        context.progress(0.5, "halfway")
+        return {"value": payload["value"] * 2}
+
+    with session_factory() as db:
+        job_id = JobQueue(db).enqueue("test_double", {"value": 21}).id
+    worker = JobWorker("w", session_factory=session_factory, kinds=["test_double"])
+    assert worker.run_once() is True
+    assert worker.run_once() is False
+    with session_factory() as db:
+        job = db.get(Job, job_id)
+        assert job.status == "succeeded" and job.result == {"value": 42} and job.locked_by is None
+
+def test_worker_loop_survives_queue_errors(session_factory, monkeypatch):
+    worker = JobWorker("w", session_factory=session_factory, poll_interval=0.01)
+    stop = threading.Event()
+    calls = []
+
+    def flaky_run_once():
+        calls.append(1)
+        if len(calls) < 3:
+            raise OperationalError("claim", {}, Exception("database is locked"))
+        stop.set()
+        return False
+
+    monkeypatch.setattr(worker, "run_once", flaky_run_once)
+    worker.run(stop)
+    assert len(calls) == 3
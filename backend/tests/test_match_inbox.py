@@ -0,0 +1,41 @@
+from models.business import Business, BusinessListing
+from models.inbox import BuyerInboxItem
+from models.job import Job
+from services.listing_service import ListingService
+from services.match_inbox import LISTING_PUBLISHED, MatchInboxService
+
+class StubPool:
+    def buyer_id(self, index):
+        return f"buyer-{index}"
+
+class StubMatcher:
+    """Every buyer in a pool of three matches"""
+    def score_buyers(self, criteria):
+        return StubPool(), [0, 1, 2], [800, 700, 600]
+
+def _listing(db):
+    business = Business(name="Bakery", sector="Food", location="Pune")
+    db.add(business)
+    db.flush()
+    listing = ListingService(db).create_listing(business.id, {'asking_price': 100000})
+    MatchInboxService(db).fan_out(listing.id, StubMatcher())
+    return listing
+
+def test_withdrawn_listing_leaves_every_inbox(db):
+    listing = _listing(db)
+    assert len(MatchInboxService(db).feed("buyer-1")) == 1
+
+    ListingService(db).update_listing_status(listing.id, "sold")
+    assert db.query(BuyerInboxItem).count() == 0
+    # A fan-out job still queued from publishing adds nothing back
+    assert MatchInboxService(db).fan_out(listing.id, StubMatcher()) == 0
+    assert MatchInboxService(db).feed("buyer-1") == []
+
+def test_relisted_listing_is_fanned_out_again(db):
+    listing = _listing(db)
+    ListingService(db).update_listing_status(listing.id, "withdrawn")
+    ListingService(db).update_listing_status(listing.id, "published")
+
+    jobs = db.query(Job).filter(Job.kind == LISTING_PUBLISHED).all()
+    assert len(jobs) == 2 and all(job.payload == {'listing_id': listing.id} for job in jobs)
+    assert MatchInboxService(db).fan_out(listing.id, StubMatcher()) == 3
@@ -0,0 +1,90 @@
+import hashlib
+import os
+
+import pytest
+
+from models.upload import UploadChunk, UploadSession
+from services.data_room_service import DataRoomService
+from services.upload_service import UploadError, UploadService
+
+CONTENT = b"0123456789" * 10
+
+@pytest.fixture
+def service(db, tmp_path, monkeypatch):
+    # The data room lives relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    return UploadService(db, data_room=DataRoomService(), directory=str(tmp_path / "staging"))
+
+def _upload(service, content=CONTENT, chunk=30):
+    session = service.create(1, "biz1", "report.pdf", len(content))
+    for offset in range(0, len(content), chunk):
+        data = content[offset:offset + chunk]
+        service.write(session.id, offset, data)
+        service.record_chunk(session.id, offset, len(data))
+    return session
+
+def test_received_ranges_merge_overlapping_and_adjacent_chunks(service):
+    session = service.create(1, "biz1", "report.pdf", 100)
+    for offset, length in [(50, 10), (0, 10), (5, 10), (15, 5), (70, 30), (80, 5)]:
+        service.record_chunk(session.id, offset, length)
+    assert service.received_ranges(session.id) == [(0, 20), (50, 60), (70, 100)]
+
+def test_finalize_moves_the_verified_file_into_the_data_room(service, db):
+    session = _upload(service)
+    expected = service.begin_finalize(session, hashlib.sha256(CONTENT).hexdigest())
+    document = service.finalize(session, expected)
+
+    assert session.status == "complete"
+    assert not os.path.exists(service.staging_path(session.id))
+    with open(document['file_path'], 'rb') as f:
+        assert f.read() == CONTENT
+    assert db.query(UploadChunk).filter(UploadChunk.session_id == session.id).count() == 0
+
+def test_finalize_needs_every_byte_range(service):
+    session = service.create(1, "biz1", "report.pdf", len(CONTENT))
+    service.write(session.id, 0, CONTENT[:50])
+    service.record_chunk(session.id, 0, 50)
+    with pytest.raises(UploadError) as error:
+        service.begin_finalize(session, hashlib.sha256(CONTENT).hexdigest())
+    assert error.value.status_code == 409
+    assert session.status == "open"
+
+def test_checksum_mismatch_reopens_the_session(service, db):
+    session = _upload(service)
+    expected = service.begin_finalize(session, hashlib.sha256(b"something else").hexdigest())
+    with pytest.raises(UploadError) as error:
+        service.finalize(session, expected)
+    assert error.value.status_code == 422
+    assert db.get(UploadSession, session.id).status == "open"
+
+    # Chunks are accepted again and a correct digest completes the upload
+    service.write(session.id, 0, CONTENT[:10])
+    service.record_chunk(session.id, 0, 10)
+    service.finalize(session, service.begin_finalize(session, hashlib.sha256(CONTENT).hexdigest()))
+    assert db.get(UploadSession, session.id).status == "complete"
+
+def test_only_one_finalize_claims_the_session(service):
+    session = _upload(service)
+    digest = hashlib.sha256(CONTENT).hexdigest()
+    service.begin_finalize(session, digest)
+    with pytest.raises(UploadError) as error:
+        service.begin_finalize(session, digest)
+    assert error.value.status_code == 409
+
+def test_chunks_are_rejected_while_finalizing(service):
+    session = _upload(service)
+    service.begin_finalize(session, hashlib.sha256(CONTENT).hexdigest())
+    for attempt in (lambda: service.write(session.id, 0, b"x"),
+                    lambda: service.record_chunk(session.id, 0, 1)):
+        with pytest.raises(UploadError) as error:
+            attempt()
+        assert error.value.status_code == 409
+    with open(service.staging_path(session.id), 'rb') as f:
+        assert f.read() == CONTENT
+
+def test_chunks_after_completion_are_rejected(service):
+    session = _upload(service)
+    service.finalize(session, service.begin_finalize(session, hashlib.sha256(CONTENT).hexdigest()))
+    with pytest.raises(UploadError) as error:
+        service.write(session.id, 0, b"x")
+    assert error.value.status_code == 409
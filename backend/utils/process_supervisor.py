@@ -0,0 +1,52 @@
+"""Keep a fixed set of worker processes running until told to stop.
+
+Used by worker.py (job workers) and serve.py (web workers). A worker that
+exits while no shutdown was requested (a crash, the OOM killer, a segfault
+in a native library) is logged and replaced, so capacity does not quietly
+shrink. SIGTERM/SIGINT terminate every worker and wait for them to finish.
+"""
+import logging
+import signal
+import threading
+import time
+from multiprocessing.connection import wait
+from multiprocessing.process import BaseProcess
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+def supervise(start: Callable[[int], BaseProcess], count: int, restart_delay: float = 1.0) -> None:
+    """Run ``start(index)`` for each of ``count`` workers and keep them running.
+
+    ``start`` must return an already started process. A worker that dies
+    within ``restart_delay`` seconds of starting is replaced only after that
+    delay, so a worker that cannot start does not fork in a tight loop.
+    """
+    stopping = threading.Event()
+    processes: List[BaseProcess] = [start(index) for index in range(count)]
+    started = [time.monotonic()] * count
+
+    def shutdown(*_):
+        stopping.set()
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    while not stopping.is_set():
+        wait([process.sentinel for process in processes], timeout=1.0)
+        for index, process in enumerate(processes):
+            if stopping.is_set() or process.exitcode is None:
+                continue
+            logger.error("%s exited unexpectedly (exit code %s); starting a replacement",
+                         process.name, process.exitcode)
+            stopping.wait(max(0.0, started[index] + restart_delay - time.monotonic()))
+            if stopping.is_set():
+                break
+            processes[index] = start(index)
+            started[index] = time.monotonic()
+
+    for process in processes:
+        process.join()
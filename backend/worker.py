@@ -0,0 +1,55 @@
+"""Background job workers.
+
+Runs JOB_WORKER_PROCESSES processes that claim jobs from the database queue
+(services/job_queue.py) until interrupted:
+
+    cd backend
+    python worker.py
+    python worker.py --processes 4 --kinds batch_revaluation
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+from typing import List, Optional
+
+from config.settings import settings
+from utils.process_supervisor import supervise
+
+def run_worker(index: int, kinds: Optional[List[str]]):
+    import services.job_handlers  # noqa: F401  (registers handlers)
+    from services.job_queue import JobWorker
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    JobWorker(f"{socket.gethostname()}:{os.getpid()}:{index}", kinds=kinds).run(stop)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--processes", type=int, default=settings.JOB_WORKER_PROCESSES)
+    parser.add_argument("--kinds", help="Comma-separated job kinds to run (default: all)")
+    args = parser.parse_args()
+    kinds = args.kinds.split(",") if args.kinds else None
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+
+    # Workers may start before the API has created the tables
+    from models.database import Base, engine
+    import models.business, models.inbox, models.job  # noqa: F401,E401
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()  # connections must not be shared across the fork
+
+    def start(index: int) -> multiprocessing.Process:
+        process = multiprocessing.Process(target=run_worker, args=(index, kinds), name=f"job-worker-{index}")
+        process.start()
+        return process
+
+    # On SIGTERM/SIGINT workers finish the job they are running, then exit;
+    # a worker that dies on its own is replaced
+    supervise(start, max(1, args.processes))
+
+if __name__ == "__main__":
+    main()